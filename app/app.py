@@ -1,62 +1,684 @@
-from flask import Flask, render_template, jsonify, request, Response
+from flask import Flask, render_template, jsonify, request, Response, g
+from werkzeug.http import is_resource_modified
+import bisect
+import collections
+import collections.abc
+import datetime
+import gzip
+import hashlib
+import heapq
 import json
+import math
 import os
+import re
 import sys
-import subprocess
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app_metadata_builder
+from catalog_store import CatalogStore
+from metrics import Metrics, snapshot_to_prometheus
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it responses are gzip-compressed only
+    brotli = None
 
 app = Flask(__name__)
 
+APPLICATIONS_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'applications.json')
+# Catalog the web app serves: applications.ndjson (`--format ndjson`) when present, else applications.json
+APPLICATIONS_NDJSON = os.path.splitext(APPLICATIONS_JSON)[0] + '.ndjson'
+APPLICATIONS_CATALOG = os.environ.get('APPLICATIONS_CATALOG') or (
+    APPLICATIONS_NDJSON if os.path.exists(APPLICATIONS_NDJSON) else APPLICATIONS_JSON)
+# SQLite catalog written by `app_metadata_builder.py --store`; used when present
+APPLICATIONS_DB = os.environ.get('APPLICATIONS_DB') or os.path.splitext(APPLICATIONS_JSON)[0] + '.db'
+APPLICATION_FIELDS = ('description', 'version', 'copyright', 'bundle_identifier', 'path',
+                      'created', 'modified', 'CFBundleDescription',
+                      'size_bytes', 'file_count', 'architectures')
+# Columns /api/applications can order by (?sort=<field>, or ?sort=-<field> for descending)
+SORTABLE_FIELDS = ('name', 'version', 'size_bytes', 'file_count')
+NUMERIC_FIELDS = ('size_bytes', 'file_count')
+# How long a catalog snapshot is trusted before the file is stat()ed again
+CATALOG_CHECK_INTERVAL = 1.0
+API_DEFAULT_LIMIT = 100
+API_MAX_LIMIT = 500
+API_FIELDS = ('name',) + APPLICATION_FIELDS
+API_DEFAULT_FIELDS = ('name', 'description', 'version', 'copyright')
+SEARCH_DEFAULT_LIMIT = 50
+# Fields the in-memory search index covers and the weight of a match in each
+SEARCH_FIELD_WEIGHTS = (('name', 3.0), ('bundle_identifier', 2.0), ('description', 1.0),
+                        ('copyright', 0.5))
+# A word that is only the prefix of an indexed word scores this share of the field weight
+SEARCH_PREFIX_FACTOR = 0.8
+# Typo-tolerant matching on names and bundle IDs: shared trigram share needed, and its weight
+SEARCH_FUZZY_MIN_SIMILARITY = 0.5
+SEARCH_FUZZY_WEIGHT = 1.5
+SEARCH_FUZZY_MIN_LENGTH = 3
+# JSON run report the builder writes next to applications.json
+BUILDER_REPORT = os.path.splitext(APPLICATIONS_JSON)[0] + '.metrics.json'
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 500
+COMPRESSIBLE_MIMETYPES = ('text/html', 'text/css', 'text/javascript', 'application/javascript',
+                          'application/json')
+# Fingerprinted static URLs (?v=<content hash>) never change, so browsers may keep them
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+# Progress events kept per refresh job for subscribers that attach late or reconnect
+REFRESH_EVENT_BUFFER = 1000
+SSE_KEEPALIVE_INTERVAL = 15
+
+def normalize_application(app_data):
+    """Normalize an entry from the new metadata format or the old flat-string format"""
+    if isinstance(app_data, dict):
+        return {field: app_data.get(field, '') for field in APPLICATION_FIELDS}
+    entry = dict.fromkeys(APPLICATION_FIELDS, '')
+    entry['description'] = app_data or ''
+    return entry
+
+# The builder writes each NDJSON record as {"name": ..., <fields>}, so the name leads the line
+_NDJSON_NAME = re.compile(rb'^\{"name":\s*("(?:[^"\\]|\\.)*")')
+# NdjsonRecords.select() reads runs of adjacent records in blocks of up to this size
+NDJSON_READ_BYTES = 1 << 20
+
+class NdjsonRecords(collections.abc.Mapping):
+    """Read-only mapping of app name to normalized entry over an NDJSON catalog
+
+    Only a byte-offset index {name: (offset, length, digest)} is kept in
+    memory, the digest being a hash of the raw line; each lookup reads its one
+    line with os.pread(). The file stays open, so a catalog replaced by the
+    builder's rename keeps serving the version that was indexed until the next
+    reload.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._offsets = {}
+        offset = 0
+        for line in self._file:
+            name = self._record_name(line)
+            if name is not None:
+                self._offsets[name] = (offset, len(line), hash(line))
+            offset += len(line)
+
+    @staticmethod
+    def _record_name(line):
+        if not line.endswith(b'\n'):
+            # The builder writes whole lines; one without its newline was cut short
+            return None
+        match = _NDJSON_NAME.match(line)
+        try:
+            if match:
+                return json.loads(match.group(1))
+            # Written by something else: fall back to parsing the whole record
+            return json.loads(line).get('name')
+        except (ValueError, AttributeError):
+            # A truncated or malformed line is skipped rather than failing the catalog
+            return None
+
+    @staticmethod
+    def _decode(line):
+        record = json.loads(line)
+        record.pop('name', None)
+        return normalize_application(record)
+
+    def __getitem__(self, name):
+        offset, length, _ = self._offsets[name]
+        return self._decode(os.pread(self._file.fileno(), length, offset))
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, name):
+        return name in self._offsets
+
+    def iter_records(self, start=None):
+        """Stream (name, entry) pairs in file order, beginning at the record for start if given"""
+        started = start is None
+        for name in self._offsets:
+            started = started or name == start
+            if started:
+                yield name, self[name]
+
+    def digests(self):
+        """{name: hash of its raw line}, to tell changed records apart without reading them"""
+        return {name: digest for name, (_, _, digest) in self._offsets.items()}
+
+    def select(self, names):
+        """Stream (name, entry) for the given names in file order
+
+        Runs of adjacent records are read with one os.pread() each, so selecting
+        every record is a single sequential pass over the file.
+        """
+        wanted = sorted(self._offsets[name][:2] + (name,) for name in names if name in self._offsets)
+        fd = self._file.fileno()
+        first = 0
+        while first < len(wanted):
+            start = end = wanted[first][0]
+            last = first
+            while last < len(wanted) and wanted[last][0] == end and end - start < NDJSON_READ_BYTES:
+                end += wanted[last][1]
+                last += 1
+            block = os.pread(fd, end - start, start)
+            for offset, length, name in wanted[first:last]:
+                yield name, self._decode(block[offset - start:offset - start + length])
+            first = last
+
+    def close(self):
+        self._file.close()
+
+_SEARCH_WORD = re.compile(r'\w+')
+
+def _search_words(text):
+    return _SEARCH_WORD.findall(str(text or '').lower())
+
+def _trigrams(word, whole_word=True):
+    """pg_trgm-style trigrams: the word padded with two spaces in front and, if whole, one behind
+
+    Query words leave the end open, so a word still being typed matches the words it begins.
+    """
+    padded = '  ' + word + (' ' if whole_word else '')
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    """In-memory search over the catalog: word prefixes in every field, trigrams in names and bundle IDs
+
+    update() compares a digest per entry and re-indexes only the entries that
+    changed, so a reload after the builder touched a few apps costs a hash
+    comparison per app plus the work for those apps. An NDJSON catalog is
+    digested by raw line while it is indexed, and only its changed records are
+    read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        # Per document id; None once the app is removed, until _add() reuses the id
+        self._names = []
+        self._digests = []
+        self._words = []
+        self._free_ids = []
+        self._postings = {field: {} for field, _ in SEARCH_FIELD_WEIGHTS}
+        # Sorted words of each field, for prefix lookups; rebuilt lazily after changes
+        self._vocabulary = {field: [] for field, _ in SEARCH_FIELD_WEIGHTS}
+        self._stale_vocabulary = set()
+        self._trigram_postings = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def update(self, applications):
+        """Bring the index in line with {name: entry}; returns the number of apps (re)indexed and removed"""
+        if isinstance(applications, NdjsonRecords):
+            digests = applications.digests()
+        else:
+            digests = {name: hash(self._values(name, entry)) for name, entry in applications.items()}
+        with self._lock:
+            removed = [name for name in self._ids if name not in digests]
+            for name in removed:
+                self._remove(self._ids.pop(name))
+            changed = [name for name, digest in digests.items()
+                       if name not in self._ids or self._digests[self._ids[name]] != digest]
+            if isinstance(applications, NdjsonRecords):
+                entries = applications.select(changed)
+            else:
+                entries = ((name, applications[name]) for name in changed)
+            for name, entry in entries:
+                doc_id = self._ids.get(name)
+                if doc_id is not None:
+                    self._remove(doc_id)
+                self._ids[name] = self._add(name, self._values(name, entry), digests[name])
+            return len(changed), len(removed)
+
+    @staticmethod
+    def _values(name, entry):
+        return tuple(name if field == 'name' else entry.get(field, '') for field, _ in SEARCH_FIELD_WEIGHTS)
+
+    def _add(self, name, values, digest):
+        if self._free_ids:
+            doc_id = self._free_ids.pop()
+        else:
+            doc_id = len(self._names)
+            self._names.append(None)
+            self._digests.append(None)
+            self._words.append(None)
+        words = {}
+        for (field, _), value in zip(SEARCH_FIELD_WEIGHTS, values):
+            words[field] = set(_search_words(value))
+            postings = self._postings[field]
+            for word in words[field]:
+                if word not in postings:
+                    postings[word] = set()
+                    self._stale_vocabulary.add(field)
+                postings[word].add(doc_id)
+        for trigram in self._doc_trigrams(words):
+            self._trigram_postings.setdefault(trigram, set()).add(doc_id)
+        self._names[doc_id] = name
+        self._digests[doc_id] = digest
+        self._words[doc_id] = words
+        return doc_id
+
+    def _remove(self, doc_id):
+        words = self._words[doc_id]
+        for field, field_words in words.items():
+            postings = self._postings[field]
+            for word in field_words:
+                postings[word].discard(doc_id)
+                if not postings[word]:
+                    del postings[word]
+                    self._stale_vocabulary.add(field)
+        for trigram in self._doc_trigrams(words):
+            ids = self._trigram_postings[trigram]
+            ids.discard(doc_id)
+            if not ids:
+                del self._trigram_postings[trigram]
+        self._names[doc_id] = self._digests[doc_id] = self._words[doc_id] = None
+        self._free_ids.append(doc_id)
+
+    @staticmethod
+    def _doc_trigrams(words):
+        trigrams = set()
+        for field in ('name', 'bundle_identifier'):
+            for word in words[field]:
+                trigrams |= _trigrams(word)
+        return trigrams
+
+    def search(self, query, limit=SEARCH_DEFAULT_LIMIT):
+        """Names matching every word of query, best first
+
+        A word matches a whole or leading part of a word in any field, or is
+        close enough to a name or bundle ID word by shared trigrams to survive
+        a typo. Matches are weighted by field and summed over the query's words.
+        """
+        words = _search_words(query)
+        if not words:
+            return []
+        with self._lock:
+            for field in self._stale_vocabulary:
+                self._vocabulary[field] = sorted(self._postings[field])
+            self._stale_vocabulary.clear()
+
+            scores = None
+            # Longer words usually match fewer apps; later words only score what is left
+            for word in sorted(set(words), key=len, reverse=True):
+                word_scores = self._match_word(word, None if scores is None else scores.keys())
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {doc_id: score + word_scores[doc_id]
+                              for doc_id, score in scores.items() if doc_id in word_scores}
+                if not scores:
+                    return []
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self._names[item[0]]))
+            return [self._names[doc_id] for doc_id, _ in best]
+
+    def _match_word(self, word, within=None):
+        """{doc_id: score} for one query word: the best way each document matches it
+
+        Only documents in within are considered, if given. Typo-tolerant
+        trigram matching is the fallback for words nothing contains verbatim.
+        """
+        scores = {}
+
+        def credit(doc_ids, score):
+            if within is not None:
+                doc_ids = within & doc_ids
+            for doc_id in doc_ids:
+                if score > scores.get(doc_id, 0):
+                    scores[doc_id] = score
+
+        for field, weight in SEARCH_FIELD_WEIGHTS:
+            postings = self._postings[field]
+            vocabulary = self._vocabulary[field]
+            position = bisect.bisect_left(vocabulary, word)
+            while position < len(vocabulary) and vocabulary[position].startswith(word):
+                indexed_word = vocabulary[position]
+                credit(postings[indexed_word], weight if indexed_word == word else weight * SEARCH_PREFIX_FACTOR)
+                position += 1
+
+        if not scores and len(word) >= SEARCH_FUZZY_MIN_LENGTH:
+            trigrams = _trigrams(word, whole_word=False)
+            needed = math.ceil(len(trigrams) * SEARCH_FUZZY_MIN_SIMILARITY)
+            # A document sharing `needed` trigrams must share one of the rarest len - needed + 1
+            postings = sorted((self._trigram_postings.get(trigram, set()) for trigram in trigrams), key=len)
+            candidates = set().union(*postings[:len(postings) - needed + 1])
+            if within is not None:
+                candidates &= within
+            for doc_id in candidates:
+                shared = sum(1 for ids in postings if doc_id in ids)
+                if shared >= needed:
+                    credit((doc_id,), SEARCH_FUZZY_WEIGHT * shared / len(trigrams))
+        return scores
+
+def _natural_key(value):
+    """Sort key comparing digit runs as numbers, so 10.2 sorts after 9.1"""
+    parts = re.split(r'(\d+)', str(value).lower())
+    return [int(part) if i % 2 else part for i, part in enumerate(parts)]
+
+class CatalogSnapshot:
+    """Normalized applications loaded from one version of applications.json"""
+
+    def __init__(self, applications, signature):
+        self.applications = applications
+        self.names = sorted(applications)
+        # (mtime_ns, size) of the file this snapshot was loaded from
+        self.signature = signature
+        self._orders = {('name', False): self.names}
+
+    def sorted_names(self, field, descending=False):
+        """Names ordered by a SORTABLE_FIELDS column, apps without a value last; cached per snapshot"""
+        order = self._orders.get((field, descending))
+        if order is None:
+            values = {name: name if field == 'name' else self.applications[name][field] for name in self.names}
+            present = [name for name in self.names if values[name] not in ('', None)]
+            missing = [name for name in self.names if values[name] in ('', None)]
+            if field in NUMERIC_FIELDS:
+                key = values.get
+            else:
+                key = lambda name: _natural_key(values[name])
+            order = sorted(present, key=key, reverse=descending) + missing
+            self._orders[(field, descending)] = order
+        return order
+
+class ApplicationCatalog:
+    """Process-wide catalog that reloads applications.json only when it changes
+
+    Readers always get a complete snapshot: a reload builds a new snapshot and
+    swaps it in with a single assignment, so concurrent requests see either the
+    old catalog or the new one, never a half-loaded state.
+    """
+
+    def __init__(self, path, check_interval=CATALOG_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.search_index = SearchIndex()
+        self._snapshot = CatalogSnapshot({}, None)
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, force_check=False):
+        """Return the current snapshot, reloading first if the file changed"""
+        now = time.monotonic()
+        if (not force_check and self._checked_at is not None
+                and now - self._checked_at < self.check_interval):
+            return self._snapshot
+        self._checked_at = now
+
+        signature = self._file_signature()
+        if signature == self._snapshot.signature:
+            return self._snapshot
+        with self._lock:
+            if signature != self._snapshot.signature:
+                self._reload(signature)
+        return self._snapshot
+
+    def get(self, app_name):
+        """O(1) lookup of one normalized application, or None"""
+        return self.snapshot().applications.get(app_name)
+
+    def search(self, query, limit=SEARCH_DEFAULT_LIMIT):
+        """Ranked (name, application) pairs from the in-memory search index"""
+        snapshot = self.snapshot()
+        return [(name, snapshot.applications[name]) for name in self.search_index.search(query, limit)
+                if name in snapshot.applications]
+
+    def _file_signature(self):
+        try:
+            stat_info = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat_info.st_mtime_ns, stat_info.st_size)
+
+    def _reload(self, signature):
+        if signature is None:
+            self.search_index.update({})
+            self._snapshot = CatalogSnapshot({}, None)
+            return
+        try:
+            if os.path.splitext(self.path)[1] in ('.ndjson', '.jsonl'):
+                # Indexed by byte offset rather than loaded; records are read on demand
+                applications = NdjsonRecords(self.path)
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    applications_data = json.load(f)
+                applications = {name: normalize_application(data) for name, data in applications_data.items()}
+        except (OSError, ValueError) as e:
+            # Keep serving the previous snapshot; the next check retries the load
+            app.logger.warning('Could not load %s: %s', self.path, e)
+            return
+        # Index before swapping, so search results always name apps the snapshot has
+        self.search_index.update(applications)
+        self._snapshot = CatalogSnapshot(applications, signature)
+
+catalog = ApplicationCatalog(APPLICATIONS_CATALOG)
+
 def load_applications():
-    """Load applications data from the JSON file"""
-    json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'applications.json')
-    with open(json_path, 'r') as f:
-        return json.load(f)
+    """Return the normalized applications from the process-wide catalog"""
+    return catalog.snapshot().applications
+
+_catalog_store = None
+_catalog_store_lock = threading.Lock()
+
+def get_catalog_store():
+    """The SQLite catalog if the builder has written one, else None"""
+    global _catalog_store
+    if _catalog_store is None and os.path.exists(APPLICATIONS_DB):
+        with _catalog_store_lock:
+            if _catalog_store is None:
+                _catalog_store = CatalogStore(APPLICATIONS_DB)
+    return _catalog_store
+
+web_metrics = Metrics()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count requests and time them per endpoint (streams only until their headers are sent)"""
+    endpoint = request.endpoint or 'unmatched'
+    web_metrics.inc('http_requests_total', endpoint=endpoint, status=response.status_code)
+    started = g.get('request_started')
+    if started is not None:
+        web_metrics.observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+    return response
+
+_fingerprints = {}
+
+def file_fingerprint(path):
+    """Short content hash of a file, recomputed only when its mtime or size changes"""
+    try:
+        stat_info = os.stat(path)
+    except OSError:
+        return ''
+    key = (path, stat_info.st_mtime_ns, stat_info.st_size)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        with open(path, 'rb') as f:
+            fingerprint = hashlib.sha256(f.read()).hexdigest()[:12]
+        _fingerprints[key] = fingerprint
+    return fingerprint
+
+def _static_fingerprint(filename):
+    return file_fingerprint(os.path.join(app.static_folder, filename))
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """Add ?v=<content hash> to url_for('static', ...) so changed assets get new URLs"""
+    if endpoint == 'static' and 'filename' in values:
+        values.setdefault('v', _static_fingerprint(values['filename']))
+
+def _make_etag(*parts):
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+def _catalog_validators(snapshot, *extra):
+    """ETag and Last-Modified for a response derived from a catalog snapshot"""
+    last_modified = None
+    if snapshot.signature is not None:
+        last_modified = datetime.datetime.fromtimestamp(snapshot.signature[0] / 1e9, datetime.timezone.utc)
+    return _make_etag(snapshot.signature, *extra), last_modified
+
+def conditional_response(etag, last_modified, build):
+    """304 if the client's copy is current, else the response from build(); both tagged
+
+    Checking before building means an unchanged catalog costs no rendering.
+    """
+    if request.method in ('GET', 'HEAD') and not is_resource_modified(
+            request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        response = app.make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Cache, but revalidate every time: the catalog can change at any moment
+    response.cache_control.no_cache = True
+    return response
+
+def _accepted_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+@app.after_request
+def compress_and_cache(response):
+    """Compress eligible responses and mark fingerprinted static files immutable"""
+    if request.endpoint == 'static' and response.status_code in (200, 304):
+        filename = request.view_args.get('filename', '')
+        if request.args.get('v') and request.args.get('v') == _static_fingerprint(filename):
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+
+    # Generated streams (SSE) are left alone; files from send_file can be read whole
+    if (response.status_code != 200 or (response.is_streamed and not response.direct_passthrough)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _accepted_encoding()
+    if encoding is None:
+        return response
+    # send_file hands over a file wrapper; read it so it can be compressed
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(brotli.compress(data) if encoding == 'br' else gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # Same content, different bytes: only a weak validator still applies
+        response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/')
 def index():
-    """Main page displaying all applications"""
-    applications_data = load_applications()
-    # Convert the new structure to the format expected by the template
-    applications = {}
-    for app_name, app_data in applications_data.items():
-        if isinstance(app_data, dict):
-            # New structure with metadata
-            applications[app_name] = {
-                'description': app_data.get('description', ''),
-                'version': app_data.get('version', ''),
-                'copyright': app_data.get('copyright', ''),
-                'bundle_identifier': app_data.get('bundle_identifier', ''),
-                'path': app_data.get('path', ''),
-                'created': app_data.get('created', ''),
-                'modified': app_data.get('modified', ''),
-                'CFBundleDescription': app_data.get('CFBundleDescription', '')
-            }
-        else:
-            # Fallback for old structure (string description)
-            applications[app_name] = {
-                'description': app_data,
-                'version': '',
-                'copyright': '',
-                'bundle_identifier': '',
-                'path': '',
-                'created': '',
-                'modified': '',
-                'CFBundleDescription': ''
-            }
-    return render_template('index.html', applications=applications)
+    """Page shell; the table loads its rows from /api/applications as they scroll into view"""
+    snapshot = catalog.snapshot()
+    template_path = os.path.join(app.root_path, app.template_folder, 'index.html')
+    etag, last_modified = _catalog_validators(
+        snapshot, file_fingerprint(template_path),
+        _static_fingerprint('app.css'), _static_fingerprint('app.js'))
+    return conditional_response(etag, last_modified, lambda: render_template(
+        'index.html', application_count=len(snapshot.applications)))
+
+def _api_error(message):
+    return jsonify({'success': False, 'message': message}), 400
+
+@app.route('/api/applications')
+def api_applications():
+    """Paginated catalog: ?cursor=<offset>&limit=<n>&fields=<a,b>&q=<filter>&sort=[-]<field>"""
+    try:
+        offset = max(0, int(request.args.get('cursor') or 0))
+        limit = min(API_MAX_LIMIT, max(1, int(request.args.get('limit') or API_DEFAULT_LIMIT)))
+    except ValueError:
+        return _api_error('cursor and limit must be integers')
+
+    fields = tuple(field for field in request.args.get('fields', '').split(',') if field) or API_DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        return _api_error(f'Unknown field(s): {", ".join(unknown)}')
+
+    sort = request.args.get('sort', 'name')
+    sort_field, descending = sort.lstrip('-'), sort.startswith('-')
+    if sort_field not in SORTABLE_FIELDS:
+        return _api_error(f'Cannot sort by {sort_field}')
+
+    snapshot = catalog.snapshot()
+    query = request.args.get('q', '').strip().lower()
+
+    def build():
+        names = snapshot.sorted_names(sort_field, descending)
+        if query:
+            names = [name for name in names
+                     if query in name.lower() or query in snapshot.applications[name]['description'].lower()]
+
+        items = []
+        for name in names[offset:offset + limit]:
+            app_data = snapshot.applications[name]
+            items.append({field: name if field == 'name' else app_data[field] for field in fields})
+        next_offset = offset + limit
+        return jsonify({
+            'items': items,
+            'next_cursor': str(next_offset) if next_offset < len(names) else None,
+            'total': len(names)
+        })
+
+    # The ETag covers the catalog version; the URL already identifies the page
+    etag, last_modified = _catalog_validators(snapshot)
+    return conditional_response(etag, last_modified, build)
+
+@app.route('/search')
+def search():
+    """Ranked search: ?q=<words>&limit=<n>&fields=<a,b>, from the SQLite catalog if present, else the in-memory index"""
+    try:
+        limit = min(API_MAX_LIMIT, max(1, int(request.args.get('limit') or SEARCH_DEFAULT_LIMIT)))
+    except ValueError:
+        return _api_error('limit must be an integer')
+    fields = tuple(field for field in request.args.get('fields', '').split(',') if field) or API_DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        return _api_error(f'Unknown field(s): {", ".join(unknown)}')
+    query = request.args.get('q', '').strip()
+
+    store = get_catalog_store()
+    if store is not None:
+        engine = 'fts5' if store.has_fts else 'sqlite'
+        etag, last_modified = _make_etag(engine, store.signature()), None
+    else:
+        engine = 'trigram'
+        etag, last_modified = _catalog_validators(catalog.snapshot(), engine)
+
+    def build():
+        matches = store.search(query, limit) if store is not None else catalog.search(query, limit)
+        items = [{field: name if field == 'name' else app_data.get(field, '') for field in fields}
+                 for name, app_data in matches]
+        return jsonify({'items': items, 'count': len(items), 'engine': engine})
+
+    return conditional_response(etag, last_modified, build)
 
 @app.route('/copy-description', methods=['POST'])
 def copy_description():
     """HTMX endpoint to copy description to clipboard"""
     app_name = request.form.get('app_name')
-    applications_data = load_applications()
-    app_data = applications_data.get(app_name, {})
-    
-    if isinstance(app_data, dict):
-        description = app_data.get('description', '')
-    else:
-        # Fallback for old structure
-        description = app_data if app_data else ''
+    store = get_catalog_store()
+    # An indexed lookup when the SQLite catalog exists, else the in-memory snapshot
+    app_data = (store.get(app_name) if store is not None else catalog.get(app_name)) or {}
+    description = app_data.get('description', '')
     
     return jsonify({
         'success': True,
@@ -64,108 +686,213 @@ def copy_description():
         'description': description
     })
 
-@app.route('/refresh-applications', methods=['POST'])
-def refresh_applications():
-    """Refresh applications.json by running the metadata builder"""
-    import subprocess
-    import os
-    
-    try:
-        # Get the path to the metadata builder script
-        script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app_metadata_builder.py')
-        
-        # Run the metadata builder script
-        result = subprocess.run(
-            [sys.executable, script_path],
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(script_path)
-        )
-        
-        if result.returncode == 0:
-            # Reload applications after successful update
-            applications = load_applications()
-            return jsonify({
-                'success': True,
-                'message': f'Successfully refreshed {len(applications)} applications',
-                'count': len(applications)
-            })
+class RefreshJob:
+    """One run of the metadata builder; progress events are kept in a ring buffer
+
+    Events are numbered so subscribers can replay what they missed: a client
+    reconnecting with Last-Event-ID gets everything after that event that is
+    still in the buffer.
+    """
+
+    def __init__(self, buffer_size=REFRESH_EVENT_BUFFER):
+        self.id = uuid.uuid4().hex[:12]
+        self.state = 'running'
+        self.started_at = time.time()
+        self.finished_at = None
+        self.return_code = None
+        self._events = collections.deque(maxlen=buffer_size)
+        self._next_seq = 1
+        self._condition = threading.Condition()
+
+    def publish(self, event_type, message, **fields):
+        """Append an event and wake every subscriber"""
+        with self._condition:
+            event = dict(fields, seq=self._next_seq, type=event_type, message=message)
+            self._next_seq += 1
+            self._events.append(event)
+            self._condition.notify_all()
+
+    def finish(self, state, return_code=None):
+        with self._condition:
+            self.state = state
+            self.return_code = return_code
+            self.finished_at = time.time()
+            self._condition.notify_all()
+
+    def events_after(self, seq, timeout):
+        """Buffered events newer than seq, waiting up to timeout for one to arrive
+
+        Returns (events, finished); once finished is True no more events will follow.
+        """
+        with self._condition:
+            if self.state == 'running' and self._next_seq - 1 <= seq:
+                self._condition.wait(timeout)
+            events = [event for event in self._events if event['seq'] > seq]
+            return events, self.state != 'running'
+
+    def status(self):
+        with self._condition:
+            return {
+                'id': self.id,
+                'state': self.state,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'return_code': self.return_code,
+                'events': self._next_seq - 1
+            }
+
+class RefreshJobManager:
+    """Runs at most one metadata build at a time; later requests attach to it"""
+
+    def __init__(self, runner):
+        # runner(job) performs the build, publishing progress, and returns an exit code
+        self.runner = runner
+        self._job = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Return (job, started): the running job, or a newly started one"""
+        with self._lock:
+            if self._job is not None and self._job.state == 'running':
+                return self._job, False
+            job = RefreshJob()
+            self._job = job
+        threading.Thread(target=self._run, args=(job,), name=f'refresh-{job.id}', daemon=True).start()
+        return job, True
+
+    def current(self):
+        """The running job, or the last one to finish, or None"""
+        return self._job
+
+    def _run(self, job):
+        try:
+            return_code = self.runner(job)
+        except Exception as e:
+            job.publish('error', f'Error: {str(e)}')
+            job.finish('failed')
+            return
+        if return_code == 0:
+            applications = catalog.snapshot(force_check=True).applications
+            job.publish('success', f'Successfully refreshed {len(applications)} applications',
+                        count=len(applications))
+            job.finish('succeeded', return_code)
         else:
-            return jsonify({
-                'success': False,
-                'message': f'Error running metadata builder: {result.stderr}'
-            }), 500
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error refreshing applications: {str(e)}'
-        }), 500
+            job.publish('error', f'Process failed with return code {return_code}')
+            job.finish('failed', return_code)
 
-def _stream_process_output(process):
-    """Stream process output line by line."""
-    import time
-    while True:
-        line = process.stdout.readline()
-        if not line and process.poll() is not None:
-            break
-        if line:
-            yield f"data: {json.dumps({'type': 'output', 'message': line.strip()})}\n\n"
-            time.sleep(0.01)
-
-def _wait_for_process_completion(process):
-    """Wait for process completion with timeout."""
-    yield f"data: {json.dumps({'type': 'output', 'message': 'Waiting for process to complete...'})}\n\n"
+def run_builder_in_process(job, **settings):
+    """Run the metadata builder on the job's thread, publishing its typed progress events
+
+    Events keep the builder's structure (batch numbers, counts, timings) instead
+    of scraped output lines; the run summary is published before the job ends.
+    settings override build options such as roots or goose.
+    """
+    settings.setdefault('output', APPLICATIONS_CATALOG)
+    settings.setdefault('store', APPLICATIONS_DB if os.path.exists(APPLICATIONS_DB) else None)
+    options = app_metadata_builder.build_options(**settings)
+
+    def on_progress(event):
+        fields = dict(event)
+        job.publish(fields.pop('type'), fields.pop('message'), **fields)
+
+    def on_result(batch_results):
+        job.publish('result', f'{len(batch_results)} application(s) described',
+                    applications=sorted(batch_results))
+
+    job.publish('output', 'Starting metadata builder...')
+    summary = app_metadata_builder.build_catalog(options, on_progress, on_result)
+    job.publish('summary', 'Metadata builder finished', summary=summary)
+    return 0
+
+refresh_jobs = RefreshJobManager(run_builder_in_process)
+
+def _parse_last_event_id(value):
+    """Split an SSE Last-Event-ID of the form '<job id>:<seq>'"""
+    job_id, _, seq = (value or '').partition(':')
     try:
-        return_code = process.wait(timeout=300)  # 5 minute timeout
-        yield f"data: {json.dumps({'type': 'output', 'message': f'Process completed with return code: {return_code}'})}\n\n"
-        return return_code
-    except subprocess.TimeoutExpired:
-        process.kill()
-        yield f"data: {json.dumps({'type': 'error', 'message': 'Process timed out after 5 minutes'})}\n\n"
-        return None
+        return job_id, int(seq)
+    except ValueError:
+        return None, 0
 
-def _handle_process_result(return_code):
-    """Handle process completion result."""
-    if return_code == 0:
-        applications = load_applications()
-        yield f"data: {json.dumps({'type': 'success', 'message': f'Successfully refreshed {len(applications)} applications', 'count': len(applications)})}\n\n"
-    else:
-        yield f"data: {json.dumps({'type': 'error', 'message': f'Process failed with return code {return_code}'})}\n\n"
+def _format_sse(job, event):
+    return f"id: {job.id}:{event['seq']}\ndata: {json.dumps(event)}\n\n"
+
+def _stream_job_events(job, after_seq):
+    """Yield SSE messages for a job until it finishes, with keep-alives while idle"""
+    while True:
+        events, finished = job.events_after(after_seq, timeout=SSE_KEEPALIVE_INTERVAL)
+        for event in events:
+            after_seq = event['seq']
+            yield _format_sse(job, event)
+        if finished:
+            return
+        if not events:
+            yield ': keep-alive\n\n'
+
+@app.route('/refresh-applications', methods=['POST'])
+def refresh_applications():
+    """Start a refresh, or attach to the one already running, without waiting for it"""
+    job, started = refresh_jobs.start()
+    return jsonify({
+        'success': True,
+        'message': 'Refresh started' if started else 'Refresh already running',
+        'started': started,
+        'job': job.status()
+    }), 202
+
+@app.route('/refresh-status')
+def refresh_status():
+    """Status of the running or most recent refresh; never starts a build"""
+    job = refresh_jobs.current()
+    return jsonify({'job': job.status() if job else None, 'running': bool(job and job.state == 'running')})
 
 @app.route('/refresh-applications-stream')
 def refresh_applications_stream():
-    """Stream the refresh process with real-time output"""
-    def generate():
-        try:
-            yield f"data: {json.dumps({'type': 'output', 'message': 'Starting metadata builder...'})}\n\n"
-            
-            script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app_metadata_builder.py')
-            yield f"data: {json.dumps({'type': 'output', 'message': f'Script path: {script_path}'})}\n\n"
-            
-            process = subprocess.Popen(
-                [sys.executable, script_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=0,
-                universal_newlines=True,
-                cwd=os.path.dirname(script_path),
-                env=dict(os.environ, PYTHONUNBUFFERED='1')
-            )
-            
-            yield f"data: {json.dumps({'type': 'output', 'message': 'Process started, streaming output...'})}\n\n"
-            
-            yield from _stream_process_output(process)
-            return_code = yield from _wait_for_process_completion(process)
-            
-            if return_code is not None:
-                yield from _handle_process_result(return_code)
-                
-        except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Error: {str(e)}'})}\n\n"
-    
-    return Response(generate(), mimetype='text/event-stream')
+    """Stream refresh progress as server-sent events
+
+    Clients reconnecting with Last-Event-ID resume the same job from where they
+    left off; other clients start a refresh or attach to the running one and
+    receive its buffered progress first.
+    """
+    job_id, after_seq = _parse_last_event_id(
+        request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    job = refresh_jobs.current()
+    if job is None or job.id != job_id:
+        job, _ = refresh_jobs.start()
+        after_seq = 0
+    return Response(_stream_job_events(job, after_seq), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _load_builder_report():
+    try:
+        with open(BUILDER_REPORT, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition: web app metrics plus those of the last builder run"""
+    web_metrics.set('catalog_applications', len(load_applications()))
+    job = refresh_jobs.current()
+    web_metrics.set('refresh_running', int(bool(job and job.state == 'running')))
+    text = web_metrics.to_prometheus(prefix='app_metadata_web_')
+
+    # Builds started from here run in-process, so their metrics are live;
+    # otherwise report on the last run of the command line builder
+    report = _load_builder_report() if job is None else None
+    if job is not None:
+        text += app_metadata_builder.METRICS.to_prometheus(prefix='app_metadata_builder_')
+    elif report:
+        text += (
+            '# TYPE app_metadata_builder_last_run_timestamp_seconds gauge\n'
+            f"app_metadata_builder_last_run_timestamp_seconds {report.get('finished_at', 0)}\n"
+            '# TYPE app_metadata_builder_last_run_duration_seconds gauge\n'
+            f"app_metadata_builder_last_run_duration_seconds {report.get('duration_seconds', 0)}\n"
+        )
+        text += snapshot_to_prometheus(report.get('metrics', {}), prefix='app_metadata_builder_')
+    return Response(text, content_type='text/plain; version=0.0.4; charset=utf-8',
+                    headers={'Cache-Control': 'no-store'})
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=1337) 
\ No newline at end of file
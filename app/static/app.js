@@ -72,9 +72,7 @@ function refreshApplications() {
     eventSource.onmessage = function(event) {
         const data = JSON.parse(event.data);
         
-        if (data.type === 'output') {
-            addStatusLine(data.message);
-        } else if (data.type === 'success') {
+        if (data.type === 'success') {
             addStatusLine('✅ ' + data.message);
             showNotification(data.message);
             eventSource.close();
@@ -97,10 +95,21 @@ function refreshApplications() {
             // Reset button
             refreshBtn.disabled = false;
             refreshBtn.textContent = originalText;
+        } else if (data.type === 'batch_finished') {
+            addStatusLine(`Batch ${data.batch}: ${data.described}/${data.apps} described in ${data.seconds}s`);
+        } else if (data.type !== 'debug' && data.type !== 'result') {
+            // Progress events from the builder: output, plan, batch_started, retry_*, saved, ...
+            addStatusLine(data.message.trim());
         }
     };
     
     eventSource.onerror = function() {
+        // The browser reconnects on its own and sends Last-Event-ID, so the
+        // server replays whatever progress was missed in the meantime
+        if (eventSource.readyState === EventSource.CONNECTING) {
+            addStatusLine('⚠️ Connection lost, reconnecting...');
+            return;
+        }
         addStatusLine('❌ Connection error');
         showNotification('Error: Connection lost');
         eventSource.close();
@@ -133,46 +142,235 @@ function addStatusLine(message) {
     output.scrollTop = output.scrollHeight;
 }
 
-// Add search functionality and copy event listeners
-document.addEventListener('DOMContentLoaded', function() {
-    const searchInput = document.querySelector('.search-input');
-    const gridRows = document.querySelectorAll('.applications-grid .grid-row');
-    
-    // Add copy functionality for clickable descriptions
-    document.querySelectorAll('.app-description.copyable').forEach(element => {
-        element.addEventListener('click', function() {
-            const description = this.getAttribute('data-description');
-            const appName = this.getAttribute('data-app-name');
-            copyToClipboard(description, appName);
-        });
-    });
-    
-    // Add copy functionality for copy buttons
-    document.querySelectorAll('.copy-button').forEach(button => {
-        button.addEventListener('click', function() {
-            const description = this.getAttribute('data-description');
-            const appName = this.getAttribute('data-app-name');
-            copyToClipboard(description, appName);
+// Virtualized applications table: rows are fetched from /api/applications a
+// page at a time and only the rows inside the visible window are in the DOM.
+const ROW_HEIGHT = 72;      // must match .applications-rows .grid-row in app.css
+const PAGE_SIZE = 100;
+const OVERSCAN_ROWS = 10;
+const TABLE_FIELDS = 'name,description,version,size_bytes,file_count,architectures,copyright';
+const SEARCH_LIMIT = 500;   // /search returns at most this many ranked matches
+const SEARCH_DEBOUNCE_MS = 150;
+
+const applicationsTable = {
+    query: '',
+    sort: 'name',
+    total: 0,
+    rows: [],
+    pages: new Map(),
+    generation: 0,
+    controller: null,
+    renderPending: false
+};
+
+function resetApplicationsTable(query) {
+    applicationsTable.query = query;
+    applicationsTable.total = 0;
+    applicationsTable.rows = [];
+    applicationsTable.pages = new Map();
+    applicationsTable.generation += 1;
+    document.getElementById('applications-viewport').scrollTop = 0;
+    loadApplicationsPage(0).then(scheduleRender);
+}
+
+function searchUrl(query) {
+    // Ranked results from the server's search index, all in one response
+    const params = new URLSearchParams({q: query, limit: SEARCH_LIMIT, fields: TABLE_FIELDS});
+    return `/search?${params}`;
+}
+
+function loadApplicationsPage(page) {
+    if (applicationsTable.pages.has(page)) {
+        return applicationsTable.pages.get(page);
+    }
+    if (applicationsTable.query && page > 0) {
+        // Search results arrive in one response; every page shares it
+        const request = loadApplicationsPage(0);
+        applicationsTable.pages.set(page, request);
+        return request;
+    }
+    const generation = applicationsTable.generation;
+    let url;
+    if (applicationsTable.query) {
+        url = searchUrl(applicationsTable.query);
+    } else {
+        const params = new URLSearchParams({
+            cursor: page * PAGE_SIZE,
+            limit: PAGE_SIZE,
+            fields: TABLE_FIELDS,
+            sort: applicationsTable.sort
         });
-    });
-    
-    searchInput.addEventListener('input', function() {
-        const searchTerm = this.value.toLowerCase();
-        
-        gridRows.forEach(row => {
-            // Skip the header row
-            if (row.querySelector('.grid-header')) {
+        url = `/api/applications?${params}`;
+    }
+    if (applicationsTable.controller) {
+        // A newer query replaces the one still in flight
+        applicationsTable.controller.abort();
+    }
+    const controller = applicationsTable.query ? new AbortController() : null;
+    applicationsTable.controller = controller;
+    const request = fetch(url, controller ? {signal: controller.signal} : {})
+        .then(response => response.json())
+        .then(data => {
+            // Ignore pages that belong to a search the user has since replaced
+            if (generation !== applicationsTable.generation) {
                 return;
             }
-            
-            const appName = row.querySelector('.app-name').textContent.toLowerCase();
-            const description = row.querySelector('.app-description').textContent.toLowerCase();
-            
-            if (appName.includes(searchTerm) || description.includes(searchTerm)) {
-                row.style.display = '';
-            } else {
-                row.style.display = 'none';
+            applicationsTable.total = data.total !== undefined ? data.total : data.count;
+            data.items.forEach((item, i) => {
+                applicationsTable.rows[page * PAGE_SIZE + i] = item;
+            });
+        })
+        .catch(err => {
+            if (err.name !== 'AbortError') {
+                console.error('Failed to load applications: ', err);
             }
+            applicationsTable.pages.delete(page);
         });
+    applicationsTable.pages.set(page, request);
+    return request;
+}
+
+function scheduleRender() {
+    if (applicationsTable.renderPending) {
+        return;
+    }
+    applicationsTable.renderPending = true;
+    requestAnimationFrame(() => {
+        applicationsTable.renderPending = false;
+        renderVisibleRows();
+    });
+}
+
+function formatBytes(bytes) {
+    // Footprint columns are empty until the builder runs with --analyze
+    if (bytes === '' || bytes === undefined) {
+        return '';
+    }
+    const units = ['B', 'KB', 'MB', 'GB', 'TB'];
+    let unit = 0;
+    while (bytes >= 1024 && unit < units.length - 1) {
+        bytes /= 1024;
+        unit += 1;
+    }
+    return `${bytes.toFixed(unit && bytes < 10 ? 1 : 0)} ${units[unit]}`;
+}
+
+function setSortOrder(field) {
+    // Clicking the current column again reverses it
+    const sort = applicationsTable.sort === field ? `-${field}` : field;
+    document.querySelectorAll('.grid-header.sortable').forEach(header => {
+        header.classList.toggle('sort-asc', header.dataset.sort === sort);
+        header.classList.toggle('sort-desc', `-${header.dataset.sort}` === sort);
     });
-}); 
\ No newline at end of file
+    applicationsTable.sort = sort;
+    resetApplicationsTable(applicationsTable.query);
+}
+
+function createGridItem(className, text) {
+    const item = document.createElement('div');
+    item.className = 'grid-item ' + className;
+    item.textContent = text;
+    return item;
+}
+
+function createApplicationRow(index, app) {
+    const row = document.createElement('div');
+    row.className = 'grid-row';
+    row.dataset.index = index;
+    if (!app) {
+        row.appendChild(createGridItem('app-name', 'Loading…'));
+        return row;
+    }
+
+    row.appendChild(createGridItem('app-name', app.name));
+    const description = createGridItem('app-description copyable', '');
+    const descriptionText = document.createElement('span');
+    descriptionText.textContent = app.description;
+    description.title = app.description;
+    description.appendChild(descriptionText);
+    row.appendChild(description);
+    row.appendChild(createGridItem('app-version', app.version));
+    row.appendChild(createGridItem('app-size', formatBytes(app.size_bytes)));
+    row.appendChild(createGridItem('app-files', app.file_count === '' ? '' : app.file_count.toLocaleString()));
+    row.appendChild(createGridItem('app-architectures',
+        Array.isArray(app.architectures) ? app.architectures.join(', ') : ''));
+    row.appendChild(createGridItem('app-copyright', app.copyright));
+
+    const action = createGridItem('', '');
+    const button = document.createElement('button');
+    button.className = 'copy-button';
+    button.textContent = 'Copy';
+    action.appendChild(button);
+    row.appendChild(action);
+    return row;
+}
+
+function renderVisibleRows() {
+    const viewport = document.getElementById('applications-viewport');
+    const rowsContainer = document.getElementById('applications-rows');
+    const total = applicationsTable.total;
+    document.getElementById('applications-spacer').style.height = `${total * ROW_HEIGHT}px`;
+
+    if (total === 0) {
+        const empty = document.createElement('div');
+        empty.className = 'applications-empty';
+        empty.textContent = applicationsTable.pages.size ? 'No applications found' : 'Loading…';
+        rowsContainer.style.transform = '';
+        rowsContainer.replaceChildren(empty);
+        return;
+    }
+
+    const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+    const last = Math.min(
+        total,
+        Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN_ROWS
+    );
+
+    // Fetch any page in the window that hasn't been requested yet
+    for (let page = Math.floor(first / PAGE_SIZE); page <= Math.floor((last - 1) / PAGE_SIZE); page++) {
+        if (!applicationsTable.pages.has(page)) {
+            loadApplicationsPage(page).then(scheduleRender);
+        }
+    }
+
+    const rows = [];
+    for (let index = first; index < last; index++) {
+        rows.push(createApplicationRow(index, applicationsTable.rows[index]));
+    }
+    rowsContainer.style.transform = `translateY(${first * ROW_HEIGHT}px)`;
+    rowsContainer.replaceChildren(...rows);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.querySelector('.search-input');
+    const viewport = document.getElementById('applications-viewport');
+    const rowsContainer = document.getElementById('applications-rows');
+    let searchTimer = null;
+
+    // One listener handles copying for every row, including rows rendered later
+    rowsContainer.addEventListener('click', function(event) {
+        const target = event.target.closest('.app-description, .copy-button');
+        const row = event.target.closest('.grid-row');
+        if (!target || !row) {
+            return;
+        }
+        const app = applicationsTable.rows[Number(row.dataset.index)];
+        if (app) {
+            copyToClipboard(app.description, app.name);
+        }
+    });
+
+    document.querySelectorAll('.grid-header.sortable').forEach(header => {
+        header.addEventListener('click', () => setSortOrder(header.dataset.sort));
+    });
+
+    viewport.addEventListener('scroll', scheduleRender);
+    window.addEventListener('resize', scheduleRender);
+
+    searchInput.addEventListener('input', function() {
+        clearTimeout(searchTimer);
+        const query = this.value.trim();
+        searchTimer = setTimeout(() => resetApplicationsTable(query), SEARCH_DEBOUNCE_MS);
+    });
+
+    resetApplicationsTable('');
+});
@@ -1,31 +1,209 @@
 #!/usr/bin/env python3
 """
-Generate descriptions for all apps in /Applications using Goose CLI.
+Generate descriptions for all apps in /Applications (or other roots) using Goose CLI.
 """
+import argparse
+import collections
+import concurrent.futures
+import ctypes
+import ctypes.util
+import functools
 import os
 import json
 import subprocess
-import sys
 import plistlib
+import random
+import re
+import select
+import shlex
+import struct
+import sys
+import tempfile
+import threading
+import time
 from jinja2 import Template
 
-BATCH_SIZE = 10
-
-
-def get_applications():
-    """Get all .app bundles from /Applications with their details."""
+from atomic_file import atomic_write
+from backend_pool import DEFAULT_ARGS, BackendPool
+from catalog_store import CatalogStore
+from fleet_merge import load_seed, release_key
+from metrics import METRICS
+from response_store import DEFAULT_MAX_MB, ResponseStore, backend_identity
+
+# Batches are packed by estimated prompt size (characters of app metadata)
+DEFAULT_PROMPT_BUDGET = 2000
+MIN_PROMPT_BUDGET = 300
+MAX_PROMPT_BUDGET = 12000
+MAX_BATCH_APPS = 50
+# Calls faster than this with every app described let the budget grow
+FAST_CALL_SECONDS = 30
+DEFAULT_JOBS = 4
+DEFAULT_ROOTS = ("/Applications",)
+SCAN_WORKERS = 8
+# --analyze walks this many bundles at once and reads at most this much of each executable
+ANALYZE_WORKERS = 4
+MACHO_HEADER_BYTES = 4096
+OUTPUT_FILE = "applications.json"
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt_template.j2")
+# Descriptions of well-known apps keyed by bundle identifier, resolved without Goose
+KNOWLEDGE_BASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_apps.json")
+# An Info.plist description needs this many words besides the app's name and version
+MIN_PLIST_DESCRIPTION_WORDS = 3
+# Command used to invoke Goose; GOOSE_BIN or --goose can point at another executable
+DEFAULT_GOOSE_COMMAND = os.environ.get("GOOSE_BIN", "goose")
+GOOSE_TIMEOUT = 120
+# Undescribed apps are retried in up to this many passes, re-submitting at most
+# DEFAULT_RETRY_BUDGET apps per run, with backoff between passes
+DEFAULT_RETRY_PASSES = 2
+DEFAULT_RETRY_BUDGET = 100
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 60.0
+# Watch mode: polling interval without inotify, quiet period before acting on
+# inotify events, and how often to rescan even if no event arrived
+DEFAULT_POLL_INTERVAL = 5.0
+WATCH_SETTLE_SECONDS = 1.0
+WATCH_RESCAN_SECONDS = 60
+
+# Catalog fields added by --analyze
+FOOTPRINT_FIELDS = ('size_bytes', 'file_count', 'architectures')
+# Mach-O magic numbers and CPU types (<mach-o/loader.h>, <mach-o/fat.h>, <mach/machine.h>)
+_FAT_MAGICS = {0xcafebabe: 20, 0xcafebabf: 32}
+_MACHO_MAGICS = (0xfeedface, 0xfeedfacf)
+_CPU_TYPES = {7: 'i386', 0x01000007: 'x86_64', 12: 'arm', 0x0100000c: 'arm64',
+              18: 'ppc', 0x01000012: 'ppc64'}
+_CPU_SUBTYPE_ARM64E = 2
+# Java class files share the universal binary magic; their "arch count" is a version >= 45
+_MAX_FAT_ARCHES = 44
+
+_ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[a-zA-Z]')
+# Version numbers (3.5.14, v2, (1234)) and copyright notices in Info.plist strings
+_VERSION_TOKEN = re.compile(r'^\(?v?\d+([.\-]\w+)*\)?[,;:]?$', re.IGNORECASE)
+_COPYRIGHT_NOTICE = re.compile(r'©|\(c\)|copyright|all rights reserved', re.IGNORECASE)
+_KEY_VALUE_PATTERN = re.compile(r'"([^\"]+)":\s*"([^\"]*)",?')
+# Characters the JSON object scanner stops at inside an object and inside a string
+_OBJECT_SPECIALS = re.compile(r'[{}"]')
+_STRING_SPECIALS = re.compile(r'["\\]')
+
+
+def _nested_object_pattern(levels):
+    """Regex for a JSON object nested at most ``levels`` deep.
+
+    Each level is an unrolled loop (plain text, then strings or inner objects
+    followed by plain text), so every character can match only one way and a
+    failed match backtracks linearly instead of exponentially.
+    """
+    string = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+    pattern = r'\{[^{}"]*(?:' + string + r'[^{}"]*)*\}'
+    for _ in range(levels - 1):
+        pattern = r'\{[^{}"]*(?:(?:' + string + '|' + pattern + r')[^{}"]*)*\}'
+    return pattern
+
+
+# Objects up to three levels deep, like the answer itself or tool-call output,
+# are consumed by one match; deeper or unfinished ones are scanned step by step
+_NESTED_OBJECT = re.compile(_nested_object_pattern(3))
+_CODE_FENCE = '```'
+
+_print_lock = threading.Lock()
+
+
+def _log(message):
+    """Print a line without interleaving output from concurrent batches."""
+    with _print_lock:
+        print(message, flush=True)
+
+
+class ProgressReporter:
+    """Sends typed progress events to a callback, or prints them when there is none.
+
+    Events are dicts with a ``type`` (e.g. 'batch_finished'), a human-readable
+    ``message`` and fields such as batch numbers and counts. The callback may be
+    called from batch worker threads.
+    """
+
+    def __init__(self, on_progress=None):
+        self.on_progress = on_progress
+
+    def __call__(self, event_type, message, **fields):
+        if self.on_progress is None:
+            _log(message)
+        else:
+            self.on_progress(dict(fields, type=event_type, message=message))
+
+
+_CONSOLE = ProgressReporter()
+
+
+@METRICS.timed('stage_duration_seconds', stage='scan')
+def get_applications(roots=DEFAULT_ROOTS, workers=SCAN_WORKERS):
+    """Get all .app bundles under the given roots with their details.
+
+    Roots are scanned in order with os.scandir, reusing each entry's type and
+    stat information, and Info.plist files are read on a thread pool. A bundle
+    reachable from more than one root (a symlink, or the same app installed
+    twice) is only reported for the first root it was found under.
+    """
+    entries = _scan_bundle_entries(roots)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        scanned = list(executor.map(_details_from_entry, entries))
+    return _dedupe_apps(scanned)
+
+
+def _scan_bundle_entries(roots):
+    """(DirEntry, stat result) for each distinct .app bundle under the roots, in root order."""
+    entries = []
+    seen_inodes = set()
+    for root in roots:
+        for entry in _iter_app_bundles(os.path.expanduser(root)):
+            try:
+                stat_info = entry.stat()
+            except OSError:
+                continue
+            inode = (stat_info.st_dev, stat_info.st_ino)
+            if inode not in seen_inodes:
+                seen_inodes.add(inode)
+                entries.append((entry, stat_info))
+    return entries
+
+
+def _dedupe_apps(scanned):
+    """Keep the first app seen for each name and bundle identifier, sorted by name."""
     apps = []
-    for f in os.listdir("/Applications"):
-        app_path = os.path.join("/Applications", f)
-        if f.endswith('.app') and os.path.isdir(app_path):
-            app_name = f.replace('.app', '')
-            app_details = get_app_details(app_path, app_name)
-            apps.append(app_details)
+    seen_names, seen_identifiers = set(), set()
+    for app in scanned:
+        identifier = app['bundle_identifier']
+        if app['name'] in seen_names or (identifier and identifier in seen_identifiers):
+            continue
+        seen_names.add(app['name'])
+        if identifier:
+            seen_identifiers.add(identifier)
+        apps.append(app)
     return sorted(apps, key=lambda x: x['name'])
 
 
-def get_app_details(app_path, app_name):
-    """Extract details from app bundle including Info.plist."""
+def _iter_app_bundles(root):
+    """Yield the directory entries of the .app bundles directly under root."""
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.name.endswith('.app') and entry.is_dir():
+                    yield entry
+    except OSError:
+        # Missing or unreadable roots (e.g. no ~/Applications) are skipped
+        return
+
+
+def _details_from_entry(item):
+    """get_app_details() for a (DirEntry, stat result) pair found by the scanner."""
+    entry, stat_info = item
+    return get_app_details(entry.path, entry.name.replace('.app', ''), stat_info)
+
+
+def get_app_details(app_path, app_name, stat_info=None):
+    """Extract details from app bundle including Info.plist.
+
+    ``stat_info`` is the bundle's stat result when the caller already has it.
+    """
     details = {
         'name': app_name,
         'path': app_path,
@@ -40,35 +218,35 @@ def get_app_details(app_path, app_name):
 
     # Try to read Info.plist for app metadata
     info_plist_path = os.path.join(app_path, 'Contents', 'Info.plist')
-    if os.path.exists(info_plist_path):
-        try:
-            with open(info_plist_path, 'rb') as f:
-                plist_data = plistlib.load(f)
+    try:
+        with open(info_plist_path, 'rb') as f:
+            plist_data = plistlib.load(f)
 
-            # Extract common metadata fields
-            if 'CFBundleDescription' in plist_data:
-                details['description'] = plist_data['CFBundleDescription']
-                details['CFBundleDescription'] = plist_data['CFBundleDescription']
-            elif 'CFBundleGetInfoString' in plist_data:
-                details['description'] = plist_data['CFBundleGetInfoString']
+        # Extract common metadata fields
+        if 'CFBundleDescription' in plist_data:
+            details['description'] = plist_data['CFBundleDescription']
+            details['CFBundleDescription'] = plist_data['CFBundleDescription']
+        elif 'CFBundleGetInfoString' in plist_data:
+            details['description'] = plist_data['CFBundleGetInfoString']
 
-            if 'CFBundleShortVersionString' in plist_data:
-                details['version'] = plist_data['CFBundleShortVersionString']
+        if 'CFBundleShortVersionString' in plist_data:
+            details['version'] = plist_data['CFBundleShortVersionString']
 
-            if 'CFBundleIdentifier' in plist_data:
-                details['bundle_identifier'] = plist_data['CFBundleIdentifier']
+        if 'CFBundleIdentifier' in plist_data:
+            details['bundle_identifier'] = plist_data['CFBundleIdentifier']
 
-            # Extract additional metadata fields
-            if 'CFBundleGetInfoString' in plist_data:
-                details['copyright'] = plist_data['CFBundleGetInfoString']
+        # Extract additional metadata fields
+        if 'CFBundleGetInfoString' in plist_data:
+            details['copyright'] = plist_data['CFBundleGetInfoString']
 
-        except Exception:
-            # Silently continue if we can't read the plist
-            pass
+    except Exception:
+        # Silently continue if the bundle has no readable plist
+        pass
 
     # Get file creation and modification times
     try:
-        stat_info = os.stat(app_path)
+        if stat_info is None:
+            stat_info = os.stat(app_path)
         details['created'] = str(stat_info.st_ctime)
         details['modified'] = str(stat_info.st_mtime)
     except Exception:
@@ -78,57 +256,256 @@ def get_app_details(app_path, app_name):
     return details
 
 
-def create_prompt_file(apps):
-    """Create a comprehensive prompt file for Goose CLI using Jinja2 templates."""
-    # Read the template file
-    template_path = "prompt_template.j2"
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+def _architecture_name(cputype, cpusubtype):
+    name = _CPU_TYPES.get(cputype, f'cpu{cputype}')
+    if name == 'arm64' and cpusubtype & 0xff == _CPU_SUBTYPE_ARM64E:
+        return 'arm64e'
+    return name
+
+
+def read_macho_architectures(path):
+    """Architectures of a thin or universal Mach-O file, from its header bytes only.
+
+    Returns [] for anything that is not Mach-O (scripts, resources, ...).
+    """
+    with open(path, 'rb') as f:
+        header = f.read(MACHO_HEADER_BYTES)
+    if len(header) < 12:
+        return []
+    magic = struct.unpack_from('>I', header)[0]
+    if magic in _FAT_MAGICS:
+        count = struct.unpack_from('>I', header, 4)[0]
+        if count > _MAX_FAT_ARCHES:
+            return []
+        arch_size = _FAT_MAGICS[magic]
+        return [_architecture_name(*struct.unpack_from('>II', header, 8 + i * arch_size))
+                for i in range(count) if 8 + (i + 1) * arch_size <= len(header)]
+    for byte_order in ('<', '>'):
+        magic, cputype, cpusubtype = struct.unpack_from(byte_order + 'III', header)
+        if magic in _MACHO_MAGICS:
+            return [_architecture_name(cputype, cpusubtype)]
+    return []
+
+
+def analyze_bundle(app_path):
+    """Disk footprint, file count and executable architectures of one bundle.
+
+    The bundle is walked without following symlinks; only the executables in
+    Contents/MacOS are opened, and only their headers are read.
+    """
+    macos_dir = os.path.join(app_path, 'Contents', 'MacOS')
+    size_bytes = file_count = 0
+    architectures = set()
+    directories = [app_path]
+    while directories:
+        directory = directories.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                            continue
+                        stat_info = entry.stat(follow_symlinks=False)
+                        if directory == macos_dir and entry.is_file(follow_symlinks=False):
+                            architectures.update(read_macho_architectures(entry.path))
+                    except OSError:
+                        continue
+                    file_count += 1
+                    # Allocated blocks where the platform reports them, else the apparent size
+                    blocks = getattr(stat_info, 'st_blocks', None)
+                    size_bytes += blocks * 512 if blocks is not None else stat_info.st_size
+        except OSError:
+            continue
+    return {'size_bytes': size_bytes, 'file_count': file_count, 'architectures': sorted(architectures)}
+
+
+def load_footprint_cache(cache_path):
+    """Load cached footprints keyed by bundle path, or {} if there is no usable cache."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
 
-    # Create Jinja2 template
-    template = Template(template_content)
 
-    # Render the template with the apps data
-    prompt_content = template.render(apps=apps)
+def _footprint_key(app):
+    return f"{app['version']}|{app['modified']}"
 
-    with open("applications_detail_prompt.txt", 'w', encoding='utf-8') as f:
-        f.write(prompt_content)
 
-    return "applications_detail_prompt.txt"
+@METRICS.timed('stage_duration_seconds', stage='analyze')
+def analyze_footprints(apps, cache_path, workers=ANALYZE_WORKERS):
+    """Add FOOTPRINT_FIELDS to each app, walking at most ``workers`` bundles at once.
 
+    Results are cached by bundle path and reused while the bundle's version and
+    modification time are unchanged. Returns (cache hits, bundles walked).
+    """
+    cache = load_footprint_cache(cache_path)
+    stale = [app for app in apps
+             if (cache.get(app['path']) or {}).get('key') != _footprint_key(app)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for app, footprint in zip(stale, executor.map(analyze_bundle, [app['path'] for app in stale])):
+            cache[app['path']] = {'key': _footprint_key(app), 'footprint': footprint}
 
-def run_goose_cli(prompt_file, debug_mode=False):
-    """Run Goose CLI with the prompt file."""
-    try:
-        # Read the prompt file contents
-        with open(prompt_file, 'r', encoding='utf-8') as f:
-            prompt_content = f.read()
+    new_cache = {}
+    for app in apps:
+        new_cache[app['path']] = cache[app['path']]
+        app.update(cache[app['path']]['footprint'])
+    _write_json_atomically(cache_path, new_cache, indent=2, sort_keys=True)
+    return len(apps) - len(stale), len(stale)
 
-        result = subprocess.run(
-            ['goose', 'run', '-t', prompt_content],
-            capture_output=True, text=True, timeout=120
-        )
 
-        if debug_mode:
-            print("\n--- RAW GOOSE OUTPUT ---\n")
-            print(result.stdout)
-            print("\n--- END RAW GOOSE OUTPUT ---\n")
+def _footprint(app):
+    return {field: app[field] for field in FOOTPRINT_FIELDS if field in app}
 
-        if result.returncode == 0:
-            return result.stdout
-        else:
-            print(f"Goose CLI error: {result.stderr}")
-            return None
-    except Exception as e:
-        print(f"Error running Goose CLI: {e}")
+
+@functools.lru_cache(maxsize=None)
+def _prompt_template():
+    """Compile prompt_template.j2 once per process."""
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+@METRICS.timed('stage_duration_seconds', stage='render')
+def render_prompt(apps):
+    """Render the Goose CLI prompt for a batch of apps in memory."""
+    return _prompt_template().render(apps=apps)
+
+
+@METRICS.timed('stage_duration_seconds', stage='prompt_file')
+def create_prompt_file(apps, prompt_file="applications_detail_prompt.txt"):
+    """Write the rendered prompt to a file, for inspecting what Goose is sent."""
+    with open(prompt_file, 'w', encoding='utf-8') as f:
+        f.write(render_prompt(apps))
+
+    return prompt_file
+
+
+@METRICS.timed('stage_duration_seconds', stage='goose_cli')
+def run_goose_cli(prompt, debug_mode=False, goose_command=DEFAULT_GOOSE_COMMAND, app_names=None,
+                  args=DEFAULT_ARGS, env=None, response_store=None):
+    """Run Goose CLI, piping the prompt to it on stdin, and return its output.
+
+    ``goose run -i -`` reads its instructions from stdin, so prompt size is not
+    limited by the maximum command-line length. ``goose_command`` may name a
+    different executable, e.g. a local stub for testing; ``args`` replace
+    ``run -i -`` and ``env`` is added to its environment.
+
+    Output is parsed as it streams in. Once a complete JSON object describing
+    every name in ``app_names`` has arrived, the session is ended instead of
+    waiting for it to wind down. Returns None if Goose fails, or times out
+    before printing anything. Every complete response is recorded in
+    ``response_store``, if given, keyed by the prompt and the backend; the
+    partial output of a timed-out call is returned but not recorded, so a
+    replay never serves a truncated transcript.
+    """
+    started = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            shlex.split(goose_command) + list(args),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace',
+            env=dict(os.environ, **env) if env else None
+        )
+    except OSError as e:
+        METRICS.inc('goose_calls_total', result='error')
+        _log(f"Error running Goose CLI: {e}")
         return None
 
+    # Write stdin and drain stderr on their own threads, so neither pipe can
+    # fill up and deadlock against the stdout reader below
+    stderr_chunks = []
+    writer = threading.Thread(target=_write_prompt, args=(process.stdin, prompt), daemon=True)
+    drainer = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    writer.start()
+    drainer.start()
+    timed_out = threading.Event()
+
+    def kill_after_timeout():
+        timed_out.set()
+        process.kill()
+    timer = threading.Timer(GOOSE_TIMEOUT, kill_after_timeout)
+    timer.start()
+
+    lines = []
+    answered = False
+    try:
+        answered = _read_until_answered(process.stdout, lines, set(app_names or ()))
+        if answered:
+            # The answer is in; whatever Goose prints while shutting down is ignored
+            process.terminate()
+        return_code = process.wait()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+    drainer.join(timeout=1)
+    output = ''.join(lines)
+
+    if debug_mode:
+        _log(f"\n--- RAW GOOSE OUTPUT ---\n\n{output}\n\n--- END RAW GOOSE OUTPUT ---\n")
+
+    response = None
+    complete = True
+    if answered:
+        METRICS.inc('goose_calls_total', result='answered_early' if return_code else 'ok')
+        response = output
+    elif timed_out.is_set():
+        METRICS.inc('goose_calls_total', result='timeout')
+        _log(f"Error running Goose CLI: timed out after {GOOSE_TIMEOUT} seconds")
+        # Keep a partial answer: the parser can still salvage what arrived
+        response = output or None
+        complete = False
+    elif return_code == 0:
+        METRICS.inc('goose_calls_total', result='ok')
+        response = output
+    else:
+        METRICS.inc('goose_calls_total', result='error')
+        _log(f"Goose CLI error: {''.join(stderr_chunks)}")
+
+    if response is not None and complete and response_store is not None:
+        try:
+            response_store.put(prompt, backend_identity(goose_command, args, env), response,
+                               time.monotonic() - started, app_names or ())
+        except OSError as e:
+            _log(f"Warning: could not record the Goose response: {e}")
+    return response
+
+
+def _write_prompt(stdin, prompt):
+    try:
+        stdin.write(prompt)
+        stdin.close()
+    except (BrokenPipeError, ValueError, OSError):
+        # Goose exited (or was stopped) before reading all of its input
+        pass
+
+
+def _read_until_answered(stdout, lines, app_names):
+    """Collect output lines until EOF, or until an object describing every app arrives.
+
+    Lines are fed to a JsonObjectScanner as they are read (ANSI escapes never
+    span lines, so they are stripped per line). Returns True if the answer
+    arrived before the output ended.
+    """
+    scanner = JsonObjectScanner()
+    for line in stdout:
+        lines.append(line)
+        if not app_names:
+            continue
+        for start, end in scanner.feed(strip_ansi(line)):
+            parsed = _try_parse_json(scanner.object_text(start, end))
+            if _is_valid_string_dict(parsed) and app_names <= parsed.keys():
+                return True
+    return False
+
 
 def strip_ansi(text):
     """Remove ANSI escape sequences from text."""
-    import re
-    ansi_escape = re.compile(r'\x1b\[[0-9;]*[a-zA-Z]')
-    return ansi_escape.sub('', text)
+    return _ANSI_ESCAPE.sub('', text)
 
 
 def _try_parse_json(text):
@@ -141,36 +518,16 @@ def _try_parse_json(text):
 
 def _extract_key_value_pairs(text):
     """Extract key-value pairs from text using regex."""
-    import re
     obj = {}
-    key_value_pattern = re.compile(r'"([^\"]+)":\s*"([^\"]*)",?')
     for line in text.splitlines():
         line = line.strip()
-        m = key_value_pattern.match(line)
+        m = _KEY_VALUE_PATTERN.match(line)
         if m:
             key, value = m.group(1), m.group(2)
             obj[key] = value
     return obj
 
 
-def _try_parse_code_blocks(response):
-    """Try to parse JSON from code blocks."""
-    import re
-    code_blocks = re.findall(
-        r"```(?:json)?[ \t]*\n([\s\S]*?)\n[ \t]*```",
-        response, re.IGNORECASE
-    )
-    for block in reversed(code_blocks):
-        block = block.strip()
-        result = _try_parse_json(block)
-        if result:
-            return result
-        obj = _extract_key_value_pairs(block)
-        if obj:
-            return obj
-    return None
-
-
 def _is_valid_string_dict(parsed):
     """Check if parsed result is a valid dictionary with string values."""
     return (
@@ -179,163 +536,1216 @@ def _is_valid_string_dict(parsed):
     )
 
 
-def _try_parse_json_objects(response):
-    """Try to parse JSON objects from response."""
-    import re
-    json_pattern = r'(\{[\s\S]*\})'
-    matches = re.findall(json_pattern, response, re.DOTALL)
-    for match in reversed(matches):
-        match = match.strip()
-        parsed = _try_parse_json(match)
-        if _is_valid_string_dict(parsed):
-            return parsed
-    return None
-
+class JsonObjectScanner:
+    """Incremental, single-pass finder of top-level JSON objects in free text.
+
+    Each feed() returns the (start, end) offsets, in everything fed so far, of
+    the objects it completed; object_text() gives their text. Braces are only
+    counted outside JSON strings, with escapes honoured, and the text between
+    structural characters is skipped with regex searches instead of
+    per-character Python work. Objects up to three levels deep are consumed in
+    a single match, so a transcript is scanned once no matter how many braces
+    it contains. Only the text of an object still open is kept between feeds,
+    so streaming output in many small chunks takes linear time.
+    """
+
+    def __init__(self):
+        self._fed = 0
+        # The text scanned by the latest feed() and its offset in everything fed
+        self._text = ''
+        self._base = 0
+        # An escape at the end of the last chunk, scanned again with the next one
+        self._tail = ''
+        # Text of the object still open, from earlier feeds; moved to _carried
+        # when the object completes
+        self._parts = []
+        self._carried = ''
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+
+    def feed(self, chunk):
+        """Scan another piece of output and return the objects it completed."""
+        text = self._tail + chunk
+        base = self._fed - len(self._tail)
+        self._fed += len(chunk)
+        self._text, self._base, self._carried = text, base, ''
+        pos, end = 0, len(text)
+        completed = []
+        while pos < end:
+            if self._in_string:
+                match = _STRING_SPECIALS.search(text, pos)
+                if match is None:
+                    pos = end
+                elif match.group() == '\\':
+                    if match.end() == end:
+                        # The escaped character hasn't arrived yet; look again next feed
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                else:
+                    self._in_string = False
+                    pos = match.end()
+            elif self._depth == 0:
+                start = text.find('{', pos)
+                if start == -1:
+                    pos = end
+                    continue
+                whole = _NESTED_OBJECT.match(text, start)
+                if whole:
+                    completed.append((base + start, base + whole.end()))
+                    pos = whole.end()
+                else:
+                    self._start, self._depth, pos = base + start, 1, start + 1
+            else:
+                match = _OBJECT_SPECIALS.search(text, pos)
+                if match is None:
+                    pos = end
+                    continue
+                char, pos = match.group(), match.end()
+                if char == '"':
+                    self._in_string = True
+                elif char == '{':
+                    # Skip a complete nested object in one step when possible
+                    whole = _NESTED_OBJECT.match(text, match.start())
+                    if whole:
+                        pos = whole.end()
+                    else:
+                        self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        if self._start < base:
+                            self._carried = ''.join(self._parts)
+                            self._parts = []
+                        completed.append((self._start, base + pos))
+                        self._start = None
+        self._tail = text[pos:]
+        if self._start is not None:
+            self._parts.append(text[max(self._start - base, 0):pos])
+        return completed
+
+    def object_text(self, start, end):
+        """Text of an object returned by the latest feed()."""
+        if start < self._base:
+            return self._carried + self._text[:end - self._base]
+        return self._text[start - self._base:end - self._base]
+
+    def pending(self):
+        """Offset of an object still open at the end of the text, or None."""
+        return self._start
 
-def _has_valid_json_bounds(response):
-    """Check if response has valid JSON bounds."""
-    first = response.find('{')
-    last = response.rfind('}')
-    return first != -1 and last != -1 and last > first
 
+def parse_goose_response(response):
+    """Parse the JSON response from Goose CLI, handling code blocks, repeated keys, and nested JSON."""
+    return parse_goose_response_with_strategy(response)[0]
 
-def _try_parse_fallback(response):
-    """Try to parse JSON from first { to last }."""
-    if not _has_valid_json_bounds(response):
-        return None
-
-    first = response.find('{')
-    last = response.rfind('}')
-    candidate = response[first:last + 1].strip()
-    result = _try_parse_json(candidate)
-    if result:
-        return result
-    obj = _extract_key_value_pairs(candidate)
-    if obj:
-        return obj
-    return None
 
+def parse_goose_response_with_strategy(response):
+    """Parse a Goose response and name the strategy that produced the result.
 
-def parse_goose_response(response):
-    """Parse the JSON response from Goose CLI, handling code blocks, repeated keys, and nested JSON."""
+    The strategy is 'code_block' for a JSON object inside a ``` fence, 'object'
+    for one in plain text, 'fallback' when key/value lines were salvaged from a
+    truncated or malformed object, and None when nothing could be parsed.
+    """
     response = strip_ansi(response)
+    scanner = JsonObjectScanner()
+    spans = scanner.feed(response)
+
+    # An object cut off at the end of the output (e.g. a timeout mid-answer) is
+    # salvaged line by line; a complete object must describe more apps to beat it
+    salvaged = {}
+    if scanner.pending() is not None:
+        salvaged = _extract_key_value_pairs(response[scanner.pending():])
+
+    # Otherwise the answer is the largest object; on a tie prefer the later one,
+    # since any echoed prompt or tool output comes before it
+    best, best_start = None, None
+    for start, end in reversed(spans):
+        # Each entry takes at least 6 characters ("a":"b" plus a comma), so spans
+        # too short to beat the current best aren't decoded at all
+        to_beat = len(best) if best is not None else len(salvaged) - 1
+        if end - start < 6 * (to_beat + 1):
+            continue
+        parsed = _try_parse_json(response[start:end])
+        if _is_valid_string_dict(parsed) and len(parsed) > to_beat:
+            best, best_start = parsed, start
+
+    if best is not None:
+        in_code_block = response.count(_CODE_FENCE, 0, best_start) % 2 == 1
+        return best, 'code_block' if in_code_block else 'object'
+    if salvaged:
+        return salvaged, 'fallback'
+
+    # Last resort: key/value lines from complete but malformed objects
+    for start, end in reversed(spans):
+        obj = _extract_key_value_pairs(response[start:end])
+        if obj:
+            return obj, 'fallback'
+
+    return {}, None
 
-    result = _try_parse_code_blocks(response)
-    if result:
-        return result
 
-    result = _try_parse_json_objects(response)
-    if result:
-        return result
+def _positive_int(value):
+    """argparse type for options that need a value of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
 
-    result = _try_parse_fallback(response)
-    if result:
-        return result
 
-    return {}
+def _non_negative_int(value):
+    """argparse type for options that accept 0 to turn a feature off."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer, got {value}")
+    return number
 
 
-def _parse_arguments():
+def _parse_arguments(argv=None):
     """Parse command line arguments."""
-    debug_mode = False
-    if len(sys.argv) > 1:
-        if sys.argv[1] in ['--help', '-h']:
-            print("Usage: python app_metadata_builder.py [--debug|-d]")
-            print("Requirements: brew install goose")
-            print("\nOptions:")
-            print("  --debug, -d    Enable debug output")
-            return None
-        elif sys.argv[1] in ['--debug', '-d']:
-            debug_mode = True
-    return debug_mode
-
-
-def _process_batch(batch, batch_num, num_batches, debug_mode):
-    """Process a single batch of applications."""
-    print(f"Processing batch {batch_num} of {num_batches} ({len(batch)} apps)...")
-
-    prompt_file = create_prompt_file(batch)
-    response = run_goose_cli(prompt_file, debug_mode)
+    parser = argparse.ArgumentParser(
+        description="Generate descriptions for the apps in /Applications using Goose CLI.",
+        epilog="Requirements: brew install goose",
+    )
+    parser.add_argument('--debug', '-d', action='store_true',
+                        help='Enable debug output and write each batch prompt to '
+                             'applications_detail_prompt_<batch>.txt')
+    parser.add_argument('--jobs', '-j', type=_positive_int, default=DEFAULT_JOBS,
+                        help=f'Number of Goose CLI batches to run at once (default: {DEFAULT_JOBS})')
+    parser.add_argument('--batch-budget', type=_positive_int, default=DEFAULT_PROMPT_BUDGET,
+                        metavar='CHARS',
+                        help='Starting prompt size per batch in characters of app metadata; '
+                             f'adjusted from observed latency (default: {DEFAULT_PROMPT_BUDGET})')
+    parser.add_argument('--root', '-r', dest='roots', action='append', metavar='DIR',
+                        help='Directory to scan for .app bundles; repeat for several '
+                             '(default: /Applications)')
+    parser.add_argument('--goose', default=DEFAULT_GOOSE_COMMAND, metavar='COMMAND',
+                        help='Goose executable, optionally with arguments '
+                             '(default: $GOOSE_BIN or goose)')
+    parser.add_argument('--backends', metavar='FILE',
+                        help='JSON backend pool config: several Goose providers or commands '
+                             'with rate limits and concurrency caps; overrides --goose')
+    parser.add_argument('--responses', metavar='DIR',
+                        help='Where raw Goose responses are recorded, keyed by prompt and '
+                             'backend (default: applications.responses next to the output)')
+    parser.add_argument('--responses-mb', type=_non_negative_int, default=DEFAULT_MAX_MB,
+                        metavar='MB',
+                        help='Size limit of the recorded responses; the least recently used '
+                             f'are evicted beyond it, and 0 disables recording (default: {DEFAULT_MAX_MB})')
+    parser.add_argument('--replay', action='store_true',
+                        help='Answer prompts from the recorded responses instead of running '
+                             'Goose; batches without a recording stay undescribed')
+    parser.add_argument('--output', '-o', default=OUTPUT_FILE,
+                        help=f'Where to write the catalog (default: {OUTPUT_FILE})')
+    parser.add_argument('--format', choices=('json', 'ndjson'),
+                        help='Catalog format: one JSON object, or one app record per line '
+                             'written as batches finish (default: ndjson for .ndjson/.jsonl '
+                             'outputs, json otherwise)')
+    parser.add_argument('--store', metavar='DB',
+                        help='Also keep the catalog in this SQLite database, written batch '
+                             'by batch (e.g. applications.db)')
+    parser.add_argument('--seed', metavar='FLEET',
+                        help='Fleet catalog from fleet_merge.py; apps it already describes '
+                             '(same bundle identifier and version) are not sent to Goose')
+    parser.add_argument('--knowledge-base', default=KNOWLEDGE_BASE_PATH, metavar='FILE',
+                        help='JSON map of bundle identifiers to descriptions used before Goose '
+                             '(default: the bundled known_apps.json)')
+    parser.add_argument('--no-local-resolve', dest='local_resolve', action='store_false',
+                        help='Send every app to Goose instead of first describing it from the '
+                             'knowledge base or a usable Info.plist description')
+    parser.add_argument('--force', '-f', action='store_true',
+                        help='Ignore cached descriptions and describe every app again')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run, skipping apps its checkpoint '
+                             'journal already describes')
+    parser.add_argument('--retries', type=_non_negative_int, default=DEFAULT_RETRY_PASSES,
+                        metavar='PASSES',
+                        help='Retry passes for apps a batch failed to describe; 0 disables '
+                             f'retrying (default: {DEFAULT_RETRY_PASSES})')
+    parser.add_argument('--retry-budget', type=_non_negative_int, default=DEFAULT_RETRY_BUDGET,
+                        metavar='APPS',
+                        help='Most apps re-submitted by retries in one run '
+                             f'(default: {DEFAULT_RETRY_BUDGET})')
+    parser.add_argument('--analyze', action='store_true',
+                        help='Also record each bundle\'s disk footprint, file count and executable '
+                             'architectures, cached in applications.footprint.json')
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='Keep running and update the catalog as apps are installed, '
+                             'updated or removed')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        metavar='SECONDS',
+                        help='How often --watch rescans where inotify is unavailable '
+                             f'(default: {DEFAULT_POLL_INTERVAL:g})')
+    options = parser.parse_args(argv)
+    options.roots = tuple(options.roots or DEFAULT_ROOTS)
+    options.format = options.format or _format_for(options.output)
+    return options
+
+
+def estimate_prompt_size(app):
+    """Estimate how many characters an app adds to the rendered prompt."""
+    # Field labels and line breaks from prompt_template.j2 add roughly 60 characters
+    return 60 + sum(len(str(app.get(field) or ''))
+                    for field in ('name', 'description', 'version', 'bundle_identifier', 'path'))
+
+
+class BatchPlanner:
+    """Packs apps into batches by estimated prompt size and adapts the size budget.
+
+    The budget shrinks after a call fails, times out or comes back with apps
+    missing (a truncated response), and grows while calls stay fast and complete,
+    so fewer invocations pay the fixed startup cost of ``goose run``.
+    """
+
+    def __init__(self, budget=DEFAULT_PROMPT_BUDGET, min_budget=MIN_PROMPT_BUDGET,
+                 max_budget=MAX_PROMPT_BUDGET, max_apps=MAX_BATCH_APPS, debug_mode=False):
+        self.min_budget = min(min_budget, budget)
+        self.max_budget = max(max_budget, budget)
+        self.budget = budget
+        self.max_apps = max_apps
+        self.debug_mode = debug_mode
+        self.history = []
+        self._lock = threading.Lock()
+
+    def next_batch(self, pending):
+        """Take the next batch off the front of the ``pending`` deque."""
+        with self._lock:
+            budget = self.budget
+        batch, size = [], 0
+        while pending and len(batch) < self.max_apps:
+            app_size = estimate_prompt_size(pending[0])
+            # Always take at least one app, even if it alone exceeds the budget
+            if batch and size + app_size > budget:
+                break
+            batch.append(pending.popleft())
+            size += app_size
+        return batch
+
+    def record(self, batch_num, batch, seconds, described):
+        """Adjust the budget from one finished call; ``described`` is None if it failed."""
+        prompt_size = sum(estimate_prompt_size(app) for app in batch)
+        with self._lock:
+            old_budget = self.budget
+            if described is None or described < len(batch):
+                self.budget = max(self.min_budget, self.budget // 2)
+            elif seconds < FAST_CALL_SECONDS:
+                self.budget = min(self.max_budget, int(self.budget * 1.25))
+            self.history.append({
+                'batch': batch_num, 'apps': len(batch), 'prompt_chars': prompt_size,
+                'seconds': round(seconds, 2), 'described': described or 0, 'budget': self.budget,
+            })
+            new_budget = self.budget
+
+        if self.debug_mode:
+            _log(
+                f"  Batch {batch_num}: {len(batch)} apps, ~{prompt_size} prompt chars, "
+                f"{seconds:.1f}s, {described or 0}/{len(batch)} described; "
+                f"budget {old_budget} -> {new_budget}"
+            )
+
+
+def _process_batch(batch, batch_num, debug_mode, planner=None,
+                   goose_command=DEFAULT_GOOSE_COMMAND, progress=_CONSOLE, backend_pool=None,
+                   response_store=None):
+    """Process a single batch of applications.
+
+    With a ``backend_pool`` the call goes to the backend it picks, failing over
+    to the others; otherwise ``goose_command`` is run. Responses are recorded in
+    ``response_store``, or served from it without running Goose if it is
+    replaying.
+    """
+    progress('batch_started', f"Processing batch {batch_num} ({len(batch)} apps)...",
+             batch=batch_num, apps=len(batch))
+    started = time.monotonic()
+
+    prompt = render_prompt(batch)
+    if debug_mode:
+        prompt_file = create_prompt_file(batch, f"applications_detail_prompt_{batch_num}.txt")
+        progress('debug', f"  Batch {batch_num}: prompt written to {prompt_file}", batch=batch_num)
+    app_names = [app['name'] for app in batch]
+    if response_store is not None and response_store.replay:
+        response = _replay_response(prompt, goose_command, backend_pool, response_store)
+        if response is None:
+            progress('replay_missed', f"  Batch {batch_num}: no recorded response; "
+                                      f"Goose is not run when replaying", batch=batch_num)
+        else:
+            # Time the batch as the recorded call took, so the planner sizes the
+            # following batches as it did when they were recorded
+            started = time.monotonic() - response['seconds']
+            response = response['response']
+    elif backend_pool is None:
+        response = run_goose_cli(prompt, debug_mode, goose_command, app_names=app_names,
+                                 response_store=response_store)
+    else:
+        response = backend_pool.call(lambda backend: run_goose_cli(
+            prompt, debug_mode, backend.command, app_names=app_names,
+            args=backend.args, env=backend.env, response_store=response_store), progress)
 
     if response is None:
-        print("  ❌ No response from Goose CLI")
+        elapsed = time.monotonic() - started
+        progress('batch_failed', f"  ❌ Batch {batch_num}: no response from Goose CLI",
+                 batch=batch_num, apps=len(batch), seconds=round(elapsed, 2))
+        METRICS.observe('batch_duration_seconds', elapsed)
+        METRICS.inc('batch_apps_total', len(batch), result='failed')
+        if planner is not None:
+            planner.record(batch_num, batch, elapsed, None)
         return {}
 
     if debug_mode:
-        print(f"  Response length: {len(response)}")
+        progress('debug', f"  Batch {batch_num}: response length {len(response)}", batch=batch_num)
 
-    descriptions = parse_goose_response(response)
-    print(f"  Parsed {len(descriptions)} descriptions from batch")
+    with METRICS.time('stage_duration_seconds', stage='parse'):
+        descriptions, strategy = parse_goose_response_with_strategy(response)
+    METRICS.inc('parse_strategy_total', strategy=strategy or 'none')
 
     if descriptions and debug_mode:
-        print(f"  Sample: {list(descriptions.keys())[:3]}")
+        progress('debug', f"  Batch {batch_num} sample: {list(descriptions.keys())[:3]}", batch=batch_num)
     elif not descriptions:
-        print("  ❌ No descriptions parsed from response")
-
-    # Merge app metadata with descriptions
-    merged_results = {}
-    for app in batch:
-        app_name = app['name']
-        if app_name in descriptions:
-            # Merge metadata with description
-            merged_results[app_name] = {
-                'description': descriptions[app_name],
-                'version': app['version'],
-                'created': app['created'],
-                'modified': app['modified'],
-                'copyright': app['copyright'],
-                'CFBundleDescription': app['CFBundleDescription'],
-                'bundle_identifier': app['bundle_identifier'],
-                'path': app['path']
-            }
-        else:
-            # Include metadata even if no description was generated
-            merged_results[app_name] = {
-                'description': '',
-                'version': app['version'],
-                'created': app['created'],
-                'modified': app['modified'],
-                'copyright': app['copyright'],
-                'CFBundleDescription': app['CFBundleDescription'],
-                'bundle_identifier': app['bundle_identifier'],
-                'path': app['path']
-            }
+        progress('warning', f"  ❌ Batch {batch_num}: no descriptions parsed from response",
+                 batch=batch_num)
+
+    # Merge app metadata with descriptions; apps without one keep their metadata
+    with METRICS.time('stage_duration_seconds', stage='merge'):
+        results = {app['name']: _merge_app(app, descriptions.get(app['name'], '')) for app in batch}
+
+    elapsed = time.monotonic() - started
+    described = sum(1 for entry in results.values() if entry['description'])
+    progress('batch_finished', f"  Batch {batch_num}: parsed {len(descriptions)} descriptions",
+             batch=batch_num, apps=len(batch), described=described, strategy=strategy,
+             seconds=round(elapsed, 2))
+    METRICS.observe('batch_duration_seconds', elapsed)
+    METRICS.inc('batch_apps_total', described, result='described')
+    METRICS.inc('batch_apps_total', len(batch) - described, result='empty')
+    if planner is not None:
+        planner.record(batch_num, batch, elapsed, described)
+    return results
+
+
+def _replay_response(prompt, goose_command, backend_pool, response_store):
+    """The recorded entry for ``prompt`` from any backend this run could send it to."""
+    if backend_pool is None:
+        backends = [backend_identity(goose_command)]
+    else:
+        backends = [backend_identity(backend.command, backend.args, backend.env)
+                    for backend in backend_pool.backends]
+    return response_store.get(prompt, backends)
+
+
+def open_response_store(options):
+    """The raw response store for a run, or None if recording is off and not replaying."""
+    if not options.responses_mb and not options.replay:
+        return None
+    path = options.responses or _sidecar_path(options.output, '.responses')
+    return ResponseStore(path, options.responses_mb * 1024 * 1024, replay=options.replay)
+
+
+def _merge_app(app, description):
+    """Build the applications.json entry for an app and its description."""
+    return {
+        'description': description,
+        'version': app['version'],
+        'created': app['created'],
+        'modified': app['modified'],
+        'copyright': app['copyright'],
+        'CFBundleDescription': app['CFBundleDescription'],
+        'bundle_identifier': app['bundle_identifier'],
+        'path': app['path'],
+        **_footprint(app)
+    }
 
-    return merged_results
 
+def _sidecar_path(output_path, suffix):
+    """Path of a file kept next to the output, e.g. applications.cache.json."""
+    return os.path.splitext(output_path)[0] + suffix
 
-def _save_results(all_descriptions):
-    """Save results to applications.json."""
-    with open("applications.json", 'w', encoding='utf-8') as f:
-        json.dump(all_descriptions, f, indent=2, ensure_ascii=False)
-    print(f"\nSaved {len(all_descriptions)} applications with metadata to applications.json")
 
+def _cache_key(app):
+    """Identity of an app bundle: unchanged bundles keep their description."""
+    identifier = app['bundle_identifier'] or app['path']
+    return f"{identifier}|{app['version']}|{app['modified']}"
 
-def main():
-    debug_mode = _parse_arguments()
-    if debug_mode is None:
-        return
 
-    apps = get_applications()
-    if not apps:
-        print("No applications found in /Applications.")
-        return
+def load_description_cache(cache_path):
+    """Load cached descriptions keyed by _cache_key(), or {} if there is no usable cache."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_description_cache(cache_path, apps, all_applications, local=()):
+    """Write the cache for the apps just scanned, dropping entries for anything else.
+
+    Apps in ``local`` were described by a local tier (see resolve_locally()) and
+    are left out: those tiers are cheap and re-run every time, so improvements
+    to them reach apps already described once.
+    """
+    cache = {}
+    for app in apps:
+        if app['name'] in local:
+            continue
+        entry = all_applications.get(app['name'])
+        if entry and entry['description']:
+            cache[_cache_key(app)] = {'name': app['name'], 'description': entry['description']}
+    _write_json_atomically(cache_path, cache, indent=2, sort_keys=True)
+    return cache
+
+
+def _split_cached_apps(apps, cache):
+    """Split apps into cached results and the apps that still need a description."""
+    cached, pending = {}, []
+    for app in apps:
+        entry = cache.get(_cache_key(app))
+        if entry and entry.get('description'):
+            cached[app['name']] = _merge_app(app, entry['description'])
+        else:
+            pending.append(app)
+    return cached, pending
 
-    print(f"Found {len(apps)} apps. Creating prompt file(s) and generating descriptions in batches of {BATCH_SIZE}...")
+
+def _run_batches(apps, jobs, debug_mode, on_batch=None, planner=None,
+                 goose_command=DEFAULT_GOOSE_COMMAND, progress=_CONSOLE, backend_pool=None,
+                 response_store=None):
+    """Describe apps in batches, running up to ``jobs`` Goose CLI calls at once.
+
+    Batches are planned as workers free up, so each one is sized with the
+    latest feedback from ``planner``. ``on_batch`` is called with each finished
+    batch's results, on this thread, e.g. to append them to the checkpoint.
+    """
+    if planner is None:
+        planner = BatchPlanner(debug_mode=debug_mode)
+    pending = collections.deque(apps)
+    running = set()
+    batch_num = 0
 
     all_applications = {}
-    num_batches = (len(apps) + BATCH_SIZE - 1) // BATCH_SIZE
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        while pending or running:
+            while pending and len(running) < jobs:
+                batch_num += 1
+                batch = planner.next_batch(pending)
+                running.add(executor.submit(
+                    _process_batch, batch, batch_num, debug_mode, planner, goose_command, progress,
+                    backend_pool, response_store
+                ))
+
+            # Merge results in completion order; _save_results sorts them afterwards
+            done, running = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                batch_results = future.result()
+                all_applications.update(batch_results)
+                if on_batch is not None and batch_results:
+                    on_batch(batch_results)
+
+            if debug_mode:
+                progress('debug', f"  Total applications so far: {len(all_applications)}, "
+                                  f"{len(pending)} left to plan")
+
+    if debug_mode:
+        progress('debug', f"Batch plan: {json.dumps(planner.history)}")
+    return all_applications
+
+
+def _backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Exponential backoff with jitter: half the capped delay plus a random half."""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _is_undescribed(app, all_applications):
+    entry = all_applications.get(app['name'])
+    return not (entry and entry['description'])
+
+
+def retry_undescribed(apps, all_applications, options, on_batch=None, progress=_CONSOLE,
+                      backend_pool=None, response_store=None):
+    """Re-submit only the apps the first pass left without a description.
+
+    Up to ``options.retries`` passes each wait with exponential backoff and
+    jitter, then describe the stragglers in batches half the size of the
+    previous pass's. No more than ``options.retry_budget`` apps are re-submitted
+    in total. ``all_applications`` is updated in place; returns the number of
+    apps recovered by each pass. Replayed passes do not wait.
+    """
+    replaying = response_store is not None and response_store.replay
+    retry_budget = options.retry_budget
+    recovered_per_pass = []
+    for attempt in range(options.retries):
+        missing = [app for app in apps if _is_undescribed(app, all_applications)]
+        if not missing or retry_budget <= 0:
+            break
+        missing = missing[:retry_budget]
+        retry_budget -= len(missing)
+
+        delay = 0.0 if replaying else _backoff_delay(attempt)
+        progress('retry_started',
+                 f"Retry pass {attempt + 1}: {len(missing)} undescribed app(s), waiting {delay:.1f}s...",
+                 retry_pass=attempt + 1, apps=len(missing), delay=round(delay, 2))
+        time.sleep(delay)
+
+        planner = BatchPlanner(max(MIN_PROMPT_BUDGET, options.batch_budget >> (attempt + 1)),
+                               debug_mode=options.debug)
+        results = _run_batches(missing, options.jobs, options.debug, on_batch, planner,
+                               options.goose, progress, backend_pool, response_store)
+        recovered = 0
+        for app in missing:
+            entry = results.get(app['name'])
+            if entry and entry['description']:
+                all_applications[app['name']] = entry
+                recovered += 1
+        recovered_per_pass.append(recovered)
+        METRICS.inc('retry_recovered_apps_total', recovered, retry_pass=attempt + 1)
+        progress('retry_finished',
+                 f"Retry pass {attempt + 1}: recovered {recovered} of {len(missing)} app(s)",
+                 retry_pass=attempt + 1, apps=len(missing), recovered=recovered)
+    return recovered_per_pass
+
+
+def describe_apps(apps, options, on_batch=None, progress=_CONSOLE):
+    """Describe apps with Goose, retrying stragglers; returns (results, recovered per retry pass).
+
+    Apps that are still undescribed afterwards keep their metadata with an
+    empty description, so they stay in the catalog.
+    """
+    planner = BatchPlanner(options.batch_budget, debug_mode=options.debug)
+    backend_pool = BackendPool.from_file(options.backends) if options.backends else None
+    response_store = open_response_store(options)
+    all_applications = _run_batches(apps, options.jobs, options.debug, on_batch, planner,
+                                    options.goose, progress, backend_pool, response_store)
+    recovered_per_pass = retry_undescribed(apps, all_applications, options, on_batch, progress,
+                                           backend_pool, response_store)
+    if backend_pool is not None:
+        for backend in backend_pool.snapshot():
+            latency = f"~{backend['latency']}s per answer" if backend['latency'] is not None else 'no answers'
+            progress('backend_summary', f"Backend {backend['name']}: {backend['calls']} call(s), {latency}",
+                     **backend)
+    for app in apps:
+        all_applications.setdefault(app['name'], _merge_app(app, ''))
+    return all_applications, recovered_per_pass
+
+
+def _retry_summary(recovered_per_pass, apps, all_applications):
+    """One line saying what each retry pass recovered and what is still missing."""
+    still_missing = sum(1 for app in apps if _is_undescribed(app, all_applications))
+    passes = ', '.join(f"pass {number}: {recovered}"
+                       for number, recovered in enumerate(recovered_per_pass, 1))
+    return (f"Retries recovered {sum(recovered_per_pass)} app(s) ({passes or 'no retries'}); "
+            f"{still_missing} app(s) still undescribed")
+
+
+def _split_seeded_apps(apps, seed_path):
+    """Split apps into results described by the fleet seed and the apps it does not cover."""
+    if not seed_path or not apps:
+        return {}, apps
+    seed = load_seed(seed_path, apps)
+    seeded, pending = {}, []
+    for app in apps:
+        description = seed.get(release_key(app['name'], app))
+        if description:
+            seeded[app['name']] = _merge_app(app, description)
+        else:
+            pending.append(app)
+    return seeded, pending
+
+
+@functools.lru_cache(maxsize=None)
+def load_knowledge_base(path=KNOWLEDGE_BASE_PATH):
+    """The local knowledge base, ``{bundle_identifier: description}``, or {} if unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            knowledge_base = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return knowledge_base if isinstance(knowledge_base, dict) else {}
+
+
+def is_quality_description(text, app):
+    """Whether an Info.plist string actually describes the app.
+
+    Version-only strings (iTerm's "3.5.14"), "Name 1.2" and copyright notices
+    are rejected: they would end up in the catalog instead of a description.
+    """
+    text = (text or '').strip()
+    if not text or _COPYRIGHT_NOTICE.search(text):
+        return False
+    name_words = set(app['name'].lower().split())
+    words = [word for word in text.split()
+             if word.lower() not in name_words and not _VERSION_TOKEN.match(word)]
+    return len(words) >= MIN_PLIST_DESCRIPTION_WORDS
+
+
+def resolve_from_plist(app):
+    """Tier 2: the app's own CFBundleDescription/CFBundleGetInfoString, if it passes the filter."""
+    description = app['description'].strip()
+    return description if is_quality_description(description, app) else ''
+
+
+def local_resolvers(options):
+    """The ``(tier, resolve)`` pairs tried in order before an app is sent to Goose.
+
+    ``resolve(app)`` returns a description or ''. Without ``options.local_resolve``
+    every app goes to Goose.
+    """
+    if not options.local_resolve:
+        return []
+    knowledge_base = load_knowledge_base(options.knowledge_base)
+    return [
+        ('knowledge_base', lambda app: knowledge_base.get(app['bundle_identifier']) or ''),
+        ('plist', resolve_from_plist),
+    ]
+
+
+def resolve_locally(apps, resolvers):
+    """Describe what the resolver tiers can; returns (results, apps left for Goose, count per tier)."""
+    resolved, pending = {}, []
+    counts = {tier: 0 for tier, _ in resolvers}
+    for app in apps:
+        for tier, resolve in resolvers:
+            description = resolve(app)
+            if description:
+                resolved[app['name']] = _merge_app(app, description)
+                counts[tier] += 1
+                break
+        else:
+            pending.append(app)
+    for tier, count in counts.items():
+        METRICS.inc('resolved_apps_total', count, tier=tier)
+    return resolved, pending, counts
+
+
+def _tier_summary(counts):
+    return ', '.join(f"{count} from {tier.replace('_', ' ')}" for tier, count in counts.items())
+
+
+def load_checkpoint(checkpoint_path):
+    """Read the batches recorded by an interrupted run, keyed by app name.
+
+    A line cut short by a crash mid-write is ignored.
+    """
+    results = {}
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    batch_results = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(batch_results, dict):
+                    results.update(batch_results)
+    except OSError:
+        pass
+    return results
+
+
+def _append_checkpoint(checkpoint_file, batch_results):
+    """Durably record one finished batch as a JSON line."""
+    checkpoint_file.write(json.dumps(batch_results, ensure_ascii=False) + "\n")
+    checkpoint_file.flush()
+    os.fsync(checkpoint_file.fileno())
+
+
+def _split_checkpointed_apps(apps, checkpoint):
+    """Split apps into results recorded by an earlier run and apps still to describe."""
+    resumed, pending = {}, []
+    for app in apps:
+        entry = checkpoint.get(app['name'])
+        if entry and entry.get('description') and _cache_key(entry) == _cache_key(app):
+            resumed[app['name']] = entry
+        else:
+            pending.append(app)
+    return resumed, pending
+
+
+def _write_json_atomically(path, data, **dump_options):
+    """Write JSON to a temporary file and rename it over path.
 
-    for i in range(0, len(apps), BATCH_SIZE):
-        batch = apps[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        batch_results = _process_batch(batch, batch_num, num_batches, debug_mode)
-        all_applications.update(batch_results)
+    Readers see either the old file or the complete new one, never a partial write.
+    """
+    with atomic_write(path) as f:
+        json.dump(data, f, ensure_ascii=False, **dump_options)
 
-        if debug_mode:
-            print(f"  Total applications so far: {len(all_applications)}")
 
-    _save_results(all_applications)
+class NdjsonCatalogWriter:
+    """Writes catalog records to a spool file next to the output as batches finish.
+
+    Each record is one line, ``{"name": ..., <entry fields>}``. publish() copies
+    the latest record of every app into a new file sorted by name and renames
+    it over the output; only names and byte offsets are kept in memory.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        directory = os.path.dirname(os.path.abspath(output_path))
+        fd, self._spool_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(output_path)}.", suffix=".spool", dir=directory)
+        self._spool = os.fdopen(fd, 'w+b')
+        self._offsets = {}
+
+    def __contains__(self, name):
+        return name in self._offsets
+
+    def write(self, entries):
+        """Append ``{name: entry}`` records; a later record for an app replaces the earlier one."""
+        for name, entry in entries.items():
+            line = _ndjson_line(name, entry)
+            self._offsets[name] = (self._spool.tell(), len(line))
+            self._spool.write(line)
+        self._spool.flush()
+
+    def publish(self):
+        """Atomically replace the output with the records sorted by name."""
+        try:
+            with atomic_write(self.output_path, 'wb') as f:
+                spool_fd = self._spool.fileno()
+                for name in sorted(self._offsets):
+                    offset, length = self._offsets[name]
+                    f.write(os.pread(spool_fd, length, offset))
+        finally:
+            self.discard()
+        return len(self._offsets)
+
+    def discard(self):
+        """Remove the spool file without publishing anything."""
+        if not self._spool.closed:
+            self._spool.close()
+            os.remove(self._spool_path)
+
+
+def _ndjson_line(name, entry):
+    return (json.dumps(dict(name=name, **entry), ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def load_catalog(path, output_format='json'):
+    """Read a saved catalog as ``{name: entry}``, or {} if there is none yet.
+
+    Entries of the legacy ``{name: "description"}`` format become
+    ``{'description': ...}`` without any metadata.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if output_format != 'ndjson':
+                return {name: entry if isinstance(entry, dict) else {'description': entry or ''}
+                        for name, entry in json.load(f).items()}
+            catalog = {}
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                catalog[record.pop('name')] = record
+            return catalog
+    except (OSError, ValueError):
+        return {}
+
+
+def _format_for(output_path):
+    """Output format implied by a file name: NDJSON for .ndjson/.jsonl, else JSON."""
+    return 'ndjson' if os.path.splitext(output_path)[1] in ('.ndjson', '.jsonl') else 'json'
+
+
+@METRICS.timed('stage_duration_seconds', stage='save')
+def _save_results(all_descriptions, output_path=OUTPUT_FILE, store=None, progress=_CONSOLE,
+                  output_format='json', writer=None):
+    """Atomically save results to applications.json, sorted by app name.
+
+    With ``output_format='ndjson'`` the catalog is written one record per line
+    instead, finishing the NdjsonCatalogWriter that received the build's batches
+    if one is given. A SQLite ``store`` is brought in line with the same
+    results, dropping apps that are no longer installed, in one transaction.
+    """
+    ordered = dict(sorted(all_descriptions.items()))
+    if output_format == 'ndjson':
+        writer = writer or NdjsonCatalogWriter(output_path)
+        writer.write({name: entry for name, entry in ordered.items() if name not in writer})
+        writer.publish()
+    else:
+        _write_json_atomically(output_path, ordered, indent=2)
+    if store is not None:
+        store.replace_all(ordered)
+    described = sum(1 for entry in ordered.values() if entry['description'])
+    METRICS.set('catalog_apps', described, state='described')
+    METRICS.set('catalog_apps', len(ordered) - described, state='empty')
+    progress('saved', f"Saved {len(ordered)} applications with metadata to {output_path}",
+             count=len(ordered), described=described, path=output_path)
+
+
+def write_run_report(report_path, started_at, **summary):
+    """Write the run's summary and everything METRICS recorded as a JSON report."""
+    finished_at = time.time()
+    _write_json_atomically(report_path, {
+        'started_at': started_at,
+        'finished_at': finished_at,
+        'duration_seconds': round(finished_at - started_at, 3),
+        'summary': summary,
+        'metrics': METRICS.snapshot(),
+    }, indent=2)
+
+
+def load_snapshot(snapshot_path):
+    """Load the watch snapshot keyed by bundle path, or {} if there is none."""
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return snapshot if isinstance(snapshot, dict) else {}
+
+
+def _bundle_mtimes(app_path, stat_info):
+    """mtimes of a bundle directory and of its Info.plist, which updates rewrite in place."""
+    try:
+        plist_mtime = os.stat(os.path.join(app_path, 'Contents', 'Info.plist')).st_mtime_ns
+    except OSError:
+        plist_mtime = 0
+    return [stat_info.st_mtime_ns, plist_mtime]
+
+
+@METRICS.timed('stage_duration_seconds', stage='scan')
+def scan_changes(roots, snapshot, workers=SCAN_WORKERS):
+    """Rescan the roots, reading Info.plist only for bundles whose mtimes moved.
+
+    Returns the new snapshot, the deduplicated apps and the paths of the
+    bundles added or modified since ``snapshot`` was taken.
+    """
+    entries = _scan_bundle_entries(roots)
+    new_snapshot, changed = {}, []
+    for entry, stat_info in entries:
+        mtimes = _bundle_mtimes(entry.path, stat_info)
+        previous = snapshot.get(entry.path)
+        if isinstance(previous, dict) and previous.get('mtimes') == mtimes and previous.get('app'):
+            new_snapshot[entry.path] = previous
+        else:
+            new_snapshot[entry.path] = {'mtimes': mtimes}
+            changed.append((entry, stat_info))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for app in executor.map(_details_from_entry, changed):
+            new_snapshot[app['path']]['app'] = app
+
+    # Scan order decides which duplicate wins, exactly as in get_applications()
+    apps = _dedupe_apps(new_snapshot[entry.path]['app'] for entry, _ in entries)
+    return new_snapshot, apps, {entry.path for entry, _ in changed}
+
+
+def _same_release(app, previous):
+    """Whether a bundle still has the identifier and version it had in the snapshot."""
+    return bool(previous) and (
+        (app['bundle_identifier'], app['version'])
+        == (previous.get('bundle_identifier'), previous.get('version'))
+    )
+
+
+def _plan_catalog_update(apps, catalog, snapshot, changed_paths):
+    """Split apps into catalog entries that can be kept and apps to describe.
+
+    Entries of untouched bundles are kept as they are. A touched bundle keeps
+    its description while its identifier and version are unchanged (or its
+    entry still matches it exactly), with the rest of its metadata refreshed.
+    A legacy entry, a bare description, always keeps it and gains the metadata.
+    """
+    kept, pending = {}, []
+    for app in apps:
+        entry = catalog.get(app['name'])
+        legacy = entry is not None and 'path' not in entry
+        if entry and app['path'] not in changed_paths and not legacy:
+            kept[app['name']] = entry
+        elif entry and entry.get('description') and (
+                legacy or _cache_key(entry) == _cache_key(app)
+                or _same_release(app, snapshot.get(app['path'], {}).get('app'))):
+            kept[app['name']] = _merge_app(app, entry['description'])
+        else:
+            pending.append(app)
+    return kept, pending
+
+
+def sync_catalog(options, snapshot, snapshot_path, store=None):
+    """Bring the catalog in line with the roots, describing only what changed.
+
+    Returns the new snapshot, which is persisted next to the output.
+    """
+    started_at = time.time()
+    new_snapshot, apps, changed_paths = scan_changes(options.roots, snapshot)
+    try:
+        catalog = load_catalog(options.output, options.format)
+    except (OSError, ValueError):
+        catalog = {}
+
+    names = {app['name'] for app in apps}
+    removed = sorted(set(catalog) - names)
+    if options.analyze:
+        analyze_footprints(apps, _sidecar_path(options.output, '.footprint.json'))
+    all_applications, pending = _plan_catalog_update(apps, catalog, snapshot, changed_paths)
+    if options.analyze:
+        for app in apps:
+            entry = all_applications.get(app['name'])
+            if entry is not None:
+                all_applications[app['name']] = dict(entry, **_footprint(app))
+    modified = sorted(name for name, entry in all_applications.items() if entry != catalog.get(name))
+
+    if pending or removed or modified:
+        added = sorted(app['name'] for app in pending if app['name'] not in catalog)
+        modified += sorted(app['name'] for app in pending if app['name'] in catalog)
+        print(f"Changes: {len(added)} added, {len(removed)} removed, {len(modified)} modified")
+        for label, changed_names in (('+', added), ('-', removed), ('~', modified)):
+            for name in changed_names:
+                print(f"  {label} {name}")
+
+        cache_path = _sidecar_path(options.output, '.cache.json')
+        cached, pending = _split_cached_apps(pending, load_description_cache(cache_path))
+        all_applications.update(cached)
+        seeded, pending = _split_seeded_apps(pending, options.seed)
+        all_applications.update(seeded)
+        local, pending, tiers = resolve_locally(pending, local_resolvers(options))
+        all_applications.update(local)
+        if any(tiers.values()):
+            print(f"Resolved locally: {_tier_summary(tiers)}")
+        if pending:
+            results, recovered_per_pass = describe_apps(
+                pending, options, store.write_batch if store is not None else None)
+            all_applications.update(results)
+            if recovered_per_pass:
+                print(_retry_summary(recovered_per_pass, pending, all_applications))
+        _save_results(all_applications, options.output, store, output_format=options.format)
+        save_description_cache(cache_path, apps, all_applications, local)
+        write_run_report(_sidecar_path(options.output, '.metrics.json'), started_at,
+                         apps=len(apps), added=len(added), removed=len(removed),
+                         modified=len(modified), described_now=len(pending))
+
+    if new_snapshot != snapshot:
+        _write_json_atomically(snapshot_path, new_snapshot, sort_keys=True)
+    return new_snapshot
+
+
+class InotifyWatcher:
+    """Waits for changes under a set of directories with Linux inotify (via ctypes)."""
+
+    # IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    # | IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT_MASK = 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+
+    def watch(self, paths):
+        """Watch exactly ``paths``; directories that don't exist are skipped."""
+        paths = set(paths)
+        for path in set(self._watches) - paths:
+            self._libc.inotify_rm_watch(self._fd, self._watches.pop(path))
+        for path in paths - set(self._watches):
+            descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.EVENT_MASK)
+            if descriptor >= 0:
+                self._watches[path] = descriptor
+
+    def wait(self, timeout):
+        """Block until an event arrives or ``timeout`` seconds pass; True if anything changed."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        self._drain()
+        return True
+
+    def settle(self, quiet_seconds):
+        """Swallow events until none arrive for ``quiet_seconds`` (an install writes many files)."""
+        while self.wait(quiet_seconds):
+            pass
+
+    def _drain(self):
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _watched_directories(roots, snapshot):
+    """The roots (for installs and removals) and each bundle's Contents (for updates)."""
+    directories = [os.path.expanduser(root) for root in roots]
+    directories += [os.path.join(path, 'Contents') for path in snapshot]
+    return directories
+
+
+def watch_catalog(options):
+    """Keep the catalog up to date as apps are installed, updated and removed."""
+    snapshot_path = _sidecar_path(options.output, '.snapshot.json')
+    snapshot = load_snapshot(snapshot_path)
+    store = CatalogStore(options.store) if options.store else None
+    try:
+        watcher = InotifyWatcher()
+        mode = "inotify"
+    except (OSError, AttributeError):
+        watcher = None
+        mode = f"polling every {options.poll_interval:g}s"
+    print(f"Watching {', '.join(options.roots)} for changes ({mode}); press Ctrl-C to stop")
+
+    try:
+        while True:
+            snapshot = sync_catalog(options, snapshot, snapshot_path, store)
+            if watcher is None:
+                time.sleep(options.poll_interval)
+                continue
+            watcher.watch(_watched_directories(options.roots, snapshot))
+            # Rescan now and then anyway, e.g. for a root that didn't exist yet
+            if watcher.wait(WATCH_RESCAN_SECONDS):
+                watcher.settle(WATCH_SETTLE_SECONDS)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+def build_options(**settings):
+    """Options for build_catalog(): the CLI defaults, overridden by keyword.
+
+    For example ``build_options(roots=['/Applications'], output='/tmp/apps.json', jobs=8)``.
+    """
+    options = _parse_arguments([])
+    unknown = set(settings) - set(vars(options))
+    if unknown:
+        raise TypeError(f"Unknown build option(s): {', '.join(sorted(unknown))}")
+    vars(options).update(settings)
+    options.roots = tuple(options.roots)
+    if 'format' not in settings:
+        options.format = _format_for(options.output)
+    return options
+
+
+def build_catalog(options=None, on_progress=None, on_result=None):
+    """Scan the roots, describe new and changed apps and save the catalog.
+
+    ``options`` comes from build_options() (or the CLI). ``on_progress`` gets
+    each typed progress event dict (see ProgressReporter); without it progress
+    is printed. ``on_result`` is called with ``{name: entry}`` for every batch
+    Goose finishes. Returns the run summary that is also written to the run
+    report.
+    """
+    options = options or build_options()
+    progress = ProgressReporter(on_progress)
+    started_at = time.time()
+    METRICS.reset()
+    apps = get_applications(options.roots)
+    if not apps:
+        progress('scan', f"No applications found in {', '.join(options.roots)}.", apps=0)
+        return {'apps': 0}
+
+    if options.analyze:
+        hits, walked = analyze_footprints(apps, _sidecar_path(options.output, '.footprint.json'))
+        progress('analyze', f"Footprints: {hits} cached, {walked} bundle(s) analyzed",
+                 cached=hits, analyzed=walked)
+
+    cache_path = _sidecar_path(options.output, '.cache.json')
+    # Loaded even with --force, which only skips its hits, so evictions are still counted
+    cache = load_description_cache(cache_path)
+    all_applications, pending = _split_cached_apps(apps, {} if options.force else cache)
+    cache_misses = len(pending)
+
+    seeded, pending = _split_seeded_apps(pending, options.seed)
+    all_applications.update(seeded)
+    if options.seed:
+        progress('seed', f"Fleet seed: {len(seeded)} app(s) already described in {options.seed}",
+                 apps=len(seeded), path=options.seed)
+
+    local, pending, tiers = resolve_locally(pending, local_resolvers(options))
+    all_applications.update(local)
+    if tiers:
+        progress('resolve', f"Resolved locally: {_tier_summary(tiers)}", tiers=tiers)
+
+    checkpoint_path = _sidecar_path(options.output, '.checkpoint.jsonl')
+    store = CatalogStore(options.store) if options.store else None
+    resumed = {}
+    if options.resume:
+        resumed, pending = _split_checkpointed_apps(pending, load_checkpoint(checkpoint_path))
+        all_applications.update(resumed)
+        progress('resume', f"Resuming: {len(resumed)} app(s) already described in {checkpoint_path}",
+                 apps=len(resumed))
+
+    progress(
+        'plan',
+        f"Found {len(apps)} apps, {len(all_applications)} unchanged or already described. "
+        f"Generating descriptions for {len(pending)} app(s) with {options.jobs} parallel job(s), "
+        f"starting at ~{options.batch_budget} prompt characters per batch...",
+        apps=len(apps), reused=len(all_applications), pending=len(pending), jobs=options.jobs,
+    )
+
+    recovered_per_pass = []
+    writer = None
+    if options.format == 'ndjson':
+        # Records reach the spool as batches finish instead of all at once at the end
+        writer = NdjsonCatalogWriter(options.output)
+        writer.write(all_applications)
+    try:
+        if pending:
+            # Resuming appends to the journal; a fresh run starts a new one
+            with open(checkpoint_path, 'a' if options.resume else 'w',
+                      encoding='utf-8') as checkpoint_file:
+                def on_batch(batch_results):
+                    _append_checkpoint(checkpoint_file, batch_results)
+                    if writer is not None:
+                        writer.write(batch_results)
+                    if store is not None:
+                        store.write_batch(batch_results)
+                    if on_result is not None:
+                        on_result(batch_results)
+
+                results, recovered_per_pass = describe_apps(pending, options, on_batch, progress)
+            all_applications.update(results)
+            progress('retry_summary', _retry_summary(recovered_per_pass, pending, all_applications),
+                     recovered=recovered_per_pass)
+        _save_results(all_applications, options.output, store, progress,
+                      output_format=options.format, writer=writer)
+    except BaseException:
+        if writer is not None:
+            writer.discard()
+        raise
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    new_cache = save_description_cache(cache_path, apps, all_applications, local)
+    evicted = len(set(cache) - set(new_cache))
+    progress(
+        'cache',
+        f"Description cache: {len(apps) - cache_misses} hit(s), {cache_misses} miss(es), "
+        f"{evicted} stale entr{'y' if evicted == 1 else 'ies'} evicted",
+        hits=len(apps) - cache_misses, misses=cache_misses, evicted=evicted,
+    )
+
+    summary = {
+        'apps': len(apps),
+        'cache_hits': len(apps) - cache_misses,
+        'seeded': len(seeded),
+        'resumed': len(resumed),
+        'sent_to_goose': len(pending),
+        'described': sum(1 for entry in all_applications.values() if entry['description']),
+        'undescribed': sum(1 for entry in all_applications.values() if not entry['description']),
+        'retry_recovered': recovered_per_pass,
+        'tiers': dict(tiers, llm=sum(1 for app in pending if all_applications[app['name']]['description'])),
+    }
+    report_path = _sidecar_path(options.output, '.metrics.json')
+    write_run_report(report_path, started_at, **summary)
+    progress('report', f"Run report written to {report_path}", path=report_path)
+    return summary
+
+
+def main():
+    options = _parse_arguments()
+    if options.watch:
+        watch_catalog(options)
+        return
+    build_catalog(options)
 
 
 if __name__ == "__main__":
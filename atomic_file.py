@@ -0,0 +1,50 @@
+"""
+Atomic replacement of output files.
+
+    with atomic_write('applications.json') as f:
+        json.dump(catalog, f)
+
+The data goes to a temporary file next to the target, which is renamed over
+it once complete, so readers see either the old file or the new one, never a
+partial write.
+"""
+import contextlib
+import os
+import tempfile
+
+# The umask can only be read by setting it; do that once, at import, before any
+# worker thread could create a file in between
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def published_mode(path):
+    """Permissions for a new version of ``path``: those of the file it replaces, or
+    the default for a new file under the process umask.
+
+    mkstemp() creates files readable by their owner only, and a rename keeps that.
+    """
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='w', encoding='utf-8'):
+    """Yield a file to write; on success it is synced and renamed over ``path``.
+
+    On an exception the temporary file is removed and ``path`` is left as it was.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        os.fchmod(fd, published_mode(path))
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
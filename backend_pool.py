@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Routing of Goose calls across several backends.
+
+A backend is a Goose profile or provider, or any command that reads a prompt on
+stdin and prints an answer. Each one has a token-bucket rate limit, a cap on
+concurrent calls and a latency/health score; every call goes to the fastest
+healthy backend with capacity, and a failed call fails over to the next one.
+The pool is configured from a JSON file:
+
+    {
+      "backends": [
+        {"name": "claude", "command": "goose", "env": {"GOOSE_PROVIDER": "anthropic"},
+         "rate_per_minute": 30, "burst": 3, "concurrency": 2},
+        {"name": "local", "command": "goose", "env": {"GOOSE_PROVIDER": "ollama"},
+         "concurrency": 1},
+        {"name": "wrapper", "command": "./describe-apps.sh", "args": ["--stdin"]}
+      ]
+    }
+
+``command`` is split like a shell command line and followed by ``args``
+(default: ``run -i -``, Goose reading its instructions from stdin). ``env``
+is added to the environment of each call.
+"""
+import json
+import threading
+import time
+
+from metrics import METRICS
+
+DEFAULT_ARGS = ('run', '-i', '-')
+DEFAULT_CONCURRENCY = 2
+# Weight of the newest call in a backend's latency average
+LATENCY_SMOOTHING = 0.3
+# A backend that keeps failing is skipped for this long, doubling per failure up to the cap
+UNHEALTHY_SECONDS = 30.0
+MAX_UNHEALTHY_SECONDS = 600.0
+
+
+class TokenBucket:
+    """Allows ``rate`` calls per second on average and bursts of up to ``capacity``."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available; 0 if one is available now."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class Backend:
+    """One Goose backend and what the pool has learned about it."""
+
+    def __init__(self, name, command, args=DEFAULT_ARGS, env=None, rate_per_minute=None,
+                 burst=1, concurrency=DEFAULT_CONCURRENCY, clock=time.monotonic):
+        # Limits that could never admit a call would leave acquire() waiting forever
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if rate_per_minute is not None and rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.name = name
+        self.command = command
+        self.args = list(args)
+        self.env = dict(env or {})
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate_per_minute / 60, burst, clock) if rate_per_minute else None
+        self.in_flight = 0
+        self.calls = 0
+        # Average seconds per answered call; None until the first answer
+        self.latency = None
+        self.failures = 0
+        self.unhealthy_until = 0.0
+
+    def score(self):
+        """Expected seconds until a new call would finish; lower is better.
+
+        Backends that have not answered yet score 0, so each one gets tried.
+        """
+        return (self.latency or 0.0) * (1 + self.in_flight / self.concurrency)
+
+    def snapshot(self):
+        return {'name': self.name, 'calls': self.calls, 'in_flight': self.in_flight,
+                'failures': self.failures,
+                'latency': round(self.latency, 3) if self.latency is not None else None}
+
+
+class BackendPool:
+    """Routes calls to the fastest healthy backend that has capacity, with failover."""
+
+    def __init__(self, backends, clock=time.monotonic):
+        if not backends:
+            raise ValueError("a backend pool needs at least one backend")
+        self.backends = list(backends)
+        self.clock = clock
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_file(cls, path, clock=time.monotonic):
+        """Load the pool described by a JSON config file (see the module docstring)."""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict) or not isinstance(config.get('backends', []), list):
+            raise ValueError(f"Invalid backend config in {path}: expected an object with a "
+                             f"\"backends\" list")
+        backends = []
+        for i, settings in enumerate(config.get('backends', [])):
+            name = f"backend{i + 1}"
+            try:
+                settings = dict(settings)
+                name = settings.pop('name', name)
+                backends.append(Backend(name, settings.pop('command'), clock=clock, **settings))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Invalid backend {name!r} in {path}: {e}") from e
+        return cls(backends, clock)
+
+    def _candidates(self, exclude):
+        now = self.clock()
+        usable = [backend for backend in self.backends if backend.name not in exclude]
+        healthy = [backend for backend in usable if backend.unhealthy_until <= now]
+        # With every backend marked unhealthy, probe them rather than give up
+        return healthy or usable
+
+    def acquire(self, exclude=(), progress=None):
+        """Reserve a call on the best backend not in ``exclude``; None if all are excluded.
+
+        Blocks while every candidate is at its concurrency cap or out of rate
+        tokens.
+        """
+        with self._condition:
+            throttled_since = None
+            while True:
+                candidates = self._candidates(exclude)
+                if not candidates:
+                    return None
+                open_backends = [backend for backend in candidates
+                                 if backend.in_flight < backend.concurrency]
+                ready = [backend for backend in open_backends
+                         if backend.bucket is None or backend.bucket.wait_time() == 0]
+                if ready:
+                    backend = min(ready, key=lambda backend: (backend.score(), self.backends.index(backend)))
+                    if backend.bucket is not None:
+                        backend.bucket.take()
+                    backend.in_flight += 1
+                    if throttled_since is not None:
+                        METRICS.observe('backend_throttle_seconds', self.clock() - throttled_since)
+                    if progress is not None:
+                        progress('route', f"  Routing to {backend.name} (score {backend.score():.2f}s, "
+                                          f"{backend.in_flight}/{backend.concurrency} in flight)",
+                                 backend=backend.name, score=round(backend.score(), 3),
+                                 in_flight=backend.in_flight)
+                    return backend
+
+                waits = [backend.bucket.wait_time() for backend in open_backends]
+                timeout = min(waits) if waits else None
+                if throttled_since is None:
+                    throttled_since = self.clock()
+                    if progress is not None:
+                        reason = 'rate limited' if open_backends else 'at their concurrency caps'
+                        progress('throttle', f"  All backends {reason}; waiting",
+                                 backends=[backend.name for backend in candidates],
+                                 wait=round(timeout, 3) if timeout is not None else None)
+                # Woken early whenever a call finishes and frees a slot
+                self._condition.wait(timeout)
+
+    def release(self, backend, seconds, ok, progress=None):
+        """Record a finished call: its latency and whether it produced an answer."""
+        with self._condition:
+            backend.in_flight -= 1
+            backend.calls += 1
+            if ok:
+                backend.latency = seconds if backend.latency is None else (
+                    LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * backend.latency)
+                backend.failures = 0
+                backend.unhealthy_until = 0.0
+            else:
+                backend.failures += 1
+                cooldown = min(MAX_UNHEALTHY_SECONDS, UNHEALTHY_SECONDS * 2 ** (backend.failures - 1))
+                backend.unhealthy_until = self.clock() + cooldown
+                if progress is not None:
+                    progress('backend_unhealthy',
+                             f"  {backend.name} failed ({backend.failures} in a row); "
+                             f"skipping it for {cooldown:.0f}s",
+                             backend=backend.name, failures=backend.failures, cooldown=cooldown)
+            self._condition.notify_all()
+        METRICS.inc('backend_calls_total', backend=backend.name, result='ok' if ok else 'failed')
+        METRICS.observe('backend_call_seconds', seconds, backend=backend.name)
+
+    def call(self, run, progress=None):
+        """``run(backend)`` on the best backend, failing over while it returns None.
+
+        Each backend is tried at most once per call.
+        """
+        tried = set()
+        while True:
+            backend = self.acquire(tried, progress)
+            if backend is None:
+                return None
+            started = self.clock()
+            try:
+                response = run(backend)
+            except BaseException:
+                self.release(backend, self.clock() - started, False, progress)
+                raise
+            self.release(backend, self.clock() - started, response is not None, progress)
+            if response is not None:
+                return response
+            tried.add(backend.name)
+            if progress is not None and len(tried) < len(self.backends):
+                progress('failover', f"  No answer from {backend.name}; failing over",
+                         backend=backend.name)
+
+    def snapshot(self):
+        with self._condition:
+            return [backend.snapshot() for backend in self.backends]
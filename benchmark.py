@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the App Metadata Builder.
+
+Results are printed as JSON (or written with --output) so runs can be compared
+across commits:
+
+    python benchmark.py parser --sizes 1,4 --repeat 5
+    python benchmark.py pipeline --apps 500 --jobs 4 --latency 0.2
+    python benchmark.py search --sizes 10000,100000
+"""
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import plistlib
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import app_metadata_builder
+from test_python import ACTUAL_OUTPUT, FORMAT_CASES, SAMPLE_RESPONSE
+
+
+# The regex cascade parse_goose_response used before the single-pass scanner,
+# kept here as the baseline for the parser benchmark.
+
+def _legacy_extract_key_value_pairs(text):
+    obj = {}
+    key_value_pattern = re.compile(r'"([^\"]+)":\s*"([^\"]*)",?')
+    for line in text.splitlines():
+        m = key_value_pattern.match(line.strip())
+        if m:
+            obj[m.group(1)] = m.group(2)
+    return obj
+
+
+def _legacy_try_parse_code_blocks(response):
+    code_blocks = re.findall(
+        r"```(?:json)?[ \t]*\n([\s\S]*?)\n[ \t]*```",
+        response, re.IGNORECASE
+    )
+    for block in reversed(code_blocks):
+        block = block.strip()
+        result = app_metadata_builder._try_parse_json(block)
+        if result:
+            return result
+        obj = _legacy_extract_key_value_pairs(block)
+        if obj:
+            return obj
+    return None
+
+
+def _legacy_try_parse_json_objects(response):
+    matches = re.findall(r'(\{[\s\S]*\})', response, re.DOTALL)
+    for match in reversed(matches):
+        parsed = app_metadata_builder._try_parse_json(match.strip())
+        if app_metadata_builder._is_valid_string_dict(parsed):
+            return parsed
+    return None
+
+
+def _legacy_try_parse_fallback(response):
+    first = response.find('{')
+    last = response.rfind('}')
+    if first == -1 or last == -1 or last <= first:
+        return None
+    candidate = response[first:last + 1].strip()
+    return app_metadata_builder._try_parse_json(candidate) or _legacy_extract_key_value_pairs(candidate)
+
+
+def legacy_parse_goose_response(response):
+    """parse_goose_response as it was before the single-pass scanner."""
+    response = re.compile(r'\x1b\[[0-9;]*[a-zA-Z]').sub('', response)
+    return (
+        _legacy_try_parse_code_blocks(response)
+        or _legacy_try_parse_json_objects(response)
+        or _legacy_try_parse_fallback(response)
+        or {}
+    )
+
+
+def synthetic_transcript(target_bytes, app_count=50, fenced=True, truncated=False):
+    """Build a chatty Goose transcript of about target_bytes ending in a JSON answer.
+
+    ``fenced`` wraps the answer in a ```json block; ``truncated`` cuts the answer
+    off partway, as when Goose times out mid-response.
+    """
+    chatter = (
+        '\x1b[2m─── shell | developer ──────\x1b[0m\n'
+        'command: mdls -name kMDItemVersion {"path": "/Applications/Example.app"}\n'
+        'output: {"kMDItemVersion": "1.0", "flags": {"hidden": false}} done\n'
+        'Looking at the bundle metadata to describe what the app does.\n'
+    )
+    answer = json.dumps(
+        {f"App {i}": f"Describes app {i} with {{braces}} and \"quotes\"." for i in range(app_count)},
+        indent=2,
+    )
+    if truncated:
+        answer = answer[:len(answer) * 2 // 3]
+    elif fenced:
+        answer = '```json\n' + answer + '\n```\n'
+    repeats = max(0, (target_bytes - len(answer)) // len(chatter))
+    return 'starting session | provider: stub\n' + chatter * repeats + answer
+
+
+def _best_time(function, argument, repeat):
+    """Best wall time of ``repeat`` calls, plus the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(argument)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def benchmark_parser(sizes_mb, repeat):
+    """Time the legacy regex cascade against the single-pass scanner."""
+    cases = [('sample_response', SAMPLE_RESPONSE), ('actual_output', ACTUAL_OUTPUT)]
+    cases += [(f'format_case_{i}', case) for i, case in enumerate(FORMAT_CASES, 1)]
+    for size in sizes_mb:
+        target = int(size * 1024 * 1024)
+        cases += [
+            (f'synthetic_{size}mb_fenced', synthetic_transcript(target)),
+            (f'synthetic_{size}mb_unfenced', synthetic_transcript(target, fenced=False)),
+            (f'synthetic_{size}mb_truncated', synthetic_transcript(target, truncated=True)),
+        ]
+
+    results = []
+    for name, transcript in cases:
+        legacy_seconds, legacy = _best_time(legacy_parse_goose_response, transcript, repeat)
+        scanner_seconds, current = _best_time(app_metadata_builder.parse_goose_response, transcript, repeat)
+        results.append({
+            'case': name,
+            'bytes': len(transcript.encode('utf-8')),
+            'legacy_seconds': round(legacy_seconds, 6),
+            'scanner_seconds': round(scanner_seconds, 6),
+            'speedup': round(legacy_seconds / scanner_seconds, 2) if scanner_seconds else None,
+            'legacy_apps': len(legacy),
+            'scanner_apps': len(current),
+        })
+    return results
+
+
+FAKE_GOOSE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_goose.py')
+
+
+def make_synthetic_bundles(root, count):
+    """Create ``count`` .app bundles under root, alternating XML and binary Info.plists."""
+    for i in range(count):
+        contents = os.path.join(root, f'Synthetic App {i:05d}.app', 'Contents')
+        os.makedirs(contents)
+        plist = {
+            'CFBundleIdentifier': f'com.example.synthetic{i:05d}',
+            'CFBundleShortVersionString': f'{i % 7}.{i % 13}.{i % 3}',
+            'CFBundleExecutable': f'Synthetic App {i:05d}',
+        }
+        if i % 3 == 0:
+            plist['CFBundleGetInfoString'] = f'Synthetic App {i} {i % 7}.0, Copyright © 2025 Example Inc.'
+        if i % 5 == 0:
+            plist['CFBundleDescription'] = f'Synthetic application number {i} used for benchmarking.'
+        fmt = plistlib.FMT_BINARY if i % 2 else plistlib.FMT_XML
+        with open(os.path.join(contents, 'Info.plist'), 'wb') as f:
+            plistlib.dump(plist, f, fmt=fmt)
+
+
+class _StageTimer:
+    """Collects wall-clock seconds per named pipeline stage."""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.perf_counter() - started, 6)
+
+
+def _summarize(seconds):
+    if not seconds:
+        return {'count': 0}
+    return {
+        'count': len(seconds),
+        'mean': round(statistics.mean(seconds), 6),
+        'p50': round(statistics.median(seconds), 6),
+        'max': round(max(seconds), 6),
+    }
+
+
+def benchmark_pipeline(app_count, jobs, latency, shape, budget, goose_command, linger=0.0):
+    """Run scan, render, CLI, parse, merge and save on a synthetic tree, timing each stage.
+
+    ``linger`` keeps each stub session open that long after it has answered.
+    """
+    timer = _StageTimer()
+    call_seconds = []
+    stub_env = {'FAKE_GOOSE_LATENCY': str(latency), 'FAKE_GOOSE_SHAPE': shape,
+                'FAKE_GOOSE_LINGER': str(linger)}
+
+    def call_goose(prompt, app_names):
+        started = time.perf_counter()
+        response = app_metadata_builder.run_goose_cli(prompt, goose_command=goose_command,
+                                                      app_names=app_names)
+        call_seconds.append(time.perf_counter() - started)
+        return response
+
+    with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, stub_env), \
+            contextlib.redirect_stdout(io.StringIO()):
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        make_synthetic_bundles(root, app_count)
+
+        with timer.stage('scan'):
+            apps = app_metadata_builder.get_applications([root])
+
+        # A static plan: the planner isn't fed results, so runs are comparable
+        planner = app_metadata_builder.BatchPlanner(budget)
+        pending = collections.deque(apps)
+        batches = []
+        while pending:
+            batches.append(planner.next_batch(pending))
+
+        with timer.stage('render'):
+            prompts = [app_metadata_builder.render_prompt(batch) for batch in batches]
+
+        with timer.stage('cli'):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                responses = list(executor.map(
+                    call_goose, prompts, [[app['name'] for app in batch] for batch in batches]
+                ))
+
+        with timer.stage('parse'):
+            parsed = [app_metadata_builder.parse_goose_response(response or '')
+                      for response in responses]
+
+        with timer.stage('merge'):
+            merged = {
+                app['name']: app_metadata_builder._merge_app(app, descriptions.get(app['name'], ''))
+                for batch, descriptions in zip(batches, parsed) for app in batch
+            }
+
+        with timer.stage('save'):
+            app_metadata_builder._save_results(merged, os.path.join(tmp, 'applications.json'))
+
+    return {
+        'apps': len(apps),
+        'batches': len(batches),
+        'described': sum(1 for entry in merged.values() if entry['description']),
+        'jobs': jobs,
+        'stub_latency': latency,
+        'stub_linger': linger,
+        'response_shape': shape,
+        'stages': timer.stages,
+        'cli_calls': _summarize(call_seconds),
+    }
+
+
+SEARCH_QUERIES = ('ph', 'photo', 'photo edit', 'photp', 'com.vendor12', 'synk music', 'zzzz')
+_SYLLABLES = ('pho', 'to', 'edit', 'syn', 'k', 'mu', 'sic', 'note', 'mail', 'dra', 'w', 'code',
+              'view', 'track', 'ca', 'lendar', 'chat', 'vid', 'eo', 'scan', 'pdf', 'clip', 'board')
+
+
+def _load_web_app():
+    """Import app/app.py, which holds the search index, as a module."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'app.py')
+    spec = importlib.util.spec_from_file_location('web_app', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_catalog(count, seed=0):
+    """A normalized catalog of ``count`` apps with made-up names, bundle IDs and descriptions."""
+    rng = random.Random(seed)
+    words = [''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 3))) for _ in range(2000)]
+    catalog = {}
+    while len(catalog) < count:
+        name = ' '.join(rng.choice(words).capitalize() for _ in range(rng.randint(1, 3)))
+        if name in catalog:
+            name = f'{name} {len(catalog)}'
+        catalog[name] = {
+            'description': ' '.join(rng.choice(words) for _ in range(rng.randint(6, 14))).capitalize() + '.',
+            'bundle_identifier': f'com.vendor{rng.randrange(500)}.{name.lower().replace(" ", "")}',
+            'copyright': f'Copyright © {rng.randint(2000, 2025)} Vendor {rng.randrange(500)}',
+        }
+    return catalog
+
+
+def benchmark_search(sizes, repeat):
+    """Time building, incrementally updating and querying the web app's search index."""
+    web_app = _load_web_app()
+    results = []
+    for size in sizes:
+        catalog = synthetic_catalog(size)
+        index = web_app.SearchIndex()
+        started = time.perf_counter()
+        index.update(catalog)
+        build_seconds = time.perf_counter() - started
+
+        # A rebuild touching 1% of the apps, as after an incremental builder run
+        changed = dict(catalog)
+        for name in list(changed)[::100]:
+            changed[name] = dict(changed[name], description=changed[name]['description'] + ' Updated.')
+        started = time.perf_counter()
+        reindexed, _ = index.update(changed)
+        update_seconds = time.perf_counter() - started
+
+        queries = []
+        for query in SEARCH_QUERIES:
+            seconds = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                matches = index.search(query, web_app.SEARCH_DEFAULT_LIMIT)
+                seconds.append(time.perf_counter() - started)
+            seconds.sort()
+            queries.append({
+                'query': query,
+                'matches': len(matches),
+                'p50_ms': round(statistics.median(seconds) * 1000, 3),
+                'p95_ms': round(seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))] * 1000, 3),
+            })
+        results.append({
+            'apps': size,
+            'build_seconds': round(build_seconds, 3),
+            'update_seconds': round(update_seconds, 3),
+            'reindexed': reindexed,
+            'queries': queries,
+        })
+    return results
+
+
+def _parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the App Metadata Builder.")
+    parser.add_argument('--output', '-o', help='Write the JSON results to this file')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    parser_bench = subparsers.add_parser('parser', help='parse_goose_response micro-benchmark')
+    parser_bench.add_argument('--sizes', default='1,4',
+                              help='Comma-separated synthetic transcript sizes in MB (default: 1,4)')
+    parser_bench.add_argument('--repeat', type=int, default=5,
+                              help='Runs per case; the best time is reported (default: 5)')
+
+    pipeline = subparsers.add_parser('pipeline', help='End-to-end build on synthetic bundles')
+    pipeline.add_argument('--apps', type=int, default=200,
+                          help='Number of synthetic .app bundles (default: 200)')
+    pipeline.add_argument('--jobs', type=int, default=app_metadata_builder.DEFAULT_JOBS,
+                          help='Concurrent Goose calls (default: %(default)s)')
+    pipeline.add_argument('--latency', type=float, default=0.0,
+                          help='Seconds the Goose stub waits before answering (default: 0)')
+    pipeline.add_argument('--linger', type=float, default=0.0,
+                          help='Seconds each stub session stays open after answering (default: 0)')
+    pipeline.add_argument('--shape', default='fenced',
+                          choices=['fenced', 'bare', 'chatty', 'truncated', 'empty', 'error'],
+                          help='Response shape of the Goose stub (default: fenced)')
+    pipeline.add_argument('--batch-budget', type=int,
+                          default=app_metadata_builder.DEFAULT_PROMPT_BUDGET,
+                          help='Prompt characters per batch (default: %(default)s)')
+    pipeline.add_argument('--goose', default=f'"{sys.executable}" "{FAKE_GOOSE}"',
+                          help='Goose command to benchmark (default: the fake_goose.py stub)')
+
+    search = subparsers.add_parser('search', help='Web app search index build and query latency')
+    search.add_argument('--sizes', default='10000,100000',
+                        help='Comma-separated catalog sizes (default: 10000,100000)')
+    search.add_argument('--repeat', type=int, default=20,
+                        help='Runs per query (default: 20)')
+    return parser.parse_args(argv)
+
+
+def _git_commit():
+    """Commit the benchmark ran against, so results can be tracked over time."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def main(argv=None):
+    options = _parse_arguments(argv)
+    report = {
+        'benchmark': options.benchmark,
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    if options.benchmark == 'parser':
+        sizes = [float(size) for size in options.sizes.split(',') if size]
+        report['results'] = benchmark_parser(sizes, options.repeat)
+    elif options.benchmark == 'pipeline':
+        report['results'] = benchmark_pipeline(
+            options.apps, options.jobs, options.latency, options.shape,
+            options.batch_budget, options.goose, options.linger
+        )
+    elif options.benchmark == 'search':
+        sizes = [int(size) for size in options.sizes.split(',') if size]
+        report['results'] = benchmark_search(sizes, options.repeat)
+
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
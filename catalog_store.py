@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+SQLite storage for the application catalog.
+
+An optional alternative to reading and rewriting applications.json in full:
+the builder writes each finished batch in its own transaction and the web app
+looks up single apps and searches descriptions with indexed queries. The
+database runs in WAL mode, so readers keep working while a build writes.
+
+applications.json stays the interchange format:
+
+    python catalog_store.py import applications.json applications.db
+    python catalog_store.py export applications.db applications.json
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+from atomic_file import atomic_write
+
+# Bundle footprint columns filled in by the builder's --analyze, with their SQL
+# types; NULL (and left out of the entry) for apps that were not analyzed.
+# architectures holds a JSON array.
+FOOTPRINT_COLUMNS = (('size_bytes', 'INTEGER'), ('file_count', 'INTEGER'), ('architectures', 'TEXT'))
+# Columns of the applications table, in applications.json entry order
+ENTRY_FIELDS = ('description', 'version', 'created', 'modified', 'copyright',
+                'CFBundleDescription', 'bundle_identifier', 'path') + tuple(
+                    column for column, _ in FOOTPRINT_COLUMNS)
+SEARCH_LIMIT = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL DEFAULT '',
+    version TEXT NOT NULL DEFAULT '',
+    created TEXT NOT NULL DEFAULT '',
+    modified TEXT NOT NULL DEFAULT '',
+    copyright TEXT NOT NULL DEFAULT '',
+    CFBundleDescription TEXT NOT NULL DEFAULT '',
+    bundle_identifier TEXT NOT NULL DEFAULT '',
+    path TEXT NOT NULL DEFAULT '',
+    size_bytes INTEGER,
+    file_count INTEGER,
+    architectures TEXT
+);
+CREATE INDEX IF NOT EXISTS applications_bundle_identifier ON applications (bundle_identifier);
+"""
+
+# External-content FTS5 index kept in sync with the applications table by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+    name, description, copyright, content='applications', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+    INSERT INTO applications_fts (rowid, name, description, copyright)
+    VALUES (new.id, new.name, new.description, new.copyright);
+END;
+CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+    INSERT INTO applications_fts (applications_fts, rowid, name, description, copyright)
+    VALUES ('delete', old.id, old.name, old.description, old.copyright);
+END;
+CREATE TRIGGER IF NOT EXISTS applications_fts_update AFTER UPDATE ON applications BEGIN
+    INSERT INTO applications_fts (applications_fts, rowid, name, description, copyright)
+    VALUES ('delete', old.id, old.name, old.description, old.copyright);
+    INSERT INTO applications_fts (rowid, name, description, copyright)
+    VALUES (new.id, new.name, new.description, new.copyright);
+END;
+"""
+
+_COLUMNS = ', '.join(ENTRY_FIELDS)
+_UPSERT = (
+    f"INSERT INTO applications (name, {_COLUMNS}) "
+    f"VALUES (?, {', '.join('?' for _ in ENTRY_FIELDS)}) "
+    f"ON CONFLICT (name) DO UPDATE SET "
+    + ', '.join(f"{field} = excluded.{field}" for field in ENTRY_FIELDS)
+)
+_SEARCH_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+_FOOTPRINT_FIELDS = {column for column, _ in FOOTPRINT_COLUMNS}
+
+
+def _row_values(name, entry):
+    if not isinstance(entry, dict):
+        # Catalogs from before the metadata format map names to plain descriptions
+        entry = {'description': entry or ''}
+    values = [name]
+    for field in ENTRY_FIELDS:
+        value = entry.get(field)
+        if field not in _FOOTPRINT_FIELDS:
+            values.append(str(value or ''))
+        elif value is None or value == '':
+            values.append(None)
+        else:
+            values.append(json.dumps(value) if field == 'architectures' else value)
+    return tuple(values)
+
+
+class CatalogStore:
+    """The catalog in a SQLite database, with one connection per thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        # WAL lets the web app read while a build commits batches
+        connection.execute('PRAGMA journal_mode=WAL')
+        with connection:
+            connection.executescript(_SCHEMA)
+        self._migrate(connection)
+        try:
+            with connection:
+                connection.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to a LIKE scan
+            self.has_fts = False
+
+    @staticmethod
+    def _migrate(connection):
+        """Add the columns a database created by an older version lacks."""
+        existing = {row[1] for row in connection.execute('PRAGMA table_info(applications)')}
+        for column, sql_type in FOOTPRINT_COLUMNS:
+            if column in existing:
+                continue
+            try:
+                with connection:
+                    connection.execute(f'ALTER TABLE applications ADD COLUMN {column} {sql_type}')
+            except sqlite3.OperationalError as e:
+                # Another process opening the same database may have added it first
+                if 'duplicate column' not in str(e):
+                    raise
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """Close this thread's connection."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def write_batch(self, entries):
+        """Insert or update ``{name: entry}`` in a single transaction."""
+        with self._connection() as connection:
+            connection.executemany(_UPSERT, [_row_values(name, entry) for name, entry in entries.items()])
+
+    def replace_all(self, entries):
+        """Make the store hold exactly ``entries``, in a single transaction."""
+        with self._connection() as connection:
+            connection.execute('CREATE TEMP TABLE IF NOT EXISTS keep_names (name TEXT PRIMARY KEY)')
+            connection.execute('DELETE FROM keep_names')
+            connection.executemany('INSERT INTO keep_names (name) VALUES (?)', [(name,) for name in entries])
+            connection.execute('DELETE FROM applications WHERE name NOT IN (SELECT name FROM keep_names)')
+            connection.executemany(_UPSERT, [_row_values(name, entry) for name, entry in entries.items()])
+
+    def get(self, name):
+        """The applications.json entry for one app, or None."""
+        row = self._connection().execute(
+            f'SELECT name, {_COLUMNS} FROM applications WHERE name = ?', (name,)
+        ).fetchone()
+        return _split_row(row)[1] if row else None
+
+    def find_by_bundle_identifier(self, bundle_identifier):
+        """``(name, entry)`` pairs for every app with this bundle identifier."""
+        rows = self._connection().execute(
+            f'SELECT name, {_COLUMNS} FROM applications WHERE bundle_identifier = ? ORDER BY name',
+            (bundle_identifier,)
+        )
+        return [_split_row(row) for row in rows]
+
+    def signature(self):
+        """Changes whenever a transaction commits: (mtime_ns, size) of the database and its WAL."""
+        signature = []
+        for path in (self.path, self.path + '-wal'):
+            try:
+                stat_info = os.stat(path)
+                signature.append((stat_info.st_mtime_ns, stat_info.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM applications').fetchone()[0]
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """``(name, entry)`` pairs whose name, description or copyright match ``text``.
+
+        Every word must match, as a prefix; results are ranked by relevance
+        (BM25) when FTS5 is available and by name otherwise.
+        """
+        terms = _SEARCH_TERM.findall(text)
+        if not terms:
+            return []
+        connection = self._connection()
+        if self.has_fts:
+            query = ' '.join(f'"{term}"*' for term in terms)
+            rows = connection.execute(
+                f'SELECT a.name, {", ".join("a." + field for field in ENTRY_FIELDS)} '
+                'FROM applications_fts JOIN applications a ON a.id = applications_fts.rowid '
+                'WHERE applications_fts MATCH ? ORDER BY applications_fts.rank, a.name LIMIT ?',
+                (query, limit)
+            )
+        else:
+            conditions = ' AND '.join(
+                "(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\' "
+                "OR copyright LIKE ? ESCAPE '\\')" for _ in terms
+            )
+            patterns = []
+            for term in terms:
+                pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                patterns += [pattern] * 3
+            rows = connection.execute(
+                f'SELECT name, {_COLUMNS} FROM applications WHERE {conditions} ORDER BY name LIMIT ?',
+                patterns + [limit]
+            )
+        return [_split_row(row) for row in rows]
+
+    def to_dict(self):
+        """The whole catalog in applications.json form, sorted by name."""
+        rows = self._connection().execute(f'SELECT name, {_COLUMNS} FROM applications ORDER BY name')
+        return dict(_split_row(row) for row in rows)
+
+
+def _split_row(row):
+    entry = dict(row)
+    for field in _FOOTPRINT_FIELDS:
+        if entry[field] is None:
+            del entry[field]
+        elif field == 'architectures':
+            entry[field] = json.loads(entry[field])
+    return entry.pop('name'), entry
+
+
+def import_json(json_path, store):
+    """Load an applications.json file into the store, replacing its contents."""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    store.replace_all(entries)
+    return len(entries)
+
+
+def export_json(store, json_path):
+    """Atomically write the store out as an applications.json file."""
+    entries = store.to_dict()
+    with atomic_write(json_path) as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    return len(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert between applications.json and a SQLite catalog.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    importer = subparsers.add_parser('import', help='Load applications.json into a database')
+    importer.add_argument('json_path')
+    importer.add_argument('db_path')
+    exporter = subparsers.add_parser('export', help='Write a database out as applications.json')
+    exporter.add_argument('db_path')
+    exporter.add_argument('json_path')
+    options = parser.parse_args(argv)
+
+    store = CatalogStore(options.db_path)
+    if options.command == 'import':
+        count = import_json(options.json_path, store)
+        print(f"Imported {count} applications from {options.json_path} into {options.db_path}")
+    else:
+        count = export_json(store, options.json_path)
+        print(f"Exported {count} applications from {options.db_path} to {options.json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@
 """Debug script to test the parsing issue with a single batch."""
 
 from app_metadata_builder import (
-    get_applications, create_prompt_file, run_goose_cli, parse_goose_response
+    get_applications, create_prompt_file, render_prompt, run_goose_cli, parse_goose_response
 )
 
 
@@ -11,7 +11,8 @@ def main():
     print(f'Testing with {len(apps)} apps')
 
     prompt_file = create_prompt_file(apps)
-    response = run_goose_cli(prompt_file, debug_mode=True)  # Enable debug mode
+    print(f'Prompt written to {prompt_file}')
+    response = run_goose_cli(render_prompt(apps), debug_mode=True)  # Enable debug mode
 
     print(f'Response is None: {response is None}')
     if response:
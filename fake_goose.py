@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Goose CLI, for tests and benchmarks that must not call an LLM.
+
+Accepts ``run -i -`` (prompt on stdin), ``run -i FILE`` or ``run -t TEXT``, finds
+the "App Name:" lines of the prompt and answers with a description for each.
+Behaviour is controlled with environment variables:
+
+    FAKE_GOOSE_LATENCY   seconds to sleep before answering (default: 0)
+    FAKE_GOOSE_LINGER    seconds to keep the session open after answering (default: 0)
+    FAKE_GOOSE_SHAPE     fenced (default), bare, chatty, truncated, empty or error
+"""
+import json
+import os
+import sys
+import time
+
+
+def _read_prompt(argv):
+    """Return the prompt text given on the command line or stdin."""
+    for flag in ('-t', '--text'):
+        if flag in argv:
+            return argv[argv.index(flag) + 1]
+    for flag in ('-i', '--instructions'):
+        if flag in argv:
+            source = argv[argv.index(flag) + 1]
+            if source == '-':
+                return sys.stdin.read()
+            with open(source, 'r', encoding='utf-8') as f:
+                return f.read()
+    return ''
+
+
+def _answer(app_names, shape):
+    """Build a Goose-like transcript in the requested shape."""
+    header = 'starting session | provider: stub model: fake-goose\n'
+    answer = json.dumps({name: f"Stub description of {name}." for name in app_names}, indent=2)
+    if shape == 'bare':
+        return header + answer + '\n'
+    if shape == 'chatty':
+        chatter = ''.join(
+            f'─── shell | developer ───\ncommand: mdls {{"path": "/Applications/{name}.app"}}\n'
+            for name in app_names
+        )
+        return header + chatter + '```json\n' + answer + '\n```\n'
+    if shape == 'truncated':
+        return header + '```json\n' + answer[:len(answer) * 2 // 3]
+    if shape == 'empty':
+        return header + 'I could not find any information about these apps.\n'
+    return header + '```json\n' + answer + '\n```\n'
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] != 'run':
+        print('usage: fake_goose.py run (-i FILE|-t TEXT)', file=sys.stderr)
+        return 2
+
+    prompt = _read_prompt(argv)
+    time.sleep(float(os.environ.get('FAKE_GOOSE_LATENCY', '0')))
+
+    shape = os.environ.get('FAKE_GOOSE_SHAPE', 'fenced')
+    if shape == 'error':
+        print('fake goose: provider error', file=sys.stderr)
+        return 1
+
+    app_names = [line[len('App Name: '):].strip()
+                 for line in prompt.splitlines() if line.startswith('App Name: ')]
+    sys.stdout.write(_answer(app_names, shape))
+    sys.stdout.flush()
+    # A real session keeps printing (or just idles) for a while after the answer
+    time.sleep(float(os.environ.get('FAKE_GOOSE_LINGER', '0')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
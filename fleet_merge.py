@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Merge the catalogs of many machines into one fleet catalog.
+
+Each input is one host's applications.json (or .ndjson). Entries are
+deduplicated on bundle identifier and version; every release keeps the
+description most hosts agree on (the longest one on a tie) and the hosts it is
+installed on. Inputs are folded one at a time into a SQLite work database, so
+memory stays bounded however many files are merged:
+
+    python fleet_merge.py -o fleet.ndjson hosts/*/applications.json
+    python fleet_merge.py -o fleet.ndjson mac-01=mac-01.json mac-02=mac-02.json
+
+The result is NDJSON, one release per line. Pass it to the builder as
+``--seed fleet.ndjson`` and apps the fleet has already described are not sent
+to Goose again.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+from atomic_file import atomic_write
+
+# Metadata kept for each release, in applications.json entry order
+RELEASE_FIELDS = ('version', 'created', 'modified', 'copyright', 'CFBundleDescription',
+                  'bundle_identifier', 'path')
+
+_SCHEMA = """
+CREATE TABLE releases (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE TABLE descriptions (
+    key TEXT NOT NULL,
+    description TEXT NOT NULL,
+    hosts INTEGER NOT NULL,
+    PRIMARY KEY (key, description)
+);
+CREATE TABLE hosts (
+    key TEXT NOT NULL,
+    host TEXT NOT NULL,
+    PRIMARY KEY (key, host)
+);
+"""
+
+
+def release_key(name, entry):
+    """Identity of a release across machines: bundle identifier and version.
+
+    Apps without a bundle identifier fall back to their name.
+    """
+    identifier = entry.get('bundle_identifier') or f"name:{name}"
+    return f"{identifier}|{entry.get('version') or ''}"
+
+
+def host_for(path):
+    """Host label for an input: ``HOST=PATH`` or, failing that, taken from the path.
+
+    ``mac-01.json`` is host ``mac-01``; ``mac-01/applications.json`` is too.
+    """
+    host, separator, file_path = path.partition('=')
+    if separator and host and not os.path.exists(path):
+        return host, file_path
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == 'applications':
+        stem = os.path.basename(os.path.dirname(os.path.abspath(path))) or stem
+    return stem, path
+
+
+def iter_catalog(path):
+    """Yield ``(name, entry)`` from an applications.json or NDJSON catalog."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1] not in ('.ndjson', '.jsonl'):
+            entries = json.load(f)
+            for name, entry in entries.items():
+                yield name, entry if isinstance(entry, dict) else {'description': entry or ''}
+            return
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            yield record.pop('name'), record
+
+
+class FleetMerge:
+    """Folds host catalogs into a SQLite work database, one transaction per host."""
+
+    def __init__(self, work_path):
+        self.connection = sqlite3.connect(work_path)
+        self.connection.execute('PRAGMA journal_mode=OFF')
+        self.connection.execute('PRAGMA synchronous=OFF')
+        self.connection.executescript(_SCHEMA)
+        self.inputs = 0
+
+    def add(self, host, entries):
+        """Record one host's ``(name, entry)`` pairs."""
+        releases, descriptions, hosts = [], [], []
+        for name, entry in entries:
+            key = release_key(name, entry)
+            releases.append((key, name, json.dumps({field: entry.get(field) or '' for field in RELEASE_FIELDS})))
+            hosts.append((key, host))
+            description = (entry.get('description') or '').strip()
+            if description:
+                descriptions.append((key, description))
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO releases (key, name, entry) VALUES (?, ?, ?)', releases)
+            # A host listing the same release twice still counts once
+            new_hosts = []
+            for key, host_name in hosts:
+                cursor = self.connection.execute(
+                    'INSERT OR IGNORE INTO hosts (key, host) VALUES (?, ?)', (key, host_name))
+                if cursor.rowcount:
+                    new_hosts.append(key)
+            counted = set(new_hosts)
+            self.connection.executemany(
+                'INSERT INTO descriptions (key, description, hosts) VALUES (?, ?, 1) '
+                'ON CONFLICT (key, description) DO UPDATE SET hosts = hosts + 1',
+                [(key, description) for key, description in descriptions if key in counted])
+        self.inputs += 1
+
+    def records(self):
+        """Yield merged records sorted by name, then bundle identifier and version."""
+        rows = self.connection.execute(
+            'SELECT r.name, r.entry, '
+            '(SELECT description FROM descriptions d WHERE d.key = r.key '
+            ' ORDER BY hosts DESC, length(description) DESC, description LIMIT 1), '
+            '(SELECT json_group_array(host) FROM hosts h WHERE h.key = r.key) '
+            'FROM releases r ORDER BY r.name, r.key')
+        for name, entry, description, hosts in rows:
+            record = {'name': name, 'description': description or ''}
+            record.update(json.loads(entry))
+            record['hosts'] = sorted(json.loads(hosts))
+            yield record
+
+    def close(self):
+        self.connection.close()
+
+
+def merge_catalogs(inputs, output_path):
+    """Merge ``[HOST=]PATH`` inputs into an NDJSON fleet catalog; returns summary counts."""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    prefix = f".{os.path.basename(output_path)}."
+    fd, work_path = tempfile.mkstemp(prefix=prefix, suffix=".merge.db", dir=directory)
+    os.close(fd)
+    merge = FleetMerge(work_path)
+    try:
+        hosts = set()
+        for argument in inputs:
+            host, path = host_for(argument)
+            hosts.add(host)
+            merge.add(host, iter_catalog(path))
+
+        releases = described = 0
+        with atomic_write(output_path) as f:
+            for record in merge.records():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                releases += 1
+                described += bool(record['description'])
+    finally:
+        merge.close()
+        os.remove(work_path)
+    return {'inputs': merge.inputs, 'hosts': len(hosts), 'releases': releases, 'described': described}
+
+
+def load_seed(seed_path, apps):
+    """Descriptions from a fleet catalog for the given apps, keyed by release_key().
+
+    The file is streamed and only the releases among ``apps`` are kept.
+    """
+    wanted = {release_key(app['name'], app) for app in apps}
+    seed = {}
+    try:
+        for name, entry in iter_catalog(seed_path):
+            key = release_key(name, entry)
+            if key in wanted and entry.get('description'):
+                seed[key] = entry['description']
+    except (OSError, ValueError):
+        return {}
+    return seed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Merge several hosts' applications.json files into one fleet catalog.")
+    parser.add_argument('inputs', nargs='+', metavar='[HOST=]PATH',
+                        help="A host's catalog; the host defaults to the file name, or the "
+                             "directory name for applications.json")
+    parser.add_argument('--output', '-o', default='fleet.ndjson',
+                        help='Where to write the merged catalog (default: fleet.ndjson)')
+    options = parser.parse_args(argv)
+
+    summary = merge_catalogs(options.inputs, options.output)
+    print(f"Merged {summary['inputs']} catalog(s) from {summary['hosts']} host(s) into "
+          f"{summary['releases']} release(s), {summary['described']} described: {options.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
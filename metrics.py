@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Counters, gauges and latency histograms for the App Metadata Builder.
+
+The builder records into the process-wide ``METRICS`` registry; a run's
+snapshot is written as JSON next to applications.json and the web app serves
+it, together with its own metrics, in the Prometheus text format at /metrics.
+"""
+import bisect
+import contextlib
+import functools
+import threading
+import time
+
+# Upper bounds (seconds) of the histogram buckets; a +Inf bucket is implied
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class Metrics:
+    """A thread-safe registry of counters, gauges and histograms with labels."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far, e.g. at the start of a run."""
+        with self._lock:
+            self._counters = {}
+            self._gauges = {}
+            self._histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        """Add ``amount`` to a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Set a gauge to ``value``."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Record one observation, e.g. a duration in seconds, in a histogram."""
+        key = _key(name, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0
+                }
+            histogram['counts'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    @contextlib.contextmanager
+    def time(self, name, **labels):
+        """Observe the wall-clock seconds spent in the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator form of time()."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.time(name, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Everything recorded, as JSON-serialisable data."""
+        with self._lock:
+            return {
+                'counters': [dict(name=name, labels=dict(labels), value=value)
+                             for (name, labels), value in sorted(self._counters.items())],
+                'gauges': [dict(name=name, labels=dict(labels), value=value)
+                           for (name, labels), value in sorted(self._gauges.items())],
+                'histograms': [
+                    dict(name=name, labels=dict(labels), buckets=list(self.buckets),
+                         counts=list(histogram['counts']), sum=histogram['sum'],
+                         count=histogram['count'])
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                ],
+            }
+
+    def to_prometheus(self, prefix=''):
+        """The registry in the Prometheus text exposition format."""
+        return snapshot_to_prometheus(self.snapshot(), prefix)
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels.items()) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+               for _, value in pairs)
+    return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def snapshot_to_prometheus(snapshot, prefix=''):
+    """Render a snapshot() (e.g. one loaded from a run report) as Prometheus text."""
+    lines, declared = [], set()
+
+    def declare(name, kind):
+        if name not in declared:
+            declared.add(name)
+            lines.append(f'# TYPE {name} {kind}')
+
+    for kind in ('counters', 'gauges'):
+        for metric in snapshot.get(kind, []):
+            name = prefix + metric['name']
+            declare(name, 'counter' if kind == 'counters' else 'gauge')
+            lines.append(f"{name}{_format_labels(metric['labels'])} {_format_value(metric['value'])}")
+
+    for metric in snapshot.get('histograms', []):
+        name = prefix + metric['name']
+        declare(name, 'histogram')
+        cumulative = 0
+        bounds = [repr(float(bound)) for bound in metric['buckets']] + ['+Inf']
+        for bound, count in zip(bounds, metric['counts']):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(metric['labels'], [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(metric['labels'])} {_format_value(metric['sum'])}")
+        lines.append(f"{name}_count{_format_labels(metric['labels'])} {metric['count']}")
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+# Process-wide registry the builder records into
+METRICS = Metrics()
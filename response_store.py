@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Record and replay of raw Goose responses.
+
+Every answer Goose gives the builder is kept in a content-addressed directory,
+keyed by a hash of the rendered prompt and the backend that answered it (its
+command, arguments and environment additions):
+
+    applications.responses/3f/3f9c...e1.json
+        {"backend": ..., "apps": [...], "prompt": ..., "response": ...,
+         "seconds": 12.3, "recorded_at": ...}
+
+The directory is bounded in size. Once it grows past the limit, the least
+recently used entries are evicted; replaying an entry refreshes its
+modification time, which is what recency is judged by. With ``--replay`` the
+builder serves prompts it has seen from here instead of running Goose, so a
+change to the parser or the merge logic can be checked in seconds and without
+LLM access. The recorded responses double as a parser regression corpus:
+
+    python response_store.py list applications.responses
+    python response_store.py check applications.responses
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from atomic_file import atomic_write
+from backend_pool import DEFAULT_ARGS
+from metrics import METRICS
+
+DEFAULT_MAX_MB = 100
+# Eviction frees space down to this fraction of the limit, so it does not run on every write
+EVICT_TO = 0.9
+
+
+def backend_identity(command, args=DEFAULT_ARGS, env=None):
+    """The part of a backend that can change its answer: command, arguments and environment."""
+    return json.dumps([command, list(args), sorted((env or {}).items())])
+
+
+def response_key(prompt, backend):
+    """Content address of a prompt sent to a backend (see backend_identity())."""
+    return hashlib.sha256(f"{backend}\n{prompt}".encode('utf-8')).hexdigest()
+
+
+class ResponseStore:
+    """A size-bounded directory of raw responses with least-recently-used eviction.
+
+    ``replay`` marks a store the builder should answer prompts from instead of
+    running Goose. Safe to share between the builder's worker threads.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, replay=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self._lock = threading.Lock()
+        # The directory is created by the first put(), so a run without answers leaves nothing behind
+        self._total = sum(size for _, _, size in self._files())
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def _files(self):
+        """Yield ``(path, mtime, size)`` of every stored entry."""
+        try:
+            shards = list(os.scandir(self.path))
+        except OSError:
+            return
+        for shard in shards:
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            try:
+                entries = list(os.scandir(shard.path))
+            except OSError:
+                continue
+            for entry in entries:
+                # Skip half-written temporary files
+                if entry.name.startswith('.') or not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def get(self, prompt, backends):
+        """The recorded entry for ``prompt`` from the first of ``backends`` that has one.
+
+        Returns None if none of them has answered this prompt before.
+        """
+        for backend in backends:
+            path = self._entry_path(response_key(prompt, backend))
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            METRICS.inc('response_store_total', result='replayed')
+            return entry
+        METRICS.inc('response_store_total', result='missed')
+        return None
+
+    def put(self, prompt, backend, response, seconds, app_names=()):
+        """Record a raw response; returns False if it alone is larger than the store."""
+        entry = {
+            'backend': backend,
+            'apps': list(app_names),
+            'prompt': prompt,
+            'response': response,
+            'seconds': round(seconds, 3),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+        data = json.dumps(entry, ensure_ascii=False, indent=1).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return False
+
+        path = self._entry_path(response_key(prompt, backend))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            try:
+                replaced = os.stat(path).st_size
+            except OSError:
+                replaced = 0
+            with atomic_write(path, 'wb') as f:
+                f.write(data)
+            self._total += len(data) - replaced
+            if self._total > self.max_bytes:
+                self._evict()
+        METRICS.inc('response_store_total', result='recorded')
+        return True
+
+    def _evict(self):
+        """Remove the least recently used entries until the store is under EVICT_TO of its limit."""
+        target = self.max_bytes * EVICT_TO
+        for path, _, size in sorted(self._files(), key=lambda file: file[1]):
+            if self._total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total -= size
+            METRICS.inc('response_store_total', result='evicted')
+
+    def size(self):
+        """Bytes currently stored."""
+        with self._lock:
+            return self._total
+
+    def entries(self):
+        """Yield ``(key, entry)`` for every recorded response, oldest use first."""
+        for path, _, _ in sorted(self._files(), key=lambda file: file[1]):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            yield os.path.splitext(os.path.basename(path))[0], entry
+
+
+def check_corpus(store, parse):
+    """Re-parse every recorded response with ``parse``; yields one result dict per entry.
+
+    ``parse(response)`` returns ``(descriptions, strategy)`` like the builder's
+    parse_goose_response_with_strategy().
+    """
+    for key, entry in store.entries():
+        descriptions, strategy = parse(entry['response'])
+        apps = entry.get('apps') or []
+        described = [name for name in apps if descriptions.get(name)]
+        yield {'key': key, 'apps': len(apps), 'described': len(described),
+               'parsed': len(descriptions), 'strategy': strategy,
+               'missing': [name for name in apps if name not in described]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or re-parse recorded Goose responses.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    lister = subparsers.add_parser('list', help='List the recorded responses')
+    lister.add_argument('path', help='Response store directory, e.g. applications.responses')
+    checker = subparsers.add_parser(
+        'check', help='Re-parse every recorded response; fails if any yields no descriptions')
+    checker.add_argument('path', help='Response store directory, e.g. applications.responses')
+    options = parser.parse_args(argv)
+
+    if not os.path.isdir(options.path):
+        print(f"No response store at {options.path}", file=sys.stderr)
+        return 1
+    store = ResponseStore(options.path, max_bytes=float('inf'))
+    if options.command == 'list':
+        count = 0
+        for key, entry in store.entries():
+            count += 1
+            print(f"{key[:12]}  {entry.get('recorded_at', '')}  {entry.get('seconds', 0):>7.1f}s  "
+                  f"{len(entry.get('apps') or [])} app(s)  {len(entry['response'])} chars")
+        print(f"{count} response(s), {store.size()} bytes in {options.path}")
+        return 0
+
+    # Imported here because the builder itself imports this module
+    from app_metadata_builder import parse_goose_response_with_strategy
+    results = list(check_corpus(store, parse_goose_response_with_strategy))
+    for result in results:
+        missing = f"; missing {', '.join(result['missing'])}" if result['missing'] else ''
+        print(f"{result['key'][:12]}  {result['strategy'] or 'unparsed':<10}  "
+              f"{result['described']}/{result['apps']} described{missing}")
+    failed = sum(1 for result in results if not result['parsed'])
+    print(f"{len(results)} response(s) re-parsed, {failed} without any descriptions")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -99,23 +99,13 @@ echo "Testing basic functionality..."
 python -c "
 import app_metadata_builder
 import os
-from unittest.mock import patch
-
-with patch('os.listdir', return_value=['Safari.app', 'Chrome.app']):
-    with patch('os.path.isdir', return_value=True):
-        with patch('app_metadata_builder.get_app_details') as mock_details:
-            def mock_details_side_effect(app_path, app_name):
-                return {
-                    'name': app_name,
-                    'path': f'/Applications/{app_name}.app',
-                    'description': 'Test app',
-                    'version': '1.0',
-                    'bundle_identifier': f'com.test.{app_name.lower()}'
-                }
-            
-            mock_details.side_effect = mock_details_side_effect
-            apps = app_metadata_builder.get_applications()
-            assert len(apps) == 2
+import tempfile
+
+with tempfile.TemporaryDirectory() as root:
+    for app_name in ['Safari', 'Chrome']:
+        os.makedirs(os.path.join(root, app_name + '.app', 'Contents'))
+    apps = app_metadata_builder.get_applications([root])
+    assert len(apps) == 2
 print('Basic functionality test passed')
 "
 
@@ -2,37 +2,114 @@
 """
 Test the parse_goose_response function with actual Goose CLI output.
 """
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import gzip
+import io
 import sys
 import os
+import importlib.util
+import json
+import plistlib
+import random
+import re
+import shlex
+import shutil
+import sqlite3
+import stat
+import struct
+import tempfile
+import threading
+import time
+from unittest.mock import patch
 
 # Import the function from the main script
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Local stand-in for the Goose CLI, run with the current interpreter
+FAKE_GOOSE = f'"{sys.executable}" "{os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_goose.py")}"'
+
+import app_metadata_builder  # noqa: E402
+import backend_pool  # noqa: E402
+import catalog_store  # noqa: E402
+import fleet_merge  # noqa: E402
+import response_store  # noqa: E402
 from app_metadata_builder import parse_goose_response  # noqa: E402
 
+# Goose CLI transcripts used by the parser tests and by benchmark.py
+SAMPLE_RESPONSE = (
+    'starting session | provider: github_copilot model: gpt-4o\n'
+    'logging to /Users/jeffbailey/.local/share/goose/sessions/20250712_183856.jsonl\n'
+    'working directory: /Users/jeffbailey/Projects/foss/leading/macos-app-comments\n'
+    '```json\n'
+    '{\n'
+    '  "Safari": "Safari is Apple\'s native web browser, offering fast, secure, and privacy-centric internet browsing for macOS users.",\n'
+    '  "Scribus": "Scribus is an open-source desktop publishing application ideal for creating professional-quality documents like brochures, magazines, and books.",\n'
+    '  "Service Station": "Service Station allows users to customize the macOS context menu with shortcuts and workflows for improved productivity.",\n'
+    '  "Skim": "Skim is a lightweight, open-source PDF viewer and annotation tool tailored for research and review purposes.",\n'
+    '  "Skitch": "Skitch is a screenshot and annotation app designed for quickly capturing, editing, and sharing visual content with ease.",\n'
+    '  "Slack": "Slack is a collaborative communication platform that integrates channels, direct messaging, and app tools for team productivity.",\n'
+    '  "Spatial Media Metadata Injector": "Spatial Media Metadata Injector is a specialized tool for embedding spatial metadata into 360-degree videos to support VR compatibility.",\n'
+    '  "Steam": "Steam is a widely-used gaming platform for purchasing, managing, and playing PC and macOS games, complete with community features.",\n'
+    '  "Syncthing": "Syncthing is an open-source software for secure, decentralized file synchronization across multiple devices in real time.",\n'
+    '  "Synology Drive Client": "Synology Drive Client is a file syncing and backup tool for connecting macOS devices with Synology NAS for seamless collaboration and data management."\n'
+    '}\n'
+    '```'
+)
+
+ACTUAL_OUTPUT = (
+    'starting session | provider: github_copilot model: gpt-4o\n'
+    'logging to /Users/jeffbailey/.local/share/goose/sessions/20250712_184137.jsonl\n'
+    'working directory: /Users/jeffbailey/Projects/foss/leading/macos-app-comments\n'
+    '```json\n'
+    '{\n'
+    '  "4K Video Downloader": "A versatile tool for downloading videos, playlists, and subtitles from online platforms, ideal for content creators and media enthusiasts seeking to save online content for offline use.",\n'
+    '  "Ableton Live 11 Suite": "A professional music production software offering advanced tools for composing, recording, editing, mixing, and live performance, perfect for musicians, producers, and DJs.",\n'
+    '  "AdBlock": "A lightweight application designed to block ads and enhance browsing speed and privacy on macOS, suitable for users aiming to improve their online experience."\n'
+    '}\n'
+    '```'
+)
+
+FORMAT_CASES = [
+    # Case 1: JSON in code block
+    '```json\n{\n  "App1": "Description 1",\n  "App2": "Description 2"\n}\n```',
+    # Case 2: JSON without code block
+    (
+        'Some text before\n{\n  "App3": "Description 3",\n  "App4": "Description 4"\n}\n'
+        'Some text after'
+    ),
+    # Case 3: JSON with extra whitespace
+    '```json\n{\n  "App5": "Description 5",\n  "App6": "Description 6"\n}\n```'
+]
+
+
+def _load_web_app():
+    """Import app/app.py (the Flask web interface) as a module."""
+    app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app')
+    spec = importlib.util.spec_from_file_location('web_app', os.path.join(app_dir, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    # Flask finds templates and static files relative to the registered module
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _fake_app(name, **fields):
+    """Build an app record shaped like get_app_details() output."""
+    app = {
+        'name': name, 'path': f'/Applications/{name}.app', 'description': '',
+        'version': '1.0', 'bundle_identifier': f'com.test.{name.lower()}',
+        'created': '1', 'modified': '1', 'copyright': '', 'CFBundleDescription': '',
+    }
+    app.update(fields)
+    return app
+
 
 def test_parse_goose_response():
     """Test the parse_goose_response function with actual Goose CLI output."""
-    sample_response = (
-        'starting session | provider: github_copilot model: gpt-4o\n'
-        'logging to /Users/jeffbailey/.local/share/goose/sessions/20250712_183856.jsonl\n'
-        'working directory: /Users/jeffbailey/Projects/foss/leading/macos-app-comments\n'
-        '```json\n'
-        '{\n'
-        '  "Safari": "Safari is Apple\'s native web browser, offering fast, secure, and privacy-centric internet browsing for macOS users.",\n'
-        '  "Scribus": "Scribus is an open-source desktop publishing application ideal for creating professional-quality documents like brochures, magazines, and books.",\n'
-        '  "Service Station": "Service Station allows users to customize the macOS context menu with shortcuts and workflows for improved productivity.",\n'
-        '  "Skim": "Skim is a lightweight, open-source PDF viewer and annotation tool tailored for research and review purposes.",\n'
-        '  "Skitch": "Skitch is a screenshot and annotation app designed for quickly capturing, editing, and sharing visual content with ease.",\n'
-        '  "Slack": "Slack is a collaborative communication platform that integrates channels, direct messaging, and app tools for team productivity.",\n'
-        '  "Spatial Media Metadata Injector": "Spatial Media Metadata Injector is a specialized tool for embedding spatial metadata into 360-degree videos to support VR compatibility.",\n'
-        '  "Steam": "Steam is a widely-used gaming platform for purchasing, managing, and playing PC and macOS games, complete with community features.",\n'
-        '  "Syncthing": "Syncthing is an open-source software for secure, decentralized file synchronization across multiple devices in real time.",\n'
-        '  "Synology Drive Client": "Synology Drive Client is a file syncing and backup tool for connecting macOS devices with Synology NAS for seamless collaboration and data management."\n'
-        '}\n'
-        '```'
-    )
     print("Testing parse_goose_response function...")
-    result = parse_goose_response(sample_response)
+    result = parse_goose_response(SAMPLE_RESPONSE)
     print(f"Parsed result: {result}")
     print(f"Number of apps parsed: {len(result)}")
     if result:
@@ -48,20 +125,8 @@ def test_parse_goose_response():
 
 def test_actual_output():
     """Test with the exact output from the actual run."""
-    actual_output = (
-        'starting session | provider: github_copilot model: gpt-4o\n'
-        'logging to /Users/jeffbailey/.local/share/goose/sessions/20250712_184137.jsonl\n'
-        'working directory: /Users/jeffbailey/Projects/foss/leading/macos-app-comments\n'
-        '```json\n'
-        '{\n'
-        '  "4K Video Downloader": "A versatile tool for downloading videos, playlists, and subtitles from online platforms, ideal for content creators and media enthusiasts seeking to save online content for offline use.",\n'
-        '  "Ableton Live 11 Suite": "A professional music production software offering advanced tools for composing, recording, editing, mixing, and live performance, perfect for musicians, producers, and DJs.",\n'
-        '  "AdBlock": "A lightweight application designed to block ads and enhance browsing speed and privacy on macOS, suitable for users aiming to improve their online experience."\n'
-        '}\n'
-        '```'
-    )
     print("\nTesting with actual output format...")
-    result = parse_goose_response(actual_output)
+    result = parse_goose_response(ACTUAL_OUTPUT)
     print(f"Parsed {len(result)} descriptions")
     if result:
         print("✅ SUCCESS")
@@ -69,12 +134,12 @@ def test_actual_output():
     else:
         print("❌ FAILURE")
         print("Debugging...")
-        print("Response length:", len(actual_output))
-        print("Contains ```json:", "```json" in actual_output)
-        print("Contains ```:", "```" in actual_output)
+        print("Response length:", len(ACTUAL_OUTPUT))
+        print("Contains ```json:", "```json" in ACTUAL_OUTPUT)
+        print("Contains ```:", "```" in ACTUAL_OUTPUT)
         import re
         json_matches = re.findall(
-            r'```json\s*({[\s\S]*?})\s*```', actual_output
+            r'```json\s*({[\s\S]*?})\s*```', ACTUAL_OUTPUT
         )
         print(f"Found {len(json_matches)} JSON matches in code blocks")
         if json_matches:
@@ -84,18 +149,7 @@ def test_actual_output():
 
 def test_multiple_formats():
     """Test with different JSON formats that might be returned."""
-    test_cases = [
-        # Case 1: JSON in code block
-        '```json\n{\n  "App1": "Description 1",\n  "App2": "Description 2"\n}\n```',
-        # Case 2: JSON without code block
-        (
-            'Some text before\n{\n  "App3": "Description 3",\n  "App4": "Description 4"\n}\n'
-            'Some text after'
-        ),
-        # Case 3: JSON with extra whitespace
-        '```json\n{\n  "App5": "Description 5",\n  "App6": "Description 6"\n}\n```'
-    ]
-    for i, test_case in enumerate(test_cases, 1):
+    for i, test_case in enumerate(FORMAT_CASES, 1):
         print(f"\nTesting case {i}:")
         result = parse_goose_response(test_case)
         print(f"  Result: {len(result)} apps parsed")
@@ -106,11 +160,1180 @@ def test_multiple_formats():
     return True
 
 
+def test_json_scanner_handles_chatter_and_truncation():
+    """The single-pass scanner ignores braces in strings and salvages truncated output."""
+    parse = app_metadata_builder.parse_goose_response_with_strategy
+    assert parse(SAMPLE_RESPONSE)[1] == 'code_block'
+    assert parse(FORMAT_CASES[1]) == ({"App3": "Description 3", "App4": "Description 4"}, 'object')
+
+    chatty = (
+        'running tool {"cmd": "ls {a,b}"}\n'
+        '{"Notes": "Keeps {braces} and \\"quotes\\" in text", "Skim": "PDF viewer"}\n'
+        'session closed {}'
+    )
+    result, strategy = parse(chatty)
+    assert strategy == 'object'
+    assert result["Notes"] == 'Keeps {braces} and "quotes" in text'
+
+    truncated = (
+        'tool output {"path": "/Applications/Safari.app"}\n'
+        '```json\n{\n  "Safari": "Browser",\n  "Safari": "Web browser",\n  "Slack": "Chat",\n'
+        '  "Skim": "PDF vie'
+    )
+    assert parse(truncated) == ({"Safari": "Web browser", "Slack": "Chat"}, 'fallback')
+    assert parse('no json here') == ({}, None)
+
+    scanner = app_metadata_builder.JsonObjectScanner()
+    pieces = [chatty[i:i + 7] for i in range(0, len(chatty), 7)]
+    spans = [span for piece in pieces for span in scanner.feed(piece)]
+    assert spans == app_metadata_builder.JsonObjectScanner().feed(chatty)
+    print("✅ SUCCESS: JSON scanner handled chatter, escapes and truncation")
+
+
+def test_concurrent_batches_are_merged_deterministically():
+    """Batches finishing out of order still produce a name-sorted catalog."""
+    apps = [_fake_app(f"App{i:02d}") for i in range(25)]
+
+    def fake_goose(prompt, debug_mode=False, goose_command=None, app_names=None, response_store=None):
+        names = [line[len('App Name: '):] for line in prompt.splitlines()
+                 if line.startswith('App Name: ')]
+        time.sleep(random.uniform(0, 0.02))
+        return json.dumps({name: f"Describes {name}" for name in names})
+
+    with patch('app_metadata_builder.run_goose_cli', side_effect=fake_goose):
+        results = app_metadata_builder._run_batches(apps, jobs=4, debug_mode=False)
+
+    assert len(results) == 25
+    assert all(entry['description'] == f"Describes {name}" for name, entry in results.items())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'applications.json')
+        app_metadata_builder._save_results(results, output_path)
+        with open(output_path, encoding='utf-8') as f:
+            saved = json.load(f)
+    assert list(saved) == sorted(saved)
+    print("✅ SUCCESS: concurrent batches merged in name order")
+
+
+def test_description_cache_skips_unchanged_apps():
+    """Only new or changed bundles miss the cache; stale entries are evicted."""
+    old_apps = [_fake_app("Safari"), _fake_app("Slack"), _fake_app("Removed")]
+    previous = {app['name']: app_metadata_builder._merge_app(app, f"Old {app['name']}")
+                for app in old_apps}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'applications.cache.json')
+        app_metadata_builder.save_description_cache(cache_path, old_apps, previous)
+        cache = app_metadata_builder.load_description_cache(cache_path)
+
+        apps = [_fake_app("Safari"), _fake_app("Slack", version='2.0'), _fake_app("Zoom")]
+        cached, pending = app_metadata_builder._split_cached_apps(apps, cache)
+        assert list(cached) == ["Safari"]
+        assert cached["Safari"]['description'] == "Old Safari"
+        assert [app['name'] for app in pending] == ["Slack", "Zoom"]
+
+        results = dict(cached)
+        results.update({app['name']: app_metadata_builder._merge_app(app, "New")
+                        for app in pending})
+        new_cache = app_metadata_builder.save_description_cache(cache_path, apps, results)
+        assert sorted(entry['name'] for entry in new_cache.values()) == ["Safari", "Slack", "Zoom"]
+
+        # --force skips cache hits but still counts the entries of removed apps as evicted
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        for name in ('Alpha', 'Beta'):
+            _make_bundle(root, name, CFBundleIdentifier=f'com.example.{name.lower()}')
+        output = os.path.join(tmp, 'applications.json')
+        settings = dict(roots=[root], output=output, goose=FAKE_GOOSE, local_resolve=False, responses_mb=0)
+        app_metadata_builder.build_catalog(app_metadata_builder.build_options(**settings), lambda event: None)
+        shutil.rmtree(os.path.join(root, 'Beta.app'))
+        events = []
+        app_metadata_builder.build_catalog(app_metadata_builder.build_options(force=True, **settings),
+                                           events.append)
+        [cache_event] = [event for event in events if event['type'] == 'cache']
+        assert (cache_event['hits'], cache_event['misses'], cache_event['evicted']) == (0, 1, 1)
+    print("✅ SUCCESS: description cache reused unchanged apps")
+
+
+def _make_bundle(root, name, fmt=plistlib.FMT_XML, **plist):
+    """Create a minimal .app bundle with an Info.plist under root."""
+    contents = os.path.join(root, f"{name}.app", 'Contents')
+    os.makedirs(contents)
+    with open(os.path.join(contents, 'Info.plist'), 'wb') as f:
+        plistlib.dump(plist, f, fmt=fmt)
+    return os.path.dirname(contents)
+
+
+def test_scanner_reads_multiple_roots():
+    """The scandir scanner reads XML and binary plists and deduplicates across roots."""
+    with tempfile.TemporaryDirectory() as tmp:
+        system_root = os.path.join(tmp, 'System', 'Applications')
+        user_root = os.path.join(tmp, 'Applications')
+        os.makedirs(system_root)
+        os.makedirs(user_root)
+
+        _make_bundle(system_root, 'Safari', CFBundleIdentifier='com.apple.Safari',
+                     CFBundleShortVersionString='18.0')
+        _make_bundle(user_root, 'Skim', fmt=plistlib.FMT_BINARY,
+                     CFBundleIdentifier='net.sourceforge.skim-app.skim',
+                     CFBundleGetInfoString='Skim 1.7')
+        # Same bundle identifier installed twice, and a symlink to a scanned bundle
+        _make_bundle(user_root, 'Safari Copy', CFBundleIdentifier='com.apple.Safari')
+        os.symlink(os.path.join(system_root, 'Safari.app'),
+                   os.path.join(user_root, 'Safari Link.app'))
+        os.makedirs(os.path.join(user_root, 'NoPlist.app'))
+        open(os.path.join(user_root, 'notes.app'), 'w').close()
+
+        apps = app_metadata_builder.get_applications(
+            (system_root, user_root, os.path.join(tmp, 'missing')), workers=2
+        )
+
+    assert [app['name'] for app in apps] == ['NoPlist', 'Safari', 'Skim']
+    safari = apps[1]
+    assert safari['bundle_identifier'] == 'com.apple.Safari'
+    assert safari['version'] == '18.0'
+    assert safari['modified']
+    assert apps[2]['copyright'] == 'Skim 1.7'
+    print("✅ SUCCESS: scanner deduplicated bundles across roots")
+
+
+def test_web_catalog_reloads_only_when_file_changes():
+    """The web app's catalog normalizes both formats and reloads on mtime/size changes."""
+    web_app = _load_web_app()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"Safari": "Web browser", "Slack": {"description": "Chat", "version": "4"}}, f)
+        catalog = web_app.ApplicationCatalog(path, check_interval=0)
+
+        first = catalog.snapshot()
+        assert first.applications["Safari"]["description"] == "Web browser"
+        assert first.applications["Safari"]["version"] == ""
+        assert catalog.get("Slack")["version"] == "4"
+        assert catalog.snapshot() is first
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"Safari": {"description": "Browser"}}, f)
+        os.utime(path, ns=(0, first.signature[0] + 1_000_000))
+        assert catalog.get("Safari")["description"] == "Browser"
+        assert catalog.get("Slack") is None
+    print("✅ SUCCESS: web catalog reloaded after the file changed")
+
+
+def test_checkpoint_journal_supports_resume():
+    """Finished batches are journaled, and a truncated last line is ignored on resume."""
+    apps = [_fake_app(f"App{i}") for i in range(4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_path = os.path.join(tmp, 'applications.checkpoint.jsonl')
+        with open(checkpoint_path, 'w', encoding='utf-8') as checkpoint_file:
+            app_metadata_builder._append_checkpoint(
+                checkpoint_file, {"App0": app_metadata_builder._merge_app(apps[0], "Zero")})
+            app_metadata_builder._append_checkpoint(
+                checkpoint_file, {"App1": app_metadata_builder._merge_app(apps[1], "")})
+            checkpoint_file.write('{"App2": {"descr')
+
+        checkpoint = app_metadata_builder.load_checkpoint(checkpoint_path)
+        resumed, pending = app_metadata_builder._split_checkpointed_apps(apps, checkpoint)
+        assert list(resumed) == ["App0"]
+        assert [app['name'] for app in pending] == ["App1", "App2", "App3"]
+
+        output_path = os.path.join(tmp, 'applications.json')
+        app_metadata_builder._save_results(resumed, output_path)
+        assert sorted(os.listdir(tmp)) == ['applications.checkpoint.jsonl', 'applications.json']
+    print("✅ SUCCESS: checkpoint journal resumed completed batches")
+
+
+def test_batch_planner_packs_by_size_and_adapts():
+    """Batches are packed by prompt size; the budget shrinks on failure and grows when fast."""
+    small = [_fake_app(f"S{i}") for i in range(6)]
+    large = _fake_app("Large", description="x" * 1500)
+    planner = app_metadata_builder.BatchPlanner(budget=500, min_budget=100, max_budget=4000)
+
+    pending = app_metadata_builder.collections.deque([large] + small)
+    assert planner.next_batch(pending) == [large]
+    batch = planner.next_batch(pending)
+    assert 1 < len(batch) < len(small)
+    assert sum(map(app_metadata_builder.estimate_prompt_size, batch)) <= 500
+
+    planner.record(1, batch, seconds=120, described=None)
+    assert planner.budget == 250
+    planner.record(2, batch, seconds=2, described=len(batch) - 1)
+    assert planner.budget == 125
+    planner.record(3, batch, seconds=2, described=len(batch))
+    assert planner.budget == 156
+    assert [entry['batch'] for entry in planner.history] == [1, 2, 3]
+    print("✅ SUCCESS: batch planner adapted its budget")
+
+
+def test_web_api_paginates_catalog():
+    """/api/applications pages through the catalog with cursors and field selection."""
+    web_app = _load_web_app()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({f"App{i:02d}": {"description": f"Tool {i}"} for i in range(25)}, f)
+        web_app.catalog = web_app.ApplicationCatalog(path)
+        client = web_app.app.test_client()
+
+        names, cursor = [], ''
+        while cursor is not None:
+            page = client.get(f'/api/applications?limit=10&fields=name&cursor={cursor}').get_json()
+            assert page['total'] == 25
+            names += [item['name'] for item in page['items']]
+            cursor = page['next_cursor']
+        assert names == sorted(f"App{i:02d}" for i in range(25))
+
+        filtered = client.get('/api/applications?q=tool 1&fields=name,description').get_json()
+        assert filtered['total'] == 11
+        assert filtered['items'][0] == {"name": "App01", "description": "Tool 1"}
+        assert client.get('/api/applications?fields=secret').status_code == 400
+    print("✅ SUCCESS: catalog API paginated the applications")
+
+
+def test_run_goose_cli_pipes_prompt_to_stub():
+    """Prompts reach the CLI on stdin, so argv limits don't apply to large batches."""
+    apps = [_fake_app(f"App {i}", description="x" * 400) for i in range(300)]
+    prompt = app_metadata_builder.render_prompt(apps)
+    assert len(prompt) > 100_000
+    assert app_metadata_builder._prompt_template() is app_metadata_builder._prompt_template()
+
+    response = app_metadata_builder.run_goose_cli(prompt, goose_command=FAKE_GOOSE)
+    descriptions = parse_goose_response(response)
+    assert len(descriptions) == 300
+    assert descriptions["App 7"] == "Stub description of App 7."
+
+    with patch.dict(os.environ, {'FAKE_GOOSE_SHAPE': 'error'}):
+        assert app_metadata_builder.run_goose_cli(prompt, goose_command=FAKE_GOOSE) is None
+    print("✅ SUCCESS: prompt piped to the Goose stub over stdin")
+
+
+def test_pipeline_benchmark_reports_every_stage():
+    """The end-to-end benchmark runs against synthetic bundles and the Goose stub."""
+    import benchmark
+    results = benchmark.benchmark_pipeline(
+        app_count=12, jobs=2, latency=0, shape='chatty', budget=800,
+        goose_command=FAKE_GOOSE,
+    )
+    assert results['apps'] == 12
+    assert results['described'] == 12
+    assert set(results['stages']) == {'scan', 'render', 'cli', 'parse', 'merge', 'save'}
+    assert results['cli_calls']['count'] == results['batches']
+    json.dumps(results)
+    print("✅ SUCCESS: pipeline benchmark timed every stage")
+
+
+def test_refresh_jobs_are_single_flight_with_replay():
+    """Concurrent refresh requests share one build, and reconnecting clients get a replay."""
+    web_app = _load_web_app()
+    release = web_app.threading.Event()
+    runs = []
+
+    def runner(job):
+        runs.append(job.id)
+        for i in range(3):
+            job.publish('output', f'step {i}')
+        release.wait(5)
+        return 0
+
+    web_app.refresh_jobs = web_app.RefreshJobManager(runner)
+    client = web_app.app.test_client()
+    first = client.post('/refresh-applications').get_json()
+    second = client.post('/refresh-applications').get_json()
+    assert first['started'] and not second['started']
+    assert first['job']['id'] == second['job']['id']
+    assert client.get('/refresh-status').get_json()['running']
+
+    release.set()
+    stream = client.get('/refresh-applications-stream').get_data(as_text=True)
+    assert 'step 0' in stream and '"type": "success"' in stream
+    assert len(runs) == 1
+
+    job_id = first['job']['id']
+    replay = client.get('/refresh-applications-stream',
+                        headers={'Last-Event-ID': f'{job_id}:2'}).get_data(as_text=True)
+    assert 'step 0' not in replay and 'step 2' in replay
+    assert len(runs) == 1
+    assert client.get('/refresh-status').get_json()['job']['state'] == 'succeeded'
+    print("✅ SUCCESS: refresh jobs were single-flight with replay")
+
+
+def test_watch_sync_describes_only_changed_bundles():
+    """Watch mode diffs against its snapshot and only describes new or updated apps."""
+    described = []
+
+    def fake_goose(prompt, debug_mode=False, goose_command=None, app_names=None, response_store=None):
+        names = [line[len('App Name: '):] for line in prompt.splitlines()
+                 if line.startswith('App Name: ')]
+        described.extend(names)
+        return json.dumps({name: f"Describes {name}" for name in names})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        _make_bundle(root, 'Safari', CFBundleIdentifier='com.apple.Safari',
+                     CFBundleShortVersionString='18.0')
+        _make_bundle(root, 'Slack', CFBundleIdentifier='com.tinyspeck.slackmacgap',
+                     CFBundleShortVersionString='4.0')
+        output = os.path.join(tmp, 'applications.json')
+        snapshot_path = os.path.join(tmp, 'applications.snapshot.json')
+        options = app_metadata_builder._parse_arguments(['--watch', '--root', root, '--output', output,
+                                                         '--no-local-resolve'])
+
+        with patch('app_metadata_builder.run_goose_cli', side_effect=fake_goose), \
+                contextlib.redirect_stdout(io.StringIO()):
+            snapshot = app_metadata_builder.sync_catalog(options, {}, snapshot_path)
+            assert sorted(described) == ['Safari', 'Slack']
+
+            # Nothing changed: no plist is re-read and nothing is described
+            described.clear()
+            with patch('app_metadata_builder.get_app_details') as details:
+                snapshot = app_metadata_builder.sync_catalog(options, snapshot, snapshot_path)
+            assert not details.called and described == []
+
+            # An install, an uninstall and an in-place update of Info.plist
+            _make_bundle(root, 'Zoom', CFBundleIdentifier='us.zoom.xos')
+            shutil.rmtree(os.path.join(root, 'Slack.app'))
+            plist_path = os.path.join(root, 'Safari.app', 'Contents', 'Info.plist')
+            with open(plist_path, 'wb') as f:
+                plistlib.dump({'CFBundleIdentifier': 'com.apple.Safari',
+                               'CFBundleShortVersionString': '19.0'}, f)
+            os.utime(plist_path, ns=(time.time_ns() + 10**9,) * 2)
+            snapshot = app_metadata_builder.sync_catalog(options, snapshot, snapshot_path)
+            assert sorted(described) == ['Safari', 'Zoom']
+
+        with open(output, encoding='utf-8') as f:
+            catalog = json.load(f)
+        assert list(catalog) == ['Safari', 'Zoom']
+        assert catalog['Safari']['version'] == '19.0'
+        assert app_metadata_builder.load_snapshot(snapshot_path) == snapshot
+
+        # A legacy {name: description} catalog keeps its descriptions and gains metadata
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({"Safari": "Legacy flat description"}, f)
+        described.clear()
+        with patch('app_metadata_builder.run_goose_cli', side_effect=fake_goose), \
+                contextlib.redirect_stdout(io.StringIO()):
+            app_metadata_builder.sync_catalog(options, {}, snapshot_path)
+        with open(output, encoding='utf-8') as f:
+            catalog = json.load(f)
+        # Zoom, missing from the legacy catalog, comes back from the description cache
+        assert described == [] and catalog['Zoom']['description'] == "Describes Zoom"
+        assert catalog['Safari']['description'] == "Legacy flat description"
+        assert catalog['Safari']['version'] == '19.0'
+
+        if sys.platform.startswith('linux'):
+            watcher = app_metadata_builder.InotifyWatcher()
+            try:
+                watcher.watch(app_metadata_builder._watched_directories([root], snapshot))
+                assert not watcher.wait(0)
+                _make_bundle(root, 'Notes')
+                assert watcher.wait(1)
+            finally:
+                watcher.close()
+    print("✅ SUCCESS: watch mode updated only changed bundles")
+
+
+def test_retry_resubmits_only_undescribed_apps():
+    """Apps missing from failed or partial batches are retried, within the retry budget."""
+    apps = [_fake_app(f"App{i:02d}") for i in range(12)]
+    calls = []
+
+    def flaky_goose(prompt, debug_mode=False, goose_command=None, app_names=None, response_store=None):
+        names = [line[len('App Name: '):] for line in prompt.splitlines()
+                 if line.startswith('App Name: ')]
+        calls.append(list(names))
+        # The first call fails outright and App11's first answer is cut off
+        if len(calls) == 1:
+            return None
+        if 'App11' in names and not any('App11' in earlier for earlier in calls[1:-1]):
+            names.remove('App11')
+        return json.dumps({name: f"Describes {name}" for name in names})
+
+    def describe(retry_budget):
+        calls.clear()
+        options = app_metadata_builder._parse_arguments(
+            ['--jobs', '1', '--batch-budget', '400', '--retry-budget', str(retry_budget),
+             '--responses-mb', '0'])
+        with patch('app_metadata_builder.run_goose_cli', side_effect=flaky_goose), \
+                patch('app_metadata_builder._backoff_delay', return_value=0):
+            return app_metadata_builder.describe_apps(apps, options)
+
+    results, recovered = describe(retry_budget=100)
+    failed_batch = set(calls[0])
+    # The first pass submits every app once; everything after that is a retry
+    retried = [name for names in calls for name in names][len(apps):]
+    assert sorted(retried) == sorted(failed_batch | {'App11'})
+    assert recovered == [len(failed_batch) + 1]
+    assert sorted(results) == [app['name'] for app in apps]
+    assert all(entry['description'] for entry in results.values())
+
+    # With a budget of one app only the first straggler is re-submitted; the
+    # rest stay in the catalog without a description
+    results, recovered = describe(retry_budget=1)
+    assert recovered == [1]
+    assert len(results) == len(apps)
+    assert sum(1 for entry in results.values() if not entry['description']) == len(failed_batch)
+
+    delays = [app_metadata_builder._backoff_delay(attempt, base=1, cap=8) for attempt in range(6)]
+    assert 0.5 <= delays[0] <= 1 and 4 <= delays[5] <= 8
+    print("✅ SUCCESS: retries re-submitted only undescribed apps")
+
+
+def test_catalog_store_indexes_and_searches():
+    """The SQLite store round-trips applications.json and serves indexed lookups and search."""
+    apps = {
+        "Safari": app_metadata_builder._merge_app(
+            _fake_app("Safari", bundle_identifier='com.apple.Safari'), "Web browser from Apple"),
+        "Firefox": app_metadata_builder._merge_app(
+            _fake_app("Firefox", copyright='Mozilla Foundation'), "Open source web browser"),
+        "Skim": app_metadata_builder._merge_app(_fake_app("Skim"), "PDF reader and note-taker"),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'applications.json')
+        db_path = os.path.join(tmp, 'applications.db')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(apps, Legacy="Flat-string description"), f)
+
+        store = catalog_store.CatalogStore(db_path)
+        assert store._connection().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert catalog_store.import_json(json_path, store) == 4
+        assert store.get("Safari") == apps["Safari"]
+        assert store.get("Legacy")['description'] == "Flat-string description"
+        assert store.get("Missing") is None
+        assert [name for name, _ in store.find_by_bundle_identifier('com.apple.Safari')] == ["Safari"]
+
+        assert sorted(name for name, _ in store.search("browser")) == ["Firefox", "Safari"]
+        assert [name for name, _ in store.search("mozil")] == ["Firefox"]
+        assert [name for name, _ in store.search("web apple")] == ["Safari"]
+        assert store.search("") == [] and store.search('"*') == []
+
+        # The builder's final save replaces the store's contents in one transaction
+        with contextlib.redirect_stdout(io.StringIO()):
+            app_metadata_builder._save_results(
+                {"Skim": app_metadata_builder._merge_app(_fake_app("Skim"), "PDF viewer")},
+                json_path, store)
+        assert store.count() == 1
+        assert [name for name, _ in store.search("viewer")] == ["Skim"]
+        assert store.search("browser") == []
+
+        exported = os.path.join(tmp, 'exported.json')
+        assert catalog_store.export_json(store, exported) == 1
+        with open(exported, encoding='utf-8') as f, open(json_path, encoding='utf-8') as g:
+            assert json.load(f) == json.load(g)
+
+        web_app = _load_web_app()
+        web_app.catalog = web_app.ApplicationCatalog(json_path)
+        client = web_app.app.test_client()
+        web_app.APPLICATIONS_DB = os.path.join(tmp, 'missing.db')
+        scanned = client.get('/search?q=pdf').get_json()
+        assert scanned['engine'] == 'trigram' and scanned['items'][0]['name'] == "Skim"
+
+        web_app.APPLICATIONS_DB = db_path
+        store.write_batch({"Zoom": app_metadata_builder._merge_app(_fake_app("Zoom"), "Video calls")})
+        found = client.get('/search?q=video').get_json()
+        assert found['engine'] in ('fts5', 'sqlite')
+        assert found['items'] == [{"name": "Zoom", "description": "Video calls",
+                                   "version": "1.0", "copyright": ""}]
+        copied = client.post('/copy-description', data={'app_name': 'Zoom'}).get_json()
+        assert copied['description'] == "Video calls"
+        assert client.get('/search?limit=x').status_code == 400
+        web_app.get_catalog_store().close()
+        store.close()
+    print("✅ SUCCESS: SQLite catalog store indexed and searched the catalog")
+
+
+def test_web_responses_are_cached_and_compressed():
+    """Catalog responses revalidate with ETags, compress, and static URLs are fingerprinted."""
+    web_app = _load_web_app()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'applications.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({f"App{i:02d}": {"description": f"Tool number {i}"} for i in range(50)}, f)
+        web_app.catalog = web_app.ApplicationCatalog(path, check_interval=0)
+        web_app.APPLICATIONS_DB = os.path.join(tmp, 'missing.db')
+        client = web_app.app.test_client()
+
+        page = client.get('/')
+        assert page.status_code == 200 and page.headers['ETag'] and page.last_modified
+        assert 'no-cache' in page.headers['Cache-Control']
+        assert client.get('/', headers={'If-None-Match': page.headers['ETag']}).status_code == 304
+        assert client.get('/', headers={'If-Modified-Since': page.headers['Last-Modified']}).status_code == 304
+
+        api = client.get('/api/applications?limit=50', headers={'Accept-Encoding': 'gzip'})
+        assert api.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in api.headers['Vary']
+        assert len(json.loads(gzip.decompress(api.data))['items']) == 50
+        # A compressed body gets a weak validator, which If-None-Match still matches
+        assert api.headers['ETag'].startswith('W/')
+        revalidated = client.get('/api/applications?limit=50', headers={'If-None-Match': api.headers['ETag']})
+        assert revalidated.status_code == 304 and revalidated.data == b''
+
+        # A new catalog version invalidates the validators
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"Only": {"description": "One app"}}, f)
+        changed = client.get('/api/applications', headers={'If-None-Match': api.headers['ETag']})
+        assert changed.status_code == 200 and changed.get_json()['total'] == 1
+
+        css_url = re.search(r'href="([^"]*app\.css\?v=\w+)"', page.get_data(as_text=True)).group(1)
+        css = client.get(css_url)
+        assert 'immutable' in css.headers['Cache-Control'] and 'max-age=31536000' in css.headers['Cache-Control']
+        css.close()
+        plain = client.get('/static/app.css')
+        assert 'immutable' not in plain.headers.get('Cache-Control', '')
+        plain.close()
+    print("✅ SUCCESS: web responses were cached, revalidated and compressed")
+
+
+def test_run_report_and_metrics_endpoint():
+    """A build records per-stage metrics in its run report, served by /metrics."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        for name in ('Safari', 'Skim', 'Zoom'):
+            _make_bundle(root, name, CFBundleIdentifier=f'com.example.{name.lower()}')
+        output = os.path.join(tmp, 'applications.json')
+        argv = ['app_metadata_builder.py', '--root', root, '--output', output, '--goose', FAKE_GOOSE]
+        with patch.object(sys, 'argv', argv), contextlib.redirect_stdout(io.StringIO()):
+            app_metadata_builder.main()
+
+        with open(os.path.join(tmp, 'applications.metrics.json'), encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['summary']['apps'] == 3 and report['summary']['described'] == 3
+        stages = {metric['labels']['stage'] for metric in report['metrics']['histograms']
+                  if metric['name'] == 'stage_duration_seconds'}
+        assert {'scan', 'render', 'goose_cli', 'parse', 'merge', 'save'} <= stages
+        counters = {(metric['name'], tuple(metric['labels'].values())): metric['value']
+                    for metric in report['metrics']['counters']}
+        assert counters[('parse_strategy_total', ('code_block',))] >= 1
+        assert counters[('batch_apps_total', ('described',))] == 3
+
+        web_app = _load_web_app()
+        web_app.catalog = web_app.ApplicationCatalog(output)
+        web_app.BUILDER_REPORT = os.path.join(tmp, 'applications.metrics.json')
+        client = web_app.app.test_client()
+        client.get('/api/applications')
+        text = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE app_metadata_builder_batch_duration_seconds histogram' in text
+    assert 'app_metadata_builder_parse_strategy_total{strategy="code_block"}' in text
+    assert 'app_metadata_builder_stage_duration_seconds_bucket{stage="goose_cli",le="+Inf"}' in text
+    assert 'app_metadata_web_catalog_applications 3' in text
+    assert 'app_metadata_web_http_requests_total{endpoint="api_applications",status="200"} 1' in text
+    print("✅ SUCCESS: run report and /metrics exposed per-stage metrics")
+
+
+def test_build_catalog_reports_typed_progress_in_process():
+    """build_catalog() reports typed events and batch results; the web app runs it in-process."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        for i in range(5):
+            _make_bundle(root, f'App{i}', CFBundleIdentifier=f'com.example.app{i}')
+        output = os.path.join(tmp, 'applications.json')
+
+        events, results = [], {}
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE,
+                                                     batch_budget=300)
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            summary = app_metadata_builder.build_catalog(options, events.append, results.update)
+        assert printed.getvalue() == ''
+        assert summary['apps'] == 5 and summary['described'] == 5
+        assert sorted(results) == [f'App{i}' for i in range(5)]
+        finished = [event for event in events if event['type'] == 'batch_finished']
+        assert sum(event['described'] for event in finished) == 5
+        assert all(event['strategy'] == 'code_block' for event in finished)
+        assert [event['type'] for event in events][-2:] == ['cache', 'report']
+        try:
+            app_metadata_builder.build_options(colour='blue')
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("unknown build options must be rejected")
+
+        os.remove(output)
+        web_app = _load_web_app()
+        web_app.catalog = web_app.ApplicationCatalog(output)
+        web_app.refresh_jobs = web_app.RefreshJobManager(functools.partial(
+            web_app.run_builder_in_process, roots=[root], output=output, goose=FAKE_GOOSE,
+            force=True))
+        client = web_app.app.test_client()
+        client.post('/refresh-applications')
+        stream = client.get('/refresh-applications-stream').get_data(as_text=True)
+        messages = [json.loads(line[len('data: '):]) for line in stream.splitlines()
+                    if line.startswith('data: ')]
+        types = [message['type'] for message in messages]
+        assert 'batch_finished' in types and 'saved' in types
+        assert types[-2:] == ['summary', 'success']
+        assert messages[-1]['count'] == 5
+        assert messages[-2]['summary']['described'] == 5
+    print("✅ SUCCESS: build_catalog reported typed progress in-process")
+
+
+def test_run_goose_cli_stops_once_every_app_is_answered():
+    """A session lingering after its answer is ended as soon as every app is described."""
+    apps = [_fake_app(f"App {i}") for i in range(5)]
+    prompt = app_metadata_builder.render_prompt(apps)
+    names = [app['name'] for app in apps]
+
+    tmp = tempfile.mkdtemp()
+    store = response_store.ResponseStore(os.path.join(tmp, 'responses'))
+    with patch.dict(os.environ, {'FAKE_GOOSE_SHAPE': 'chatty', 'FAKE_GOOSE_LINGER': '30'}):
+        started = time.monotonic()
+        response = app_metadata_builder.run_goose_cli(prompt, goose_command=FAKE_GOOSE, app_names=names,
+                                                      response_store=store)
+        assert time.monotonic() - started < 10
+    assert sorted(parse_goose_response(response)) == sorted(names)
+    recorded = response
+
+    # An answer missing an app keeps the call waiting; a timeout still returns
+    # what arrived so the parser can salvage it, but does not record it for replay
+    with patch.dict(os.environ, {'FAKE_GOOSE_LINGER': '30'}), \
+            patch.object(app_metadata_builder, 'GOOSE_TIMEOUT', 1):
+        started = time.monotonic()
+        response = app_metadata_builder.run_goose_cli(
+            prompt, goose_command=FAKE_GOOSE, app_names=names + ['Missing App'], response_store=store)
+        assert 1 <= time.monotonic() - started < 10
+    assert len(parse_goose_response(response)) == 5
+    assert response != recorded
+    assert [entry['response'] for _, entry in store.entries()] == [recorded]
+    shutil.rmtree(tmp)
+
+    with patch.dict(os.environ, {'FAKE_GOOSE_LATENCY': '30'}), \
+            patch.object(app_metadata_builder, 'GOOSE_TIMEOUT', 1):
+        assert app_metadata_builder.run_goose_cli(prompt, goose_command=FAKE_GOOSE, app_names=names) is None
+    print("✅ SUCCESS: Goose output streamed and the call ended once answered")
+
+
+def test_ndjson_catalog_is_streamed_and_indexed():
+    """--format ndjson writes one record per line; the web app reads it through a byte-offset index."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        for i in range(12):
+            _make_bundle(root, f'App{i:02d}', CFBundleIdentifier=f'com.example.app{i}')
+        output = os.path.join(tmp, 'applications.ndjson')
+
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE,
+                                                     batch_budget=300)
+        assert options.format == 'ndjson'
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = app_metadata_builder.build_catalog(options)
+        assert summary['described'] == 12
+        with open(output, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert [record['name'] for record in records] == [f'App{i:02d}' for i in range(12)]
+        assert records[3]['description'] == 'Stub description of App03.'
+        assert not [name for name in os.listdir(tmp) if name.endswith('.spool')]
+        assert app_metadata_builder.load_catalog(output, 'ndjson')['App03']['bundle_identifier'] == 'com.example.app3'
+
+        # A truncated last line is skipped, not fatal
+        with open(output, 'a', encoding='utf-8') as f:
+            f.write('{"name": "Broken", "descr')
+        web_app = _load_web_app()
+        web_app.catalog = web_app.ApplicationCatalog(output)
+        applications = web_app.catalog.snapshot().applications
+        assert isinstance(applications, web_app.NdjsonRecords)
+        assert len(applications) == 12 and 'Broken' not in applications
+        assert applications['App05']['description'] == 'Stub description of App05.'
+        assert [name for name, _ in applications.iter_records('App10')] == ['App10', 'App11']
+
+        client = web_app.app.test_client()
+        page = client.get('/api/applications?limit=5&cursor=5&fields=name,description').get_json()
+        assert page['total'] == 12 and page['next_cursor'] == '10'
+        assert page['items'][0] == {'name': 'App05', 'description': 'Stub description of App05.'}
+
+        # A later record for an app replaces the one written by an earlier batch
+        writer = app_metadata_builder.NdjsonCatalogWriter(output)
+        writer.write({'B': {'description': ''}, 'A': {'description': 'first'}})
+        writer.write({'B': {'description': 'retried'}})
+        assert writer.publish() == 2
+        assert app_metadata_builder.load_catalog(output, 'ndjson') == {
+            'A': {'description': 'first'}, 'B': {'description': 'retried'}}
+    print("✅ SUCCESS: NDJSON catalog streamed by batch and served through its offset index")
+
+
+def test_fleet_merge_dedupes_hosts_and_seeds_builds():
+    """Host catalogs merge on bundle id + version; the result seeds a build that skips Goose."""
+    def entry(description, bundle_identifier, version):
+        return {'description': description, 'version': version, 'bundle_identifier': bundle_identifier}
+
+    hosts = {
+        'mac-01': {'Slack': entry('Team chat.', 'com.tinyspeck.slackmacgap', '4.1'),
+                   'Tool': entry('', 'com.example.tool', '1')},
+        'mac-02': {'Slack': entry('Team chat app for workplaces.', 'com.tinyspeck.slackmacgap', '4.1'),
+                   'Tool': entry('Build tool.', 'com.example.tool', '2')},
+        'mac-03': {'Slack': entry('Team chat.', 'com.tinyspeck.slackmacgap', '4.1')},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = []
+        for host, catalog in hosts.items():
+            os.makedirs(os.path.join(tmp, host))
+            path = os.path.join(tmp, host, 'applications.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f)
+            inputs.append(path)
+        fleet = os.path.join(tmp, 'fleet.ndjson')
+        summary = fleet_merge.merge_catalogs(inputs + [f'mac-01={inputs[0]}'], fleet)
+        assert summary == {'inputs': 4, 'hosts': 3, 'releases': 3, 'described': 2}
+        assert sorted(os.listdir(tmp)) == ['fleet.ndjson', 'mac-01', 'mac-02', 'mac-03']
+        with open(fleet, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        # Two hosts agree on the shorter Slack description; mac-01 counts once
+        assert [(r['name'], r['version'], r['description'], r['hosts']) for r in records] == [
+            ('Slack', '4.1', 'Team chat.', ['mac-01', 'mac-02', 'mac-03']),
+            ('Tool', '1', '', ['mac-01']),
+            ('Tool', '2', 'Build tool.', ['mac-02']),
+        ]
+
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        _make_bundle(root, 'Slack', CFBundleIdentifier='com.tinyspeck.slackmacgap',
+                     CFBundleShortVersionString='4.1')
+        _make_bundle(root, 'Tool', CFBundleIdentifier='com.example.tool', CFBundleShortVersionString='1')
+        output = os.path.join(tmp, 'applications.json')
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE,
+                                                     seed=fleet, retries=0)
+        events = []
+        summary = app_metadata_builder.build_catalog(options, events.append)
+        assert summary['seeded'] == 1 and summary['sent_to_goose'] == 1
+        assert [event['apps'] for event in events if event['type'] == 'seed'] == [1]
+        with open(output, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        assert catalog['Slack']['description'] == 'Team chat.'
+        assert catalog['Tool']['description'] == 'Stub description of Tool.'
+    print("✅ SUCCESS: fleet catalogs merged and seeded a build")
+
+
+def test_local_tiers_resolve_apps_before_goose():
+    """Known bundles and usable Info.plist descriptions never reach Goose; version strings do."""
+    assert not app_metadata_builder.is_quality_description('3.5.14', {'name': 'iTerm'})
+    assert not app_metadata_builder.is_quality_description('iTerm2 3.5.14', {'name': 'iTerm2'})
+    assert not app_metadata_builder.is_quality_description('1.2, © 2024 Example Inc.', {'name': 'Tool'})
+    assert app_metadata_builder.is_quality_description('Edits photos and videos.', {'name': 'Tool'})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        _make_bundle(root, 'Safari', CFBundleIdentifier='com.apple.Safari')
+        _make_bundle(root, 'Renamer', CFBundleIdentifier='com.example.renamer',
+                     CFBundleDescription='Renames batches of files from patterns.')
+        _make_bundle(root, 'iTerm', CFBundleIdentifier='com.example.iterm', CFBundleGetInfoString='3.5.14')
+        output = os.path.join(tmp, 'applications.json')
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE)
+
+        events = []
+        summary = app_metadata_builder.build_catalog(options, events.append)
+        assert summary['sent_to_goose'] == 1
+        assert summary['tiers'] == {'knowledge_base': 1, 'plist': 1, 'llm': 1}
+        assert [event['tiers'] for event in events if event['type'] == 'resolve'] == [
+            {'knowledge_base': 1, 'plist': 1}]
+        with open(output, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        assert catalog['Safari']['description'] == app_metadata_builder.load_knowledge_base()['com.apple.Safari']
+        assert catalog['Renamer']['description'] == 'Renames batches of files from patterns.'
+        assert catalog['iTerm']['description'] == 'Stub description of iTerm.'
+        with open(app_metadata_builder._sidecar_path(output, '.metrics.json'), 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['summary']['tiers']['plist'] == 1
+
+        # Only the Goose answer is cached; the local tiers run again, so changes to them take effect
+        with open(app_metadata_builder._sidecar_path(output, '.cache.json'), 'r', encoding='utf-8') as f:
+            assert [entry['name'] for entry in json.load(f).values()] == ['iTerm']
+        summary = app_metadata_builder.build_catalog(options, events.append)
+        assert summary['cache_hits'] == 1 and summary['sent_to_goose'] == 0
+        assert summary['tiers'] == {'knowledge_base': 1, 'plist': 1, 'llm': 0}
+
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE,
+                                                     force=True, local_resolve=False)
+        assert app_metadata_builder.build_catalog(options, events.append)['sent_to_goose'] == 3
+    print("✅ SUCCESS: local tiers resolved apps before Goose")
+
+
+def test_analyze_records_bundle_footprints():
+    """--analyze records size, file count and Mach-O architectures, cached per bundle version."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        universal = _make_bundle(root, 'Universal', CFBundleIdentifier='com.example.universal',
+                                 CFBundleShortVersionString='1.0')
+        os.makedirs(os.path.join(universal, 'Contents', 'MacOS'))
+        with open(os.path.join(universal, 'Contents', 'MacOS', 'Universal'), 'wb') as f:
+            # Universal header with an x86_64 and an arm64e slice
+            f.write(struct.pack('>II', 0xcafebabe, 2))
+            f.write(struct.pack('>IIIII', 0x01000007, 3, 4096, 100, 12))
+            f.write(struct.pack('>IIIII', 0x0100000c, 2, 8192, 100, 14))
+            f.write(b'\0' * 20000)
+        with open(os.path.join(universal, 'Contents', 'MacOS', 'launcher.sh'), 'w') as f:
+            f.write('#!/bin/sh\n')
+        thin = _make_bundle(root, 'Thin', CFBundleIdentifier='com.example.thin')
+        os.makedirs(os.path.join(thin, 'Contents', 'MacOS'))
+        with open(os.path.join(thin, 'Contents', 'MacOS', 'Thin'), 'wb') as f:
+            f.write(struct.pack('<III', 0xfeedfacf, 0x0100000c, 0))
+        os.symlink(os.path.join(universal, 'Contents'), os.path.join(thin, 'Contents', 'Link'))
+
+        output = os.path.join(tmp, 'applications.json')
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE,
+                                                     analyze=True)
+        events = []
+        app_metadata_builder.build_catalog(options, events.append)
+        with open(output, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        assert catalog['Universal']['architectures'] == ['arm64e', 'x86_64']
+        assert catalog['Universal']['file_count'] == 3
+        assert catalog['Universal']['size_bytes'] >= 20000
+        # The symlink counts as a file and is not followed
+        assert catalog['Thin']['architectures'] == ['arm64'] and catalog['Thin']['file_count'] == 3
+        assert [event['analyzed'] for event in events if event['type'] == 'analyze'] == [2]
+
+        # Unchanged bundles reuse their cached footprint
+        with patch.object(app_metadata_builder, 'analyze_bundle', side_effect=AssertionError):
+            app_metadata_builder.build_catalog(options, events.append)
+        assert [event['cached'] for event in events if event['type'] == 'analyze'] == [0, 2]
+
+        web_app = _load_web_app()
+        web_app.catalog = web_app.ApplicationCatalog(output)
+        client = web_app.app.test_client()
+        page = client.get('/api/applications?sort=-size_bytes&fields=name,size_bytes').get_json()
+        assert [item['name'] for item in page['items']] == ['Universal', 'Thin']
+        assert client.get('/api/applications?sort=path').status_code == 400
+    print("✅ SUCCESS: bundle footprints analyzed, cached and sortable")
+
+
+def test_backend_pool_routes_throttles_and_fails_over():
+    """Calls go to the fastest healthy backend within its rate and concurrency limits."""
+    now = [0.0]
+    bucket = backend_pool.TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time() == 0.5
+    now[0] = 0.5
+    assert bucket.wait_time() == 0
+
+    # Concurrency caps hold under parallel load, and the slow backend gets fewer calls
+    pool = backend_pool.BackendPool([backend_pool.Backend('slow', 'x', concurrency=1),
+                                     backend_pool.Backend('quick', 'x', concurrency=2)])
+    active, peaks, lock = collections.Counter(), collections.Counter(), threading.Lock()
+
+    def run(backend):
+        with lock:
+            active[backend.name] += 1
+            peaks[backend.name] = max(peaks[backend.name], active[backend.name])
+        time.sleep(0.05 if backend.name == 'slow' else 0.005)
+        with lock:
+            active[backend.name] -= 1
+        return backend.name
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        answers = list(executor.map(lambda _: pool.call(run), range(24)))
+    assert peaks['slow'] <= 1 and peaks['quick'] <= 2
+    assert answers.count('quick') > answers.count('slow')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        for i in range(6):
+            _make_bundle(root, f'App{i}', CFBundleIdentifier=f'com.example.app{i}')
+        config = os.path.join(tmp, 'backends.json')
+        stub = shlex.join([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        'fake_goose.py')])
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'backends': [
+                {'name': 'broken', 'command': stub, 'env': {'FAKE_GOOSE_SHAPE': 'error'},
+                 'concurrency': 1},
+                {'name': 'stub', 'command': stub, 'rate_per_minute': 6000, 'burst': 1,
+                 'concurrency': 1},
+            ]}, f)
+        options = app_metadata_builder.build_options(
+            roots=[root], output=os.path.join(tmp, 'applications.json'), backends=config,
+            goose='does-not-exist', batch_budget=300, retries=0)
+        events = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = app_metadata_builder.build_catalog(options, events.append)
+        assert summary['described'] == 6
+        types = [event['type'] for event in events]
+        assert types.count('failover') == 1 and types.count('backend_unhealthy') == 1
+        assert 'throttle' in types
+        backends = {event['name']: event for event in events if event['type'] == 'backend_summary'}
+        assert backends['broken']['calls'] == 1 and backends['broken']['latency'] is None
+        routed = [event['backend'] for event in events if event['type'] == 'route']
+        assert routed.count('stub') == backends['stub']['calls'] > 1
+
+        # Limits that could never admit a call, or a config that is not an object, are rejected up front
+        for bad in ({'concurrency': 0}, {'rate_per_minute': 0}, {'rate_per_minute': -5}, {'burst': 0}):
+            with open(config, 'w', encoding='utf-8') as f:
+                json.dump({'backends': [dict({'name': 'bad', 'command': stub}, **bad)]}, f)
+            try:
+                backend_pool.BackendPool.from_file(config)
+                raise AssertionError(f"accepted {bad}")
+            except ValueError as e:
+                assert str(e).startswith("Invalid backend 'bad'")
+        for bad in ([{'command': stub}], {'backends': {'command': stub}}, {'backends': ['stub']}):
+            with open(config, 'w', encoding='utf-8') as f:
+                json.dump(bad, f)
+            try:
+                backend_pool.BackendPool.from_file(config)
+                raise AssertionError(f"accepted {bad}")
+            except ValueError as e:
+                assert str(e).startswith("Invalid backend")
+    print("✅ SUCCESS: backend pool routed, throttled and failed over")
+
+
+def test_search_index_ranks_fuzzy_matches_and_updates_incrementally():
+    """The in-memory index ranks name matches first, tolerates typos and re-indexes only changes."""
+    web_app = _load_web_app()
+    applications = {
+        "Slack": {"description": "Team chat.", "bundle_identifier": "com.tinyspeck.slackmacgap", "copyright": ""},
+        "Notes": {"description": "Keeps notes; works with Slack.", "bundle_identifier": "com.apple.Notes",
+                  "copyright": "© Apple"},
+        "Photo Booth": {"description": "Takes photos with the camera.", "bundle_identifier": "com.apple.PhotoBooth",
+                        "copyright": "© Apple"},
+    }
+    index = web_app.SearchIndex()
+    assert index.update(applications) == (3, 0)
+    assert index.search("slack") == ["Slack", "Notes"]
+    assert index.search("pho") == ["Photo Booth"]
+    assert index.search("slakc") == ["Slack"] and index.search("qwerty") == []
+    assert index.search("photi") == ["Photo Booth"]
+    assert index.search("apple notes") == ["Notes"]
+    assert index.search("tinyspeck") == ["Slack"] and index.search("") == []
+
+    changed = dict(applications, Slack=dict(applications["Slack"], description="Messaging."))
+    del changed["Notes"]
+    assert index.update(changed) == (1, 1)
+    assert index.update(changed) == (0, 0)
+    assert index.search("slack") == ["Slack"] and index.search("keeps") == []
+    # Freed document ids are reused, so a long-running server's index does not grow with churn
+    for i in range(5):
+        assert index.update(dict(changed, Notes=dict(applications["Notes"], description=f"Draft {i}."))) == (1, 0)
+        assert index.update(changed) == (0, 1)
+    assert len(index._names) == 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # NDJSON records are read once to index them, and not at all when unchanged
+        ndjson_path = os.path.join(tmp, 'applications.ndjson')
+        with open(ndjson_path, 'w', encoding='utf-8') as f:
+            for name, entry in applications.items():
+                f.write(json.dumps(dict(name=name, **entry)) + '\n')
+        decode, decoded = web_app.NdjsonRecords._decode, []
+        with patch.object(web_app.NdjsonRecords, '_decode',
+                          staticmethod(lambda line: decoded.append(line) or decode(line))):
+            ndjson_index = web_app.SearchIndex()
+            records = web_app.NdjsonRecords(ndjson_path)
+            assert ndjson_index.update(records) == (3, 0) and len(decoded) == 3
+            os.utime(ndjson_path)
+            touched = web_app.NdjsonRecords(ndjson_path)
+            assert ndjson_index.update(touched) == (0, 0) and len(decoded) == 3
+        assert ndjson_index.search("camera") == ["Photo Booth"]
+        records.close()
+        touched.close()
+
+        path = os.path.join(tmp, 'applications.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(applications, f)
+        web_app.APPLICATIONS_DB = os.path.join(tmp, 'missing.db')
+        web_app.catalog = web_app.ApplicationCatalog(path)
+        client = web_app.app.test_client()
+        found = client.get('/search?q=camera&fields=name,bundle_identifier').get_json()
+        assert found == {'items': [{'name': 'Photo Booth', 'bundle_identifier': 'com.apple.PhotoBooth'}],
+                         'count': 1, 'engine': 'trigram'}
+        assert client.get('/search?q=x&fields=secret').status_code == 400
+    print("✅ SUCCESS: search index ranked fuzzy matches and updated incrementally")
+
+
+def test_responses_are_recorded_and_replayed_without_goose():
+    """Raw responses are stored by prompt and backend, replayed without Goose and evicted LRU."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'Applications')
+        os.makedirs(root)
+        for name in ('Alpha', 'Beta', 'Gamma'):
+            _make_bundle(root, name, CFBundleIdentifier=f'com.example.{name.lower()}')
+        output = os.path.join(tmp, 'applications.json')
+        options = app_metadata_builder.build_options(roots=[root], output=output, goose=FAKE_GOOSE,
+                                                     jobs=1, local_resolve=False)
+        assert app_metadata_builder.build_catalog(options)['sent_to_goose'] == 3
+        with open(output, 'r', encoding='utf-8') as f:
+            recorded_catalog = json.load(f)
+
+        store = response_store.ResponseStore(os.path.join(tmp, 'applications.responses'))
+        [(key, entry)] = list(store.entries())
+        assert entry['apps'] == ['Alpha', 'Beta', 'Gamma']
+        assert key == response_store.response_key(
+            entry['prompt'], response_store.backend_identity(FAKE_GOOSE))
+        assert 'Stub description of Beta.' in entry['response']
+        [checked] = response_store.check_corpus(
+            store, app_metadata_builder.parse_goose_response_with_strategy)
+        assert (checked['described'], checked['strategy'], checked['missing']) == (3, 'code_block', [])
+
+        # Replay rebuilds the same catalog although Goose would fail if it ran
+        replayed_output = os.path.join(tmp, 'replayed.json')
+        options = app_metadata_builder.build_options(
+            roots=[root], output=replayed_output, goose=FAKE_GOOSE, jobs=1, force=True,
+            local_resolve=False, replay=True, responses=store.path, retries=0)
+        events = []
+        with patch.dict(os.environ, {'FAKE_GOOSE_SHAPE': 'error'}):
+            app_metadata_builder.build_catalog(options, events.append)
+        with open(replayed_output, 'r', encoding='utf-8') as f:
+            assert json.load(f) == recorded_catalog
+        assert not [event for event in events if event['type'] == 'replay_missed']
+
+        # A prompt that was never recorded is not sent to Goose either
+        _make_bundle(root, 'Delta', CFBundleIdentifier='com.example.delta')
+        events = []
+        app_metadata_builder.build_catalog(options, events.append)
+        counters = {(counter['name'], counter['labels'].get('result'))
+                    for counter in app_metadata_builder.METRICS.snapshot()['counters']}
+        assert ('response_store_total', 'missed') in counters
+        assert not [name for name, _ in counters if name == 'goose_calls_total']
+        assert [event['batch'] for event in events if event['type'] == 'replay_missed'] == [1]
+        with open(replayed_output, 'r', encoding='utf-8') as f:
+            assert not json.load(f)['Delta']['description']
+
+        # Least recently used entries are evicted once the store outgrows its limit
+        small = response_store.ResponseStore(os.path.join(tmp, 'small'), max_bytes=1000)
+        for prompt in ('first', 'second'):
+            assert small.put(prompt, 'stub', 'x' * 300, 1.0, ['App'])
+        first, second = (small._entry_path(response_store.response_key(prompt, 'stub'))
+                         for prompt in ('first', 'second'))
+        os.utime(first, (1000, 1000))
+        os.utime(second, (2000, 2000))
+        assert small.get('first', ['other', 'stub'])['response'] == 'x' * 300
+        assert small.put('third', 'stub', 'y' * 300, 1.0, ['App'])
+        assert small.get('second', ['stub']) is None
+        assert small.get('first', ['stub']) and small.get('third', ['stub'])
+        assert small.size() <= 1000
+        assert not small.put('huge', 'stub', 'z' * 2000, 1.0)
+        # Nothing is created on disk until a response is recorded
+        unused = response_store.ResponseStore(os.path.join(tmp, 'unused.responses'))
+        assert unused.get('first', ['stub']) is None and not os.path.exists(unused.path)
+    print("✅ SUCCESS: responses recorded, replayed without Goose and evicted least recently used")
+
+
+def test_atomic_writes_publish_readable_files():
+    """Atomically replaced outputs get the umask's default mode, or keep the mode they had."""
+    previous_umask = os.umask(0o022)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            catalog = {"Safari": app_metadata_builder._merge_app(_fake_app("Safari"), "Browser")}
+            json_path = os.path.join(tmp, 'applications.json')
+            app_metadata_builder._save_results(catalog, json_path)
+            assert stat.S_IMODE(os.stat(json_path).st_mode) == 0o644
+            os.chmod(json_path, 0o640)
+            app_metadata_builder._save_results(catalog, json_path)
+            assert stat.S_IMODE(os.stat(json_path).st_mode) == 0o640
+
+            ndjson_path = os.path.join(tmp, 'applications.ndjson')
+            writer = app_metadata_builder.NdjsonCatalogWriter(ndjson_path)
+            writer.write(catalog)
+            writer.publish()
+            fleet_path = os.path.join(tmp, 'fleet.ndjson')
+            fleet_merge.merge_catalogs([f"mac-01={json_path}"], fleet_path)
+            exported_path = os.path.join(tmp, 'exported.json')
+            store = catalog_store.CatalogStore(os.path.join(tmp, 'applications.db'))
+            store.replace_all(catalog)
+            catalog_store.export_json(store, exported_path)
+            store.close()
+            for path in (ndjson_path, fleet_path, exported_path):
+                assert stat.S_IMODE(os.stat(path).st_mode) == 0o644, path
+            assert not [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+    finally:
+        os.umask(previous_umask)
+    print("✅ SUCCESS: atomic writes published files readable under the umask")
+
+
+def test_json_scanner_streams_large_transcripts_in_linear_time():
+    """Feeding megabytes of output line by line only rescans the new text."""
+    answer = {f"App{i}": f"Keeps \"quotes\" and {{braces}} ({i})" for i in range(20000)}
+    lines = [f'command: mdls {{"path": "/Applications/App{i}.app"}}\n' if i % 5 == 0
+             else f"tool output line {i}, padded to look like a long session transcript\n"
+             for i in range(50000)]
+    lines += ['```json\n'] + json.dumps(answer, indent=2).splitlines(keepends=True) + ['\n```\n']
+
+    scanner = app_metadata_builder.JsonObjectScanner()
+    started = time.perf_counter()
+    spans, texts = [], []
+    for line in lines:
+        for span in scanner.feed(line):
+            spans.append(span)
+            texts.append(scanner.object_text(*span))
+    elapsed = time.perf_counter() - started
+
+    transcript = ''.join(lines)
+    assert len(transcript) > 4_000_000
+    # Quadratic buffering took tens of seconds for this much output
+    assert elapsed < 5, f"scanning took {elapsed:.1f}s"
+    assert spans == app_metadata_builder.JsonObjectScanner().feed(transcript)
+    assert texts[:2] == [transcript[start:end] for start, end in spans[:2]]
+    assert json.loads(texts[-1]) == answer
+    print(f"✅ SUCCESS: streamed {len(transcript) / 1e6:.1f} MB through the JSON scanner in {elapsed:.2f}s")
+
+
+def test_catalog_store_keeps_footprints_and_migrates_old_databases():
+    """--analyze footprints survive the SQLite store, and older databases gain their columns."""
+    analyzed = dict(app_metadata_builder._merge_app(_fake_app("Xcode"), "IDE"),
+                    size_bytes=12_000_000_000, file_count=250_000, architectures=['arm64', 'x86_64'])
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'applications.db')
+        old_columns = ', '.join(f"{field} TEXT NOT NULL DEFAULT ''" for field in catalog_store.ENTRY_FIELDS[:8])
+        with contextlib.closing(sqlite3.connect(db_path)) as connection, connection:
+            connection.execute(f'CREATE TABLE applications (id INTEGER PRIMARY KEY, '
+                               f'name TEXT NOT NULL UNIQUE, {old_columns})')
+            connection.execute("INSERT INTO applications (name, description) VALUES ('Legacy', 'Old row')")
+
+        store = catalog_store.CatalogStore(db_path)
+        assert store.get("Legacy")['description'] == 'Old row' and 'size_bytes' not in store.get("Legacy")
+        store.write_batch({"Xcode": analyzed})
+        assert store.get("Xcode") == analyzed
+        store.close()
+        # Opening an up-to-date database again is a no-op
+        store = catalog_store.CatalogStore(db_path)
+        exported = os.path.join(tmp, 'exported.json')
+        catalog_store.export_json(store, exported)
+        with open(exported, encoding='utf-8') as f:
+            assert json.load(f)["Xcode"] == analyzed
+
+        web_app = _load_web_app()
+        web_app.APPLICATIONS_DB = db_path
+        client = web_app.app.test_client()
+        found = client.get('/search?q=ide&fields=name,size_bytes,file_count,architectures').get_json()
+        assert found['items'] == [{"name": "Xcode", "size_bytes": 12_000_000_000, "file_count": 250_000,
+                                   "architectures": ['arm64', 'x86_64']}]
+        web_app.get_catalog_store().close()
+        store.close()
+    print("✅ SUCCESS: SQLite store kept footprints and migrated an old database")
+
+
 if __name__ == "__main__":
     print("Running parse_goose_response tests...")
     success1 = test_parse_goose_response()
     success2 = test_actual_output()
     success3 = test_multiple_formats()
+    test_json_scanner_handles_chatter_and_truncation()
+    test_concurrent_batches_are_merged_deterministically()
+    test_description_cache_skips_unchanged_apps()
+    test_scanner_reads_multiple_roots()
+    test_web_catalog_reloads_only_when_file_changes()
+    test_checkpoint_journal_supports_resume()
+    test_batch_planner_packs_by_size_and_adapts()
+    test_web_api_paginates_catalog()
+    test_run_goose_cli_pipes_prompt_to_stub()
+    test_pipeline_benchmark_reports_every_stage()
+    test_refresh_jobs_are_single_flight_with_replay()
+    test_watch_sync_describes_only_changed_bundles()
+    test_retry_resubmits_only_undescribed_apps()
+    test_catalog_store_indexes_and_searches()
+    test_web_responses_are_cached_and_compressed()
+    test_run_report_and_metrics_endpoint()
+    test_build_catalog_reports_typed_progress_in_process()
+    test_run_goose_cli_stops_once_every_app_is_answered()
+    test_ndjson_catalog_is_streamed_and_indexed()
+    test_fleet_merge_dedupes_hosts_and_seeds_builds()
+    test_local_tiers_resolve_apps_before_goose()
+    test_analyze_records_bundle_footprints()
+    test_backend_pool_routes_throttles_and_fails_over()
+    test_search_index_ranks_fuzzy_matches_and_updates_incrementally()
+    test_responses_are_recorded_and_replayed_without_goose()
+    test_atomic_writes_publish_readable_files()
+    test_json_scanner_streams_large_transcripts_in_linear_time()
+    test_catalog_store_keeps_footprints_and_migrates_old_databases()
     if success1 and success2 and success3:
         print("\n🎉 All tests passed!")
     else: